@@ -0,0 +1,129 @@
+"""
+FPSOS Bot Async Database Facade
+Awaitable wrapper around FPSOSDatabase so the discord.py event loop never blocks on SQLite
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import db
+
+
+class AsyncFPSOSDatabase:
+    """Same method surface as FPSOSDatabase, but every call is awaited.
+
+    Writes are funnelled through one dedicated writer thread (SQLite only
+    allows a single writer anyway) behind a bounded queue: once
+    `max_pending_writes` are in flight, callers wait for room instead of
+    piling up work. Reads run on a small pool of reader threads, each with
+    its own pooled WAL connection, so they never queue behind a commit.
+
+    The sync `db` stays available for scripts and one-off tools.
+    """
+
+    # Methods that modify the database; everything else is dispatched as a read
+    WRITE_METHODS = frozenset({
+        'add_user',
+        'bulk_upsert_users',
+        'update_user_specs',
+        'save_diagnostic',
+        'backfill_diagnostics',
+        'archive_diagnostics',
+        'update_recommendations',
+        'cache_analysis',
+        'record_cache_hit',
+        'create_booking',
+        'mark_booking_complete',
+        'create_ticket',
+        'close_ticket',
+        'add_tag',
+        'delete_tag',
+        'flush_tag_usage',
+        'reindex_tags',
+        'add_intent_phrase',
+        'delete_intent_phrase',
+        'rebuild_stats',
+        'acquire_lease',
+        'release_lease',
+    })
+
+    # Served from memory by the sync class; awaiting them only leaves the loop for the periodic cache_versions check
+    INLINE_METHODS = frozenset({
+        'get_tag',
+        'get_all_tags',
+        'autocomplete_tags',
+        'suggest_tags',
+        'get_active_ticket',
+        'get_ticket_by_channel',
+        'get_intent_phrases',
+    })
+
+    # Generators that must be iterated off the loop; use the sync `db` for these
+    SYNC_ONLY_METHODS = frozenset({
+        'iter_export',
+    })
+
+    def __init__(self, sync_db, readers=4, max_pending_writes=256):
+        self.sync = sync_db
+        self.max_pending_writes = max_pending_writes
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fpsos-db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='fpsos-db-reader')
+        self._write_slots = None  # Created lazily on the running loop
+        self._pending_writes = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.sync, name)
+        if name.startswith('_') or not callable(method) or name in self.SYNC_ONLY_METHODS:
+            raise AttributeError(name)
+
+        if name in self.INLINE_METHODS:
+            async def call(*args, **kwargs):
+                await self._refresh_caches()
+                return method(*args, **kwargs)
+        elif name in self.WRITE_METHODS:
+            async def call(*args, **kwargs):
+                return await self._write(method, *args, **kwargs)
+        else:
+            async def call(*args, **kwargs):
+                return await self._read(method, *args, **kwargs)
+
+        functools.update_wrapper(call, method)
+        setattr(self, name, call)  # Cache so __getattr__ only runs once per method
+        return call
+
+    async def _refresh_caches(self):
+        """Check for tag/intent edits from other processes on a reader thread, so inline calls never do"""
+        if self.sync.cache_check_due():
+            await self._read(self.sync.refresh_caches)
+
+    async def _read(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(method, *args, **kwargs))
+
+    async def _write(self, method, *args, **kwargs):
+        if self._write_slots is None:
+            self._write_slots = asyncio.Semaphore(self.max_pending_writes)
+
+        loop = asyncio.get_running_loop()
+        async with self._write_slots:
+            self._pending_writes += 1
+            try:
+                return await loop.run_in_executor(self._writer, functools.partial(method, *args, **kwargs))
+            finally:
+                self._pending_writes -= 1
+
+    @property
+    def pending_writes(self):
+        """Number of writes queued or running on the writer thread"""
+        return self._pending_writes
+
+    async def close(self):
+        """Finish queued writes, stop the worker threads and release connections"""
+        await asyncio.to_thread(self._writer.shutdown, wait=True)
+        await asyncio.to_thread(self._readers.shutdown, wait=True)
+        self.sync.close()
+
+
+# Global async facade over the shared database
+adb = AsyncFPSOSDatabase(db)
@@ -0,0 +1,119 @@
+"""
+FPSOS Diagnostic Analysis Benchmark
+Analyzes a burst of large diagnostic uploads (each kept section near the
+256 KB cap) the old way ("inline": json.loads, validation and scoring on
+the event loop) and through utils.analysis.AnalysisService ("pool"), while
+a 10 ms ticker stands in for gateway events. Reports how late the ticker
+ran (event-loop stall), total time, and the service's wait / service times.
+
+Usage:
+    python benchmarks/bench_analysis.py
+    python benchmarks/bench_analysis.py --uploads 100 --workers 1 2 4
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.analysis import AnalysisBusy, AnalysisService, analyze
+from utils.ingest import MAX_SECTION_BYTES
+
+TICK = 0.010
+
+
+def upload():
+    """Raw sections as read_diagnostic(parse=False) keeps them, padded with fields the bot ignores"""
+    filler = [{'name': f'driver-{index}', 'version': '31.0.15.5222', 'date': '2024-03-01'} for index in range(2800)]
+    sections = {
+        'system': {'cpu': 'AMD Ryzen 7 9800X3D', 'gpu': 'NVIDIA RTX 4080 SUPER', 'ram': 32,
+                   'network': 'Intel I226-V 2.5GbE', 'drivers': filler},
+        'issues': {'critical': ['HPET enabled', 'Game Mode disabled'], 'warnings': ['Nagle enabled'],
+                   'processes': filler},
+        'performance': {'current_fps': 212, 'target_fps': 400, 'latency_ms': 11.5, 'frametimes': filler},
+    }
+    raw = {name: json.dumps(value).encode() for name, value in sections.items()}
+    assert all(len(value) <= MAX_SECTION_BYTES for value in raw.values())
+    return raw
+
+
+async def ticker(lags, stop):
+    """Records how late each 10 ms sleep wakes up"""
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run(mode, raw, uploads, workers, queue_size):
+    service = None
+    if mode == 'pool':
+        service = AnalysisService(workers=workers, queue_size=queue_size)
+        service.start()
+        await service.submit(raw)  # Wait for the workers to finish spawning
+        service._waits.clear()
+        service._services.clear()
+
+    lags, stop = [], asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.1)
+    lags.clear()
+
+    async def handle():
+        if service is None:
+            return analyze(raw)
+        try:
+            return await service.submit(raw)
+        except AnalysisBusy:
+            return None
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[handle() for _ in range(uploads)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick_task
+
+    stats = service.stats() if service else None
+    if service:
+        await service.close()
+    lags.sort()
+    return {
+        'done': sum(result is not None for result in results),
+        'seconds': elapsed,
+        'lag_p50': statistics.median(lags) * 1000 if lags else 0.0,
+        'lag_max': lags[-1] * 1000 if lags else elapsed * 1000,
+        'stats': stats,
+    }
+
+
+async def main_async(args):
+    raw = upload()
+    size = sum(len(value) for value in raw.values())
+    print(f"\n{args.uploads} uploads of {size / 1024:.0f} KB kept sections, arriving at once")
+    print(f"{'mode':<18}{'done':>6}{'total':>10}{'loop lag p50':>14}{'loop lag max':>14}{'wait p50/p99':>18}{'service p50':>13}")
+    rows = [('inline', 'inline', None)] + [(f'pool, {workers} worker(s)', 'pool', workers) for workers in args.workers]
+    for label, mode, workers in rows:
+        row = await run(mode, raw, args.uploads, workers, args.queue_size)
+        stats = row['stats']
+        waits = f"{stats['wait_ms_p50']:.0f}/{stats['wait_ms_p99']:.0f}ms" if stats else '-'
+        service = f"{stats['service_ms_p50']:.1f}ms" if stats else '-'
+        print(f"{label:<18}{row['done']:>6}{row['seconds'] * 1000:>8.0f}ms{row['lag_p50']:>12.1f}ms"
+              f"{row['lag_max']:>12.1f}ms{waits:>18}{service:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=40)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--queue-size', type=int, default=1000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+FPSOS Analysis Cache Benchmark
+Handles repeated uploads of the same diagnostic on a scratch database the
+way utils/diagnostics.py does: a first upload ("miss": hash, analyze,
+save_diagnostic, cache_analysis) and re-uploads answered from the in-memory
+LRU ("hit, memory") or from the analysis_cache table ("hit, disk"), each
+with its record_cache_hit write. Analysis runs inline here; on the bot it
+also waits for a worker process. Reports the time per upload and the rows
+each path adds to `diagnostics`.
+
+Usage:
+    python benchmarks/bench_analysis_cache.py
+    python benchmarks/bench_analysis_cache.py --uploads 2000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from database import FPSOSDatabase
+from utils.analysis import analyze, summarize
+from utils.ingest import upload_hash
+from utils.recommendations import RULES_VERSION
+
+
+def upload():
+    """Raw sections of a typical few-KB diagnostic, as read_diagnostic(parse=False) keeps them"""
+    sections = {
+        'system': {'cpu': 'AMD Ryzen 7 9800X3D', 'gpu': 'NVIDIA RTX 4080 SUPER', 'ram': 32, 'network': 'Intel I226-V 2.5GbE'},
+        'issues': {'critical': ['HPET enabled', 'Game Mode disabled'],
+                   'warnings': [f'Background service {index} running' for index in range(12)]},
+        'performance': {'current_fps': 212, 'target_fps': 400, 'latency_ms': 11.5},
+    }
+    return {name: json.dumps(value).encode() for name, value in sections.items()}
+
+
+def handle(db, raw, user_id):
+    content_hash = upload_hash(raw)
+    result = db.get_cached_analysis(content_hash, user_id, RULES_VERSION)
+    if result is not None:
+        db.record_cache_hit(content_hash, user_id)
+        return result
+    analyzed = analyze(raw)
+    result = summarize(analyzed)
+    diagnostic_id = db.save_diagnostic(user_id, analyzed['data'], result['critical_count'], result['warning_count'],
+                                       result['recommendation'], rules_version=result['rules_version'])
+    db.cache_analysis(content_hash, user_id, result['rules_version'], result, diagnostic_id)
+    return result
+
+
+def timed(db, raw, users, before=None):
+    times = []
+    for user_id in users:
+        if before:
+            before()
+        start = time.perf_counter()
+        handle(db, raw, user_id)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=500)
+    args = parser.parse_args()
+
+    db = FPSOSDatabase(str(Path(tempfile.mkdtemp(prefix='fpsos-cache-')) / 'bench.db'))
+    raw = upload()
+    users = [str(1000 + index) for index in range(args.uploads)]
+
+    def rows():
+        return db.get_connection().execute('SELECT COUNT(*) FROM diagnostics').fetchone()[0]
+
+    print(f"\n{args.uploads} users, {sum(len(value) for value in raw.values())} byte upload each, median per upload")
+    print(f"{'path':<14}{'time':>12}{'new rows':>10}")
+    for label, before in [('miss', None), ('hit, memory', None), ('hit, disk', db._analyses.clear)]:
+        count = rows()
+        micros = timed(db, raw, users, before)
+        print(f"{label:<14}{micros:>10.0f}µs{rows() - count:>10}")
+    stats = db.get_stats()
+    print(f"\n/stats: {stats['cache_hit_ratio']}% hit rate, {stats['total_diagnostics']} diagnostics")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
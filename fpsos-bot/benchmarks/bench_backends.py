@@ -0,0 +1,85 @@
+"""
+FPSOS Bot Storage Backend Benchmark
+Counts HTTP round trips and wall time per bot operation on the libSQL backend,
+comparing one request per statement ("naive") with batched transactions
+("pipelined"), against the local sqld stand-in with simulated network latency.
+The local SQLite backend is timed alongside for reference.
+
+Usage:
+    python benchmarks/bench_backends.py
+    python benchmarks/bench_backends.py --latency-ms 40 --ops 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run from anywhere: make the bot package importable and keep the default
+# database created by `database.db` out of the working tree.
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+os.chdir(tempfile.mkdtemp(prefix='fpsos-bench-'))
+
+from database import FPSOSDatabase
+from sqld_standin import serve
+
+SAMPLE_DIAGNOSTIC = json.loads((BOT_DIR / 'test_diagnostic.json').read_text())
+
+
+def operations(db):
+    """One representative call per bot flow; each takes a unique integer"""
+    return {
+        'add_user': lambda i: db.add_user(str(i), f'user{i}'),
+        'save_diagnostic': lambda i: db.save_diagnostic(str(i), SAMPLE_DIAGNOSTIC, 2, 5, 'extreme'),
+        'create_booking': lambda i: db.create_booking(str(i), 'full', f'evt{i}', '2026-01-01', 199),
+        'create_ticket': lambda i: db.create_ticket(str(i), f'chan{i}'),
+        'get_active_ticket': lambda i: db.get_active_ticket(str(i)),
+        'close_ticket': lambda i: db.close_ticket(f'chan{i}'),
+        'get_user': lambda i: db.get_user(str(i)),
+        'get_stats': lambda i: db.get_stats(),
+    }
+
+
+def run(db, ops):
+    """Returns {operation: (round trips per call, ms per call)}"""
+    results = {}
+    for name, call in operations(db).items():
+        conn = db.get_connection()
+        trips_before = getattr(conn, 'round_trips', 0)
+        start = time.perf_counter()
+        for i in range(ops):
+            call(i)
+        elapsed = time.perf_counter() - start
+        trips = getattr(conn, 'round_trips', 0) - trips_before
+        results[name] = (trips / ops, elapsed * 1000 / ops)
+    return results
+
+
+def bench(latency_ms, ops):
+    print(f"\n== {ops} calls per operation, {latency_ms:g} ms simulated latency ==")
+    results = {'sqlite': run(FPSOSDatabase(str(Path(f'local-{latency_ms:g}.db').resolve())), ops)}
+    for mode in ('naive', 'pipelined'):
+        server, url = serve(str(Path(f'{mode}-{latency_ms:g}.db').resolve()), latency_ms=latency_ms)
+        db = FPSOSDatabase(url)
+        db.backend.pipeline = mode == 'pipelined'
+        results[mode] = run(db, ops)
+        db.close()
+        server.shutdown()
+
+    print(f"{'operation':<20}{'naive trips':>12}{'piped trips':>12}{'sqlite ms':>11}{'naive ms':>10}{'piped ms':>10}")
+    for name in results['sqlite']:
+        naive, piped, local = results['naive'][name], results['pipelined'][name], results['sqlite'][name]
+        print(f'{name:<20}{naive[0]:>12.1f}{piped[0]:>12.1f}{local[1]:>11.2f}{naive[1]:>10.1f}{piped[1]:>10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[0, 20])
+    parser.add_argument('--ops', type=int, default=100)
+    args = parser.parse_args()
+    for latency in args.latency_ms:
+        bench(latency, args.ops)
@@ -0,0 +1,223 @@
+"""
+FPSOS Bot Database Microbenchmark
+Times the public FPSOSDatabase methods against a seeded database in three
+setups: "baseline", the original schema and SQL with a connection per call
+and no indexes or caches (pinned below); "unpooled", today's FPSOSDatabase
+with a connection per call; and "pooled", today's FPSOSDatabase as the bot
+runs it. Indexes, migrations and the tag/ticket caches apply to both
+unpooled and pooled, so unpooled -> pooled is the pool alone and
+baseline -> pooled is everything since.
+
+Usage:
+    python benchmarks/bench_database.py                 # 10k and 1M rows
+    python benchmarks/bench_database.py --rows 10000 --ops 2000
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run from anywhere: make the bot package importable and keep the default
+# database created by `database.db` out of the working tree.
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+os.chdir(tempfile.mkdtemp(prefix='fpsos-bench-'))
+
+from database import FPSOSDatabase
+
+SAMPLE_DIAGNOSTIC = json.loads((BOT_DIR / 'test_diagnostic.json').read_text())
+
+
+class ConnectPerCallDatabase(FPSOSDatabase):
+    """Today's database with the pre-pool behaviour: a fresh default connection for every call"""
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+class BaselineDatabase:
+    """The original database.py for the benchmarked methods: its schema and SQL, one connection per call"""
+
+    SCHEMA = """
+        CREATE TABLE users (
+            discord_id TEXT PRIMARY KEY, username TEXT NOT NULL, email TEXT,
+            join_date DATETIME DEFAULT CURRENT_TIMESTAMP, referral_code TEXT UNIQUE, referred_by TEXT,
+            total_bookings INTEGER DEFAULT 0, total_diagnostics INTEGER DEFAULT 0, specs TEXT);
+        CREATE TABLE diagnostics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, json_data TEXT NOT NULL,
+            critical_count INTEGER DEFAULT 0, warning_count INTEGER DEFAULT 0, recommendation TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, service_type TEXT NOT NULL,
+            calendly_event_id TEXT UNIQUE, scheduled_date DATETIME, completed BOOLEAN DEFAULT 0,
+            payment_received BOOLEAN DEFAULT 0, amount_aed REAL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, channel_id TEXT NOT NULL,
+            status TEXT DEFAULT 'open', created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE tags (
+            name TEXT PRIMARY KEY, content TEXT NOT NULL, created_by TEXT,
+            usage_count INTEGER DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        conn.executescript(self.SCHEMA)
+        conn.close()
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _one(self, sql, params):
+        conn = self.get_connection()
+        result = conn.execute(sql, params).fetchone()
+        conn.close()
+        return dict(result) if result else None
+
+    def _write(self, *statements):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        for sql, params in statements:
+            cursor.execute(sql, params)
+        conn.commit()
+        conn.close()
+        return cursor.lastrowid
+
+    def add_user(self, discord_id, username, email=None):
+        self._write(('INSERT INTO users (discord_id, username, email) VALUES (?, ?, ?) '
+                     'ON CONFLICT(discord_id) DO UPDATE SET username = excluded.username, '
+                     'email = COALESCE(excluded.email, email)', (str(discord_id), username, email)))
+
+    def get_user(self, discord_id):
+        return self._one('SELECT * FROM users WHERE discord_id = ?', (str(discord_id),))
+
+    def save_diagnostic(self, user_id, json_data, critical_count, warning_count, recommendation):
+        return self._write(
+            ('INSERT INTO diagnostics (user_id, json_data, critical_count, warning_count, recommendation) '
+             'VALUES (?, ?, ?, ?, ?)', (str(user_id), json.dumps(json_data), critical_count, warning_count, recommendation)),
+            ('UPDATE users SET total_diagnostics = total_diagnostics + 1 WHERE discord_id = ?', (str(user_id),)),
+        )
+
+    def get_user_diagnostics(self, discord_id, limit=5):
+        conn = self.get_connection()
+        rows = conn.execute('SELECT * FROM diagnostics WHERE user_id = ? ORDER BY created_at DESC LIMIT ?',
+                            (str(discord_id), limit)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def create_booking(self, user_id, service_type, calendly_event_id=None, scheduled_date=None, amount_aed=None):
+        return self._write(
+            ('INSERT INTO bookings (user_id, service_type, calendly_event_id, scheduled_date, amount_aed) '
+             'VALUES (?, ?, ?, ?, ?)', (str(user_id), service_type, calendly_event_id, scheduled_date, amount_aed)),
+            ('UPDATE users SET total_bookings = total_bookings + 1 WHERE discord_id = ?', (str(user_id),)),
+        )
+
+    def get_booking_by_calendly_id(self, calendly_event_id):
+        return self._one('SELECT * FROM bookings WHERE calendly_event_id = ?', (calendly_event_id,))
+
+    def get_active_ticket(self, user_id):
+        return self._one("SELECT * FROM tickets WHERE user_id = ? AND status = 'open'", (str(user_id),))
+
+    def get_ticket_by_channel(self, channel_id):
+        return self._one("SELECT * FROM tickets WHERE channel_id = ? AND status = 'open'", (str(channel_id),))
+
+    def get_tag(self, name):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        result = cursor.execute('SELECT * FROM tags WHERE name = ?', (name.lower(),)).fetchone()
+        if result:
+            cursor.execute('UPDATE tags SET usage_count = usage_count + 1 WHERE name = ?', (name.lower(),))
+            conn.commit()
+        conn.close()
+        return dict(result) if result else None
+
+    def close(self):
+        pass
+
+
+def seed(db_path, rows):
+    """Bulk-load `rows` users, diagnostics, tickets and tags"""
+    conn = sqlite3.connect(db_path)
+    payload = json.dumps(SAMPLE_DIAGNOSTIC)
+    with conn:
+        conn.executemany(
+            'INSERT INTO users (discord_id, username) VALUES (?, ?)',
+            ((str(i), f'user{i}') for i in range(rows))
+        )
+        conn.executemany(
+            'INSERT INTO diagnostics (user_id, json_data, critical_count, warning_count, recommendation) VALUES (?, ?, 2, 5, ?)',
+            ((str(i), payload, 'extreme') for i in range(rows))
+        )
+        conn.executemany(
+            'INSERT INTO tickets (user_id, channel_id, status) VALUES (?, ?, ?)',
+            ((str(i), str(10**12 + i), 'open' if i % 10 == 0 else 'closed') for i in range(rows))
+        )
+        conn.executemany(
+            'INSERT INTO tags (name, content, created_by) VALUES (?, ?, ?)',
+            ((f'tag{i}', f'Content for tag {i}', 'bench') for i in range(min(rows, 10000)))
+        )
+    conn.close()
+
+
+def run_case(db, rows, ops):
+    """Return {method: microseconds per call}"""
+    probe = [str((i * 7919) % rows) for i in range(ops)]
+    cases = {
+        'get_user': lambda i: db.get_user(probe[i]),
+        'add_user': lambda i: db.add_user(probe[i], f'renamed{i}'),
+        'get_tag': lambda i: db.get_tag(f'tag{i % min(rows, 10000)}'),
+        'get_active_ticket': lambda i: db.get_active_ticket(probe[i]),
+        'get_ticket_by_channel': lambda i: db.get_ticket_by_channel(10**12 + int(probe[i])),
+        'get_booking_by_calendly_id': lambda i: db.get_booking_by_calendly_id(f'evt-{i}'),
+        'save_diagnostic': lambda i: db.save_diagnostic(probe[i], SAMPLE_DIAGNOSTIC, 2, 5, 'extreme'),
+        'get_user_diagnostics': lambda i: db.get_user_diagnostics(probe[i]),
+        'create_booking': lambda i: db.create_booking(probe[i], 'full', f'evt-{i}', None, 399),
+    }
+    timings = {}
+    for name, call in cases.items():
+        # Full-scan lookups get very slow at 1M rows; cap them so a run finishes
+        n = ops if rows <= 100000 or not name.startswith('get_') else min(ops, 50)
+        start = time.perf_counter()
+        for i in range(n):
+            call(i)
+        timings[name] = (time.perf_counter() - start) / n * 1e6
+    return timings
+
+
+SETUPS = (('baseline', BaselineDatabase), ('unpooled', ConnectPerCallDatabase), ('pooled', FPSOSDatabase))
+
+
+def bench(rows, ops):
+    results = {}
+    for label, cls in SETUPS:
+        workdir = tempfile.mkdtemp(prefix=f'fpsos-{label}-')
+        db_path = os.path.join(workdir, 'bench.db')
+        db = cls(db_path)
+        seed(db_path, rows)
+        results[label] = run_case(db, rows, ops)
+        db.close()
+
+    print(f'\n=== {rows:,} rows, {ops:,} ops per method (µs/call) ===')
+    print(f"{'method':<28}{'baseline':>10}{'unpooled':>10}{'pooled':>10}{'pool':>8}{'total':>8}")
+    for name in results['baseline']:
+        baseline, unpooled, pooled = (results[label][name] for label, _ in SETUPS)
+        print(f'{name:<28}{baseline:>10.1f}{unpooled:>10.1f}{pooled:>10.1f}'
+              f'{unpooled / pooled:>7.1f}x{baseline / pooled:>7.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 1000000])
+    parser.add_argument('--ops', type=int, default=1000)
+    args = parser.parse_args()
+    for rows in args.rows:
+        bench(rows, args.ops)
@@ -0,0 +1,212 @@
+"""
+FPSOS Embed Template Benchmark
+Builds the welcome, resources, diagnostic result and booking confirmation
+embeds the old way ("before": every string formatted and every field added
+per call) and from the precompiled utils.embed_templates ("after").
+Compares payload dicts, and discord.Embed objects when discord.py is
+installed.
+
+Usage:
+    python benchmarks/bench_embeds.py
+    python benchmarks/bench_embeds.py --calls 200000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.config import Colors
+from utils.embed_templates import build, load_templates, render
+
+try:
+    import discord
+except ImportError:
+    discord = None
+
+SYSTEM = {'cpu': 'AMD Ryzen 7 9800X3D', 'gpu': 'NVIDIA RTX 4080 SUPER', 'ram': 32, 'network': 'Intel I226-V 2.5GbE'}
+CRITICAL = ['HPET enabled', 'Game Mode disabled']
+WARNINGS = ['Power plan: Balanced', 'Nagle enabled', 'XMP off', 'Core isolation on', 'Overlay running', 'Old driver']
+
+
+class Payload:
+    """Just enough of discord.Embed's builder API to build its dict"""
+
+    def __init__(self, title, description, color):
+        self.data = {'title': title, 'description': description, 'color': color}
+
+    def add_field(self, name, value, inline=True):
+        self.data.setdefault('fields', []).append({'inline': inline, 'name': name, 'value': value})
+
+    def set_footer(self, text):
+        self.data['footer'] = {'text': text}
+
+    def set_thumbnail(self, url):
+        self.data['thumbnail'] = {'url': url}
+
+
+def old_welcome(Embed, name, avatar_url):
+    embed = Embed(
+        title=f"👋 Welcome to the Elite Circle, {name}!",
+        description=(
+            f"Glad to have you here, **{name}**.\n\n"
+            "We specialize in pushing **CS2 performance** to its absolute limit. "
+            "Whether you're looking for a quick fix or a complete system overhaul, we've got you covered.\n\n"
+            "**Let's start by analyzing your rig.**\n"
+            "Click **'Start System Profiling'** below so I can give you a personalized recommendation."
+        ),
+        color=Colors.FPSOS_BLUE
+    )
+    embed.set_thumbnail(url=avatar_url)
+    embed.set_footer(text="FPS Optimization Station • Official Bot")
+    return embed
+
+
+def old_resources(Embed):
+    embed = Embed(
+        title="🚀 FPSOS Optimization & Resource Hub",
+        description=(
+            "Everything you need to squeeze every frame out of your system and minimize input latency.\n\n"
+            "**Official Links & Tools:**"
+        ),
+        color=Colors.FPSOS_BLUE
+    )
+    embed.add_field(name="🌳 Linktree (DDU & NVCleanInstall)", value="👉 [linktr.ee/t1glish](https://linktr.ee/t1glish)\n*Download recommended DDU versions and NVCleanInstall profiles.*", inline=False)
+    embed.add_field(name="🔬 FPSOS CS2 Suite v4.0", value="👉 [Download Script](https://fpsos.gg/FPSOS-CS2-Suite.ps1)\n*Unified interrupt affinity, Process Lasso profiles, and system diagnostics.*", inline=True)
+    embed.add_field(name="📚 Optimization Guide", value="👉 [Read Guide](https://fpsos.gg/guides/basic-optimization)\n*Step-by-step walkthrough for a responsive system.*", inline=True)
+    embed.add_field(name="🛠️ Hardware Recommendations", value="Optimized for 9800X3D + RTX 40-series builds.", inline=False)
+    embed.set_footer(text="FPSOS.GG • Subtick-Perfect Performance")
+    return embed
+
+
+def old_diagnostic(Embed, name):
+    critical_count, warning_count = len(CRITICAL), len(WARNINGS)
+    embed = Embed(
+        title="🎯 Diagnostic Analysis Complete",
+        description=f"**Recommendation:** Extreme BIOSPRIME\n{critical_count} critical issues detected - requires deep BIOS optimization",
+        color=Colors.ERROR
+    )
+    sys_text = f"""
+    **CPU:** {SYSTEM.get('cpu', 'Unknown')}
+    **GPU:** {SYSTEM.get('gpu', 'Unknown')}
+    **RAM:** {SYSTEM.get('ram', 'Unknown')} GB
+    **Network:** {SYSTEM.get('network', 'Unknown')}
+    """
+    embed.add_field(name="💻 System", value=sys_text.strip(), inline=False)
+    critical_text = '\n'.join([f"❌ {issue}" for issue in CRITICAL[:5]])
+    embed.add_field(name=f"⚠️ Critical Issues ({critical_count})", value=critical_text, inline=False)
+    warning_text = '\n'.join([f"⚠️ {issue}" for issue in WARNINGS[:5]])
+    warning_text += f"\n... and {warning_count - 5} more"
+    embed.add_field(name=f"⚠️ Warnings ({warning_count})", value=warning_text, inline=False)
+    embed.add_field(name="💰 Investment", value='AED 699', inline=True)
+    embed.add_field(name="📊 Health Score", value=f"{max(0, 100 - (critical_count * 20 + warning_count * 5))}/100", inline=True)
+    embed.set_footer(text=f"Diagnostic saved • {name}")
+    return embed
+
+
+def old_booking(Embed):
+    embed = Embed(title="✅ Booking Confirmed!", description="Your **Full System Tune-Up** session is scheduled!", color=0x30D158)
+    embed.add_field(name="📅 Session Date", value='2026-10-20T18:00:00Z'.replace('T', ' ').replace('Z', ' UTC'), inline=False)
+    embed.add_field(name="💰 Price", value=f"AED {399}", inline=True)
+    embed.add_field(name="⏱️ Duration", value="3-4 hours", inline=True)
+    checklist = """
+    **Before your session:**
+    1. ✅ Install AnyDesk: https://anydesk.com/download
+    2. ✅ Update GPU drivers to latest version
+    3. ✅ Close all games and applications
+    4. ✅ Join FPSOS Discord voice channel 15 minutes before
+    5. ✅ Have payment ready (bank transfer or card)
+
+    **What to expect:**
+    • Full system diagnostic review
+    • Windows and game optimizations
+    • Network optimization for CS2
+    • BIOS tweaks (if Extreme package)
+    • Before/after performance testing
+    """
+    embed.add_field(name="📋 Pre-Session Checklist", value=checklist.strip(), inline=False)
+    embed.set_footer(text="See you soon! - FPSOS Team")
+    return embed
+
+
+def new_diagnostic(make, name):
+    """The render call in utils/diagnostics.py"""
+    critical_count, warning_count = len(CRITICAL), len(WARNINGS)
+    warning_text = '\n'.join([f"⚠️ {issue}" for issue in WARNINGS[:5]])
+    warning_text += f"\n... and {warning_count - 5} more"
+    return make(
+        'diagnostic_result',
+        package_name='Extreme BIOSPRIME',
+        reason=f"{critical_count} critical issues detected - requires deep BIOS optimization",
+        color=Colors.ERROR,
+        has_system=True,
+        cpu=SYSTEM.get('cpu', 'Unknown'),
+        gpu=SYSTEM.get('gpu', 'Unknown'),
+        ram=SYSTEM.get('ram', 'Unknown'),
+        network=SYSTEM.get('network', 'Unknown'),
+        critical_count=critical_count,
+        critical='\n'.join([f"❌ {issue}" for issue in CRITICAL[:5]]),
+        warning_count=warning_count,
+        warnings=warning_text,
+        price='AED 699',
+        score=max(0, 100 - (critical_count * 20 + warning_count * 5)),
+        status='Diagnostic saved',
+        name=name,
+    )
+
+
+def cases(level):
+    """(template, before call, after call) for `level` 'payload' or 'embed'"""
+    if level == 'payload':
+        Embed, make, finish = Payload, build, (lambda embed: embed.data)
+    else:
+        Embed, make, finish = discord.Embed, render, (lambda embed: embed)
+    avatar = 'https://cdn.discordapp.com/embed/avatars/0.png'
+    return [
+        ('welcome', lambda: finish(old_welcome(Embed, 'newplayer', avatar)),
+         lambda: make('welcome', name='newplayer', avatar_url=avatar)),
+        ('resources', lambda: finish(old_resources(Embed)), lambda: make('resources')),
+        ('diagnostic_result', lambda: finish(old_diagnostic(Embed, 'newplayer')),
+         lambda: new_diagnostic(make, 'newplayer')),
+        ('booking_confirmed', lambda: finish(old_booking(Embed)),
+         lambda: make('booking_confirmed', service_name='Full System Tune-Up',
+                      scheduled_time='2026-10-20T18:00:00Z'.replace('T', ' ').replace('Z', ' UTC'), amount_aed=399)),
+    ]
+
+
+def time_call(call, calls, repeats=7):
+    """Best microseconds per call over `repeats` runs (the least disturbed by other load)"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            call()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return min(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    load_templates()
+    print(f"\nload + validate embed_templates.json: {(time.perf_counter() - start) * 1000:.2f}ms (once, at import)")
+
+    for level in ('payload', 'embed'):
+        if level == 'embed' and discord is None:
+            print("\n(discord.py not installed: skipping discord.Embed timings)")
+            continue
+        print(f"\n== {level}: µs per build, {args.calls:,} calls ==")
+        print(f"{'template':<20}{'before':>10}{'after':>10}{'speedup':>10}")
+        for name, before, after in cases(level):
+            old, new = time_call(before, args.calls), time_call(after, args.calls)
+            print(f"{name:<20}{old:>10.2f}{new:>10.2f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+FPSOS Diagnostic Ingestion Benchmark
+Serves generated diagnostic uploads of each size over local HTTP and reads
+them the old way ("before": attachment.read(), decode, json.loads) and with
+utils.ingest.read_diagnostic ("after", at the default size limit and with
+the limit lifted). The padding is a large `logs` array placed after the
+sections the bot reads ("first") or before them ("last"). Each read runs in
+its own process; reports peak RSS above the process baseline and latency.
+
+Usage:
+    python benchmarks/bench_ingest.py
+    python benchmarks/bench_ingest.py --sizes 10KB 10MB 200MB 1GB
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SECTIONS = {
+    'system': {'cpu': 'AMD Ryzen 5 5600', 'gpu': 'NVIDIA RTX 3060', 'ram': 16, 'network': 'WiFi'},
+    'issues': {'critical': ['HPET enabled', 'Integrated GPU detected'],
+               'warnings': ['Power plan: Balanced', 'Game Mode: OFF', 'Overlays running']},
+    'performance': {'current_fps': 85, 'target_fps': 240, 'latency_ms': 45},
+}
+UNITS = {'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+
+def parse_size(text):
+    return int(float(text[:-2]) * UNITS[text[-2:].upper()])
+
+
+def write_upload(path, size, layout):
+    """A diagnostic of about `size` bytes, padded with a `logs` array of 1 KB lines"""
+    sections = json.dumps(SECTIONS)[1:-1]
+    line = json.dumps('x' * 1000)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{' + sections + ', ' if layout == 'first' else '{')
+        f.write('"logs": [')
+        written = 0
+        while written < size - len(sections) - 32:
+            f.write(line if written == 0 else ',' + line)
+            written += len(line) + 1
+        f.write(']' + (', ' + sections if layout == 'last' else '') + ', "timestamp": "2026-01-12T00:00:00Z"}')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else float('nan')
+
+
+class Attachment:
+    def __init__(self, url, size):
+        self.url = url
+        self.size = size
+
+
+async def read_before(url):
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            file_bytes = await response.read()  # What attachment.read() does
+    return json.loads(file_bytes.decode('utf-8'))
+
+
+async def read_after(url, size, max_bytes):
+    from utils.ingest import IngestError, read_diagnostic
+
+    try:
+        return await read_diagnostic(Attachment(url, size), max_bytes=max_bytes)
+    except IngestError as e:
+        return f'rejected: {e}'
+
+
+def child(mode, url, size):
+    """One read in a fresh process: prints {"rss_mb", "ms", "outcome"} as JSON"""
+    import aiohttp  # noqa: F401  (imported before the baseline so it is not counted)
+    import utils.ingest  # noqa: F401
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'before':
+        result = asyncio.run(read_before(url))
+    elif mode == 'after':
+        result = asyncio.run(read_after(url, size, utils.ingest.DIAGNOSTIC_MAX_BYTES))
+    else:
+        result = asyncio.run(read_after(url, size, float('inf')))
+    elapsed = (time.perf_counter() - start) * 1000
+    if isinstance(result, dict):
+        outcome = 'ok' if all(result.get(key) == value for key, value in SECTIONS.items()) else 'WRONG'
+    else:
+        outcome = result
+    print(json.dumps({'rss_mb': peak_rss_mb() - baseline, 'ms': elapsed, 'outcome': outcome}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['10KB', '10MB', '200MB'])
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'URL', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        mode, url, size = args.child
+        return child(mode, url, int(size))
+
+    workdir = Path(tempfile.mkdtemp(prefix='fpsos-bench-'))
+    port = free_port()
+    server = subprocess.Popen([sys.executable, '-m', 'http.server', str(port), '--bind', '127.0.0.1'],
+                              cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(1)
+        modes = [('before', 'before'), ('after', 'after'), ('unlimited', 'after, no size limit')]
+        print(f"\n{'upload':<16}{'read':<24}{'peak RSS':>12}{'latency':>12}  outcome")
+        for text in args.sizes:
+            size = parse_size(text)
+            for layout in ('first', 'last'):
+                name = f'{text}-{layout}.json'
+                write_upload(workdir / name, size, layout)
+                actual = (workdir / name).stat().st_size
+                for mode, label in modes:
+                    output = subprocess.run(
+                        [sys.executable, __file__, '--child', mode, f'http://127.0.0.1:{port}/{name}', str(actual)],
+                        capture_output=True, text=True,
+                    )
+                    if output.returncode:
+                        print(f"{text + ' ' + layout:<16}{label:<24}  failed: {output.stderr.strip().splitlines()[-1]}")
+                        continue
+                    row = json.loads(output.stdout.strip().splitlines()[-1])
+                    print(f"{text + ' ' + layout:<16}{label:<24}{row['rss_mb']:>10.1f}MB{row['ms']:>10.1f}ms  {row['outcome']}")
+                (workdir / name).unlink()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+FPSOS Intent Engine Benchmark
+Classifies DM-style messages against N synthetic intents, comparing one
+`any(word in text ...)` scan per intent ("before") with the compiled
+IntentMatcher ("after"). Also times a recompile, which happens once per
+admin change.
+
+Usage:
+    python benchmarks/bench_intents.py
+    python benchmarks/bench_intents.py --intents 50 200 --messages 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.intents import IntentMatcher, normalize
+
+WORDS = (
+    'fps stutter lag input delay ping packet loss driver nvidia amd ryzen intel bios xmp ram '
+    'timings latency monitor hz refresh vsync gsync freesync launch options config cfg faceit '
+    'premier rank crosshair sensitivity mouse polling rate keyboard headset audio windows update '
+    'defender services startup temps thermal throttle overclock undervolt gpu cpu ssd nvme'
+).split()
+
+
+def make_phrases(intent_count, rng):
+    """greeting/booking as seeded by the migration, plus synthetic keyword intents"""
+    phrases = [
+        {'intent': 'greeting', 'phrase': p, 'match': 'exact', 'priority': 10}
+        for p in ('hi', 'hello', 'hey', 'hello bot', 'yo')
+    ] + [
+        {'intent': 'booking', 'phrase': p, 'match': 'keyword', 'priority': 0}
+        for p in ('book', 'session', 'schedule', 'calendar', 'appointment', 'packages', 'pricing')
+    ]
+    for i in range(intent_count - 2):
+        for _ in range(rng.randint(4, 10)):
+            phrase = ' '.join(rng.sample(WORDS, rng.randint(1, 2))) + f' {i}'
+            phrases.append({'intent': f'intent{i}', 'phrase': phrase, 'match': 'keyword', 'priority': rng.randint(0, 5)})
+    return phrases
+
+
+def make_messages(count, phrases, rng):
+    keywords = [p['phrase'] for p in phrases if p['match'] == 'keyword']
+    messages = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(4, 25))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        elif rng.random() < 0.05:
+            words = ['hello']
+        messages.append(' '.join(words))
+    return messages
+
+
+def make_naive(phrases):
+    """The old shape: an exact-match list, then one linear scan per intent"""
+    exact, keywords = {}, {}
+    for p in phrases:
+        target = exact if p['match'] == 'exact' else keywords
+        target.setdefault(p['intent'], []).append(p['phrase'])
+
+    def classify(text):
+        clean = text.strip().lower()
+        for intent, words in exact.items():
+            if clean in words:
+                return intent
+        for intent, words in keywords.items():
+            if any(word in clean for word in words):
+                return intent
+        return None
+    return classify
+
+
+def bench(intent_count, message_count):
+    rng = random.Random(intent_count)
+    phrases = make_phrases(intent_count, rng)
+    messages = make_messages(message_count, phrases, rng)
+
+    start = time.perf_counter()
+    matcher = IntentMatcher(phrases)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    results = {}
+    for name, classify in (('before', make_naive(phrases)), ('after', matcher.match)):
+        start = time.perf_counter()
+        hits = sum(1 for text in messages if classify(text))
+        results[name] = (message_count / (time.perf_counter() - start), hits)
+
+    before, after = results['before'][0], results['after'][0]
+    print(f"\n== {intent_count} intents, {len(phrases)} phrases, {message_count:,} messages ==")
+    print(f"compile: {compile_ms:.1f} ms")
+    print(f"{'before (scan per intent)':<28}{before:>12,.0f} msg/s  ({results['before'][1]:,} matched)")
+    print(f"{'after (compiled)':<28}{after:>12,.0f} msg/s  ({results['after'][1]:,} matched)  {after / before:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--intents', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    for count in args.intents:
+        bench(count, args.messages)
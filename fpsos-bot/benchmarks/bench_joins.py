@@ -0,0 +1,137 @@
+"""
+FPSOS Join Burst Benchmark
+Replays a join raid against a throwaway database and a fake Discord that
+answers 429 to more than 10 DMs per 5 s (a stand-in for Discord's
+undocumented limit on DMs to new contacts). Compares the old
+on_member_join ("before": one add_user transaction and an immediate welcome
+DM per join) with utils.join_pipeline ("after"). Reports commits,
+event-loop stalls, 429s and the backlog gauge.
+
+Usage:
+    python benchmarks/bench_joins.py
+    python benchmarks/bench_joins.py --joins 2000 --seconds 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+os.chdir(tempfile.mkdtemp(prefix='fpsos-bench-'))
+
+from async_database import AsyncFPSOSDatabase
+from database import FPSOSDatabase
+from utils.join_pipeline import JoinPipeline
+
+SCALE = 10  # Simulated seconds per real second; loop stalls are reported unscaled
+
+
+class Member:
+    def __init__(self, member_id):
+        self.id = member_id
+        self.name = f'raider{member_id}'
+
+
+class FakeDM:
+    """10 DMs per 5 s across the bot, a 429 otherwise"""
+
+    def __init__(self):
+        self.recent = deque()
+        self.sent = 0
+        self.rejected = 0
+
+    async def send(self, member):
+        await asyncio.sleep(0.08 / SCALE)
+        now = time.perf_counter() * SCALE
+        while self.recent and self.recent[0] <= now - 5.0:
+            self.recent.popleft()
+        if len(self.recent) >= 10:
+            self.rejected += 1
+            return
+        self.recent.append(now)
+        self.sent += 1
+
+
+class CountingDatabase(FPSOSDatabase):
+    commits = 0
+
+    def add_user(self, *args, **kwargs):
+        CountingDatabase.commits += 1
+        return super().add_user(*args, **kwargs)
+
+    def bulk_upsert_users(self, users):
+        CountingDatabase.commits += 1
+        return super().bulk_upsert_users(users)
+
+
+async def watch_loop(stalls, stop):
+    """Record how late a 10 ms timer fires, i.e. how long the loop was busy"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append((time.perf_counter() - start - 0.01) * 1000)
+
+
+async def run(mode, joins, seconds):
+    CountingDatabase.commits = 0
+    sync = CountingDatabase(f'joins-{mode}.db')
+    adb = AsyncFPSOSDatabase(sync)
+    dm = FakeDM()
+    stalls, stop = [], asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stalls, stop))
+    peak = {'upserts': 0, 'welcomes': 0}
+
+    pipeline = JoinPipeline(adb.bulk_upsert_users, dm.send, flush_interval=1.0 / SCALE,
+                            welcomes_per_second=2.0 * SCALE)
+    handlers = []
+
+    async def on_member_join(member):
+        await adb.add_user(member.id, member.name)
+        await dm.send(member)
+
+    start = time.perf_counter()
+    for member_id in range(joins):
+        member = Member(member_id)
+        if mode == 'before':
+            handlers.append(asyncio.create_task(on_member_join(member)))
+        else:
+            pipeline.submit(member)
+            backlog = pipeline.backlog
+            peak = {key: max(peak[key], backlog[key]) for key in peak}
+        await asyncio.sleep(seconds / joins / SCALE)
+
+    if mode == 'before':
+        await asyncio.gather(*handlers)
+    else:
+        while pipeline.backlog['upserts']:
+            await asyncio.sleep(0.01)
+    persisted = (time.perf_counter() - start) * SCALE
+    await pipeline.close()
+
+    stop.set()
+    await watcher
+    await adb.close()
+
+    stalls.sort()
+    print(f"\n== {mode}: {joins:,} joins over {seconds:g}s ==")
+    print(f"db commits: {CountingDatabase.commits:,}  all joins persisted after {persisted:.1f}s")
+    print(f"welcome DMs: {dm.sent:,} delivered, {dm.rejected:,} answered 429")
+    print(f"loop stall: p50 {statistics.median(stalls):.2f}ms  p99 {stalls[int(len(stalls) * 0.99) - 1]:.2f}ms  max {stalls[-1]:.2f}ms")
+    if mode == 'after':
+        print(f"peak backlog: {peak['upserts']:,} upserts, {peak['welcomes']:,} welcomes ({pipeline.welcome_dropped:,} dropped)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--joins', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=60)
+    args = parser.parse_args()
+    for mode in ('before', 'after'):
+        asyncio.run(run(mode, args.joins, args.seconds))
@@ -0,0 +1,76 @@
+"""
+FPSOS Rate Limiter Benchmark
+Cost per check and memory of utils.rate_limit.RateLimiter under two loads:
+a steady population of users (idle buckets are swept as they refill) and a
+flood of distinct keys (memory stays capped by max_keys).
+
+Usage:
+    python benchmarks/bench_rate_limit.py
+    python benchmarks/bench_rate_limit.py --calls 1000000 --max-keys 10000
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.rate_limit import RateLimiter
+
+
+class FakeClock:
+    """Simulated time so a day of traffic runs in seconds"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def replay(keys, actions, max_keys, seconds_per_call):
+    clock = FakeClock()
+    limiter = RateLimiter(max_keys=max_keys, clock=clock)
+    for key, action in zip(keys, actions):
+        clock.now += seconds_per_call
+        limiter.hit(action, key)
+    return limiter, clock
+
+
+def run(name, keys, calls, max_keys, seconds_per_call):
+    actions = list(RateLimiter().limits)
+    actions = (actions * (calls // len(actions) + 1))[:calls]
+
+    start = time.perf_counter()
+    limiter, clock = replay(keys, actions, max_keys, seconds_per_call)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    replay(keys, actions, max_keys, seconds_per_call)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = limiter.stats()
+    print(f"\n== {name}: {calls:,} checks over {clock.now / 3600:.1f} simulated hours ==")
+    print(f"per check:     {elapsed / calls * 1e9:,.0f} ns")
+    print(f"tracked keys:  {stats['tracked_keys']:,} (cap {max_keys:,}), evicted by cap: {stats['evicted']:,}")
+    print(f"peak memory:   {peak / 1024:,.0f} KiB")
+    print(f"rejected:      {sum(stats['rejected'].values()):,}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=500000)
+    parser.add_argument('--max-keys', type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # 5,000 members, a few of them chatty, one message every ~0.2 s
+    population = [int(rng.paretovariate(1.1) * 10) % 5000 for _ in range(args.calls)]
+    run('steady population', population, args.calls, args.max_keys, 0.2)
+    # Every call from a new key, e.g. a spoofed-IP flood on the control plane
+    run('distinct-key flood', list(range(args.calls)), args.calls, args.max_keys, 0.001)
@@ -0,0 +1,82 @@
+"""
+FPSOS Modmail Relay Benchmark
+Replays bursty modmail traffic (users typing several short messages in a
+row) through utils.relay.MessageRelay and counts Discord API calls against
+the old one send + one reaction per message. Time is scaled down 20x so the
+run takes seconds; latencies are reported at real scale.
+
+Usage:
+    python benchmarks/bench_relay.py
+    python benchmarks/bench_relay.py --tickets 50 --bursts 20 --window 1.5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.relay import MessageRelay, RelayItem
+
+SCALE = 20  # Simulated seconds per real second
+
+
+async def simulate(tickets, bursts, window, rng):
+    calls = {'send': 0, 'ack': 0}
+    pending = {ticket: [] for ticket in range(tickets)}  # ticket -> [(seq, submit time)] not yet acked
+    latencies = []
+
+    async def send(destination, blocks):
+        calls['send'] += 1
+        await asyncio.sleep(0.05 / SCALE)  # API round trip
+
+    async def ack(item):
+        calls['ack'] += 1
+        now = time.perf_counter()
+        ticket, seq = item.source
+        queue = pending[ticket]
+        while queue and queue[0][0] <= seq:
+            latencies.append((now - queue.pop(0)[1]) * SCALE)
+
+    relay = MessageRelay(send, ack, window=window / SCALE)
+
+    async def user(ticket):
+        seq = 0
+        for _ in range(bursts):
+            for _ in range(rng.randint(1, 7)):
+                text = ' '.join(rng.choices(('fps', 'drops', 'after', 'update', 'help', 'still', 'lag'), k=rng.randint(1, 12)))
+                seq += 1
+                pending[ticket].append((seq, time.perf_counter()))
+                relay.submit(ticket, RelayItem(f'user{ticket}', None, text, None, (ticket, seq)))
+                await asyncio.sleep(rng.uniform(0.3, 1.2) / SCALE)  # Typing the next line
+            await asyncio.sleep(rng.uniform(10, 60) / SCALE)  # Waiting for staff
+
+    await asyncio.gather(*(user(t) for t in range(tickets)))
+    await relay.drain()
+    return relay.received, calls, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=20)
+    parser.add_argument('--bursts', type=int, default=10)
+    parser.add_argument('--window', type=float, default=1.5, help="Coalescing window in seconds")
+    args = parser.parse_args()
+
+    messages, calls, latencies = asyncio.run(simulate(args.tickets, args.bursts, args.window, random.Random(0)))
+    before = messages * 2
+    after = calls['send'] + calls['ack']
+    latencies.sort()
+    print(f"\n== {args.tickets} tickets, {messages:,} relayed messages, {args.window}s window ==")
+    print(f"API calls before (send + reaction each): {before:,}")
+    print(f"API calls after ({calls['send']:,} sends + {calls['ack']:,} reactions): {after:,}  ({1 - after / before:.0%} fewer)")
+    print(f"added delivery delay: p50 {statistics.median(latencies):.2f}s, p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
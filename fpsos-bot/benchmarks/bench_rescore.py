@@ -0,0 +1,68 @@
+"""
+FPSOS Recommendation Re-score Benchmark
+Re-evaluates synthetic diagnostics rows against recommendation_rules.json
+per row through the compiled evaluator ("per row") and in one vectorized
+pass over NumPy columns ("numpy", what `manage.py rescore-diagnostics`
+does), checks that both agree, and reports the time per pass.
+
+Usage:
+    python benchmarks/bench_rescore.py
+    python benchmarks/bench_rescore.py --rows 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+import numpy as np
+
+from utils.recommendations import rules
+
+
+def synthetic(rows, seed=7):
+    """{feature: list} like get_diagnostic_features returns, with ~10% missing values"""
+    rng = random.Random(seed)
+    columns = {feature: [] for feature in rules.features}
+    for _ in range(rows):
+        for feature, values in columns.items():
+            values.append(None if rng.random() < 0.1 else float(rng.randint(0, 6)))
+    return columns
+
+
+def per_row(columns, rows):
+    match = rules._match
+    names = list(columns)
+    return [match(dict(zip(names, values))) for values in zip(*(columns[name] for name in names))]
+
+
+def vectorized(columns, rows):
+    arrays = {feature: np.array(values, dtype=float) for feature, values in columns.items()}
+    return rules.evaluate_many(arrays, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"\nrules v{rules.version}: {len(rules.rules)} rules over {', '.join(rules.features)}")
+    print(f"{'rows':>10}{'per row':>12}{'numpy':>12}{'speedup':>10}")
+    for rows in args.rows:
+        columns = synthetic(rows)
+        start = time.perf_counter()
+        expected = per_row(columns, rows)
+        slow = time.perf_counter() - start
+        start = time.perf_counter()
+        codes = vectorized(columns, rows)
+        fast = time.perf_counter() - start
+        assert codes.tolist() == expected, "vectorized rules disagree with the compiled evaluator"
+        print(f"{rows:>10,}{slow * 1000:>10.0f}ms{fast * 1000:>10.0f}ms{slow / fast:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+FPSOS Message Router Benchmark
+Messages per second through on_message, comparing the old if-chain ("before")
+with the compiled MessageRouter ("after"). Uses fake message objects and
+no-op handlers, so it measures routing overhead only; the old chain's
+per-message `get_active_ticket` call and `process_commands` are stubbed as
+single awaits.
+
+Usage:
+    python benchmarks/bench_router.py
+    python benchmarks/bench_router.py --messages 500000 --chatter 0.95
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.router import MessageRouter
+
+
+class TextChannel(SimpleNamespace):
+    pass
+
+
+class DMChannel(SimpleNamespace):
+    pass
+
+
+BOT_USER = object()
+AUTHOR = SimpleNamespace(id=42, name='player', bot=False)
+GUILD = object()
+
+
+def make_messages(count, chatter):
+    """A deterministic mix of guild chatter, ?tags, ticket replies and DMs"""
+    rng = random.Random(7)
+    general = TextChannel(id=1, name='general')
+    ticket = TextChannel(id=2, name='ticket-player')
+    dm = DMChannel(id=3)
+    upload = [SimpleNamespace(filename='diag.json', url='')]
+    messages = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < chatter:
+            msg = dict(content=rng.choice(['gg', 'anyone up for faceit?', 'my fps dropped after the update', 'lol']), guild=GUILD, channel=general, attachments=[])
+        else:
+            kind = rng.randrange(5)
+            if kind == 0:
+                msg = dict(content='?bios', guild=GUILD, channel=general, attachments=[])
+            elif kind == 1:
+                msg = dict(content='we are looking into it', guild=GUILD, channel=ticket, attachments=[])
+            elif kind == 2:
+                msg = dict(content='hello', guild=None, channel=dm, attachments=[])
+            elif kind == 3:
+                msg = dict(content='', guild=None, channel=dm, attachments=upload)
+            else:
+                msg = dict(content='!fpsos', guild=GUILD, channel=general, attachments=[])
+        messages.append(SimpleNamespace(author=AUTHOR, **msg))
+    return messages
+
+
+async def db_call(*args):
+    """Stand-in for an awaited database read"""
+    await asyncio.sleep(0)
+
+
+async def legacy_on_message(message):
+    """The pre-router if-chain from bot.py, with handlers stubbed"""
+    if message.author == BOT_USER:
+        return
+
+    content = message.content.strip()
+    clean_content = content.lower()
+
+    if content.startswith('?'):
+        tag_name = clean_content[1:].strip()
+        if tag_name:
+            await db_call(tag_name)
+
+    if isinstance(message.channel, TextChannel) and message.channel.name.startswith('ticket-'):
+        await db_call(message.channel.id)
+        return
+
+    if isinstance(message.channel, DMChannel):
+        if message.attachments:
+            for attachment in message.attachments:
+                if attachment.filename.endswith('.json'):
+                    return
+        await db_call(message.author.id)
+        if clean_content in ["hi", "hello", "hey", "hello bot", "yo"]:
+            return
+        if any(word in clean_content for word in ["book", "session", "schedule", "calendar", "appointment", "packages", "pricing"]):
+            return
+
+    await db_call(message)  # bot.process_commands
+
+
+def make_router():
+    router = MessageRouter(
+        is_ticket_channel=lambda channel: isinstance(channel, TextChannel) and channel.name.startswith('ticket-')
+    )
+
+    async def handled(message):
+        await db_call(message)
+        return True
+
+    for route in ('tag', 'ticket', 'upload', 'dm', 'command'):
+        router.route(route)(handled)
+    router.compile()
+    return router
+
+
+async def run(handler, messages):
+    start = time.perf_counter()
+    for message in messages:
+        if message.author == BOT_USER:
+            continue
+        await handler(message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+async def main(count, chatter):
+    messages = make_messages(count, chatter)
+    router = make_router()
+    before = await run(legacy_on_message, messages)
+    after = await run(router.dispatch, messages)
+    print(f"{count:,} messages, {chatter:.0%} plain guild chatter")
+    print(f"{'before (if-chain)':<22}{before:>14,.0f} msg/s")
+    print(f"{'after (router)':<22}{after:>14,.0f} msg/s   {after / before:.1f}x")
+    print(f"router: {router.skipped:,} dropped on the fast path, {router.dispatched:,} dispatched")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--chatter', type=float, default=0.9, help="Share of plain guild messages")
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.chatter))
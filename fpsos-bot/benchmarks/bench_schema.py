@@ -0,0 +1,169 @@
+"""
+FPSOS Diagnostic Schema Benchmark
+Runs parsed diagnostic uploads through the work the upload handler does
+before its database write (issue counts, indexed fields, result embed) as it
+was ("unchecked") and behind the compiled validator from
+utils.diagnostic_schema ("checked"). Also times the validator on its own,
+against a plain recursive walk of the same schema ("interpreted"), and how
+fast malformed uploads are turned away, which the unchecked path would
+have stored and rendered.
+
+Usage:
+    python benchmarks/bench_schema.py
+    python benchmarks/bench_schema.py --calls 200000
+"""
+
+import argparse
+import copy
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from database import extract_diagnostic_fields
+from utils.config import Colors
+from utils.diagnostic_schema import DiagnosticInvalid, SCHEMA_PATH, _kind, load_schema, schema
+from utils.embed_templates import build
+
+VALID = {
+    'system': {'cpu': 'AMD Ryzen 7 9800X3D', 'gpu': 'NVIDIA RTX 4080 SUPER', 'ram': 32, 'network': 'Intel I226-V 2.5GbE'},
+    'issues': {'critical': ['HPET enabled', 'Game Mode disabled'],
+               'warnings': ['Power plan: Balanced', 'Nagle enabled', 'XMP off', 'Core isolation on', 'Overlay running']},
+    'performance': {'current_fps': 212, 'target_fps': 400, 'latency_ms': 11.5},
+}
+
+
+def invalid(**changes):
+    data = copy.deepcopy(VALID)
+    for path, value in changes.items():
+        section, key = path.split('__')
+        data[section][key] = value
+    return data
+
+
+BAD = [
+    ('critical is a string', invalid(issues__critical='HPET enabled')),
+    ('50k warnings', invalid(issues__warnings=['Overlay running'] * 50_000)),
+    ('fps NaN, ram 1e9', invalid(performance__current_fps=math.nan, system__ram=1e9)),
+    ('10 KB cpu name', invalid(system__cpu='x' * 10_000)),
+]
+
+
+def unchecked(data):
+    """What utils/diagnostics.py does with an upload before saving it"""
+    system_info = data.get('system', {})
+    issues = data.get('issues', {})
+    critical_issues = issues.get('critical', [])
+    warning_issues = issues.get('warnings', [])
+    critical_count, warning_count = len(critical_issues), len(warning_issues)
+    fields = extract_diagnostic_fields(data)
+    warning_text = '\n'.join([f"⚠️ {issue}" for issue in warning_issues[:5]])
+    embed = build(
+        'diagnostic_result',
+        package_name='Extreme BIOSPRIME',
+        reason=f"{critical_count} critical issues detected - requires deep BIOS optimization",
+        color=Colors.ERROR,
+        has_system=bool(system_info),
+        cpu=system_info.get('cpu', 'Unknown'),
+        gpu=system_info.get('gpu', 'Unknown'),
+        ram=system_info.get('ram', 'Unknown'),
+        network=system_info.get('network', 'Unknown'),
+        critical_count=critical_count,
+        critical='\n'.join([f"❌ {issue}" for issue in critical_issues[:5]]),
+        warning_count=warning_count,
+        warnings=warning_text,
+        price='AED 699',
+        score=max(0, 100 - (critical_count * 20 + warning_count * 5)),
+        status='Diagnostic saved',
+        name='newplayer',
+    )
+    return fields, embed
+
+
+def checked(data):
+    try:
+        schema.validate(data)
+    except DiagnosticInvalid as e:
+        return e
+    return unchecked(data)
+
+
+def interpreted(spec, value, path, errors):
+    """The same rules walked from the schema dict on every call"""
+    types = spec['type'] if isinstance(spec['type'], list) else [spec['type']]
+    kind = _kind(value)
+    if kind not in types:
+        errors.append((path, f"Expected {' or '.join(types)}, received {kind}"))
+    elif kind == 'object':
+        for key, child in spec.get('properties', {}).items():
+            if value.get(key) is not None:
+                interpreted(child, value[key], f'{path}.{key}' if path else key, errors)
+    elif kind == 'array':
+        if len(value) > spec.get('max_items', math.inf):
+            errors.append((path, f"Array must contain at most {spec['max_items']} element(s)"))
+        else:
+            for index, item in enumerate(value):
+                interpreted(spec['items'], item, f'{path}[{index}]', errors)
+    elif kind == 'string':
+        if not spec.get('min_length', 0) <= len(value) <= spec.get('max_length', math.inf):
+            errors.append((path, 'String length out of range'))
+    elif not spec.get('min', -math.inf) <= value <= spec.get('max', math.inf):
+        errors.append((path, 'Number out of range'))
+    return errors
+
+
+def time_call(call, calls, repeats=5):
+    """Best microseconds per call over `repeats` runs (the least disturbed by other load)"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            call()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return min(samples)
+
+
+def row(label, us, base=None, outcome=''):
+    ratio = f'{us / base:>12.2f}x' if base else ''
+    print(f"{label:<36}{us:>9.2f}us{1e6 / us:>14,.0f}/s{ratio}{'  ' + outcome if outcome else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=50000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    load_schema()
+    print(f"\ncompile diagnostic_schema.json: {(time.perf_counter() - start) * 1000:.2f}ms (once, at import)")
+    with open(SCHEMA_PATH, encoding='utf-8') as f:
+        spec = json.load(f)
+    spec.pop('version')
+    assert not schema.errors(VALID) and not interpreted(spec, VALID, '', [])
+
+    print(f"\n{'valid upload':<36}{'per call':>11}{'throughput':>16}{'vs unchecked':>14}")
+    base = time_call(lambda: unchecked(VALID), args.calls)
+    row('unchecked (counts, fields, embed)', base)
+    row('checked (compiled validator first)', time_call(lambda: checked(VALID), args.calls), base)
+    row('  compiled validator alone', time_call(lambda: schema.errors(VALID), args.calls), base)
+    row('  interpreted validator alone', time_call(lambda: interpreted(spec, VALID, '', []), args.calls), base)
+
+    print(f"\n{'malformed upload':<36}{'per call':>11}{'throughput':>16}  outcome")
+    for label, data in BAD:
+        try:
+            fields, embed = unchecked(data)
+            outcome = f"stored: ram_gb={fields['ram_gb']}, fps={fields['current_fps']}, {embed['fields'][1]['name']}"
+        except Exception as e:
+            outcome = f'crashed: {type(e).__name__}'
+        field, message = schema.errors(data)[0]
+        print(label)
+        row('  unchecked', time_call(lambda: unchecked(data), args.calls), outcome=outcome)
+        row('  checked', time_call(lambda: checked(data), args.calls), outcome=f'rejected: {field}: {message}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+FPSOS Send Scheduler Benchmark
+A join raid's welcome DMs plus a news post land while modmail and
+interaction follow-ups keep flowing. A fake Discord enforces per-route and
+global (50/s) limits and answers 429 when they are exceeded; callers retry
+after retry_after as discord.py does. Compares sending directly ("before")
+with going through utils.send_scheduler ("after"). Time is scaled down 20x;
+latencies are reported at real scale.
+
+Usage:
+    python benchmarks/bench_send_scheduler.py
+    python benchmarks/bench_send_scheduler.py --welcome 1000 --seconds 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+
+from utils.send_scheduler import SendScheduler, ROUTE_LIMITS, GLOBAL_LIMIT, INTERACTION, MODMAIL, BROADCAST, route_key
+
+SCALE = 20
+
+
+class RateLimited(Exception):
+    status = 429
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+
+
+class FakeDiscord:
+    """Sliding-window limits per route and globally, with a fixed API latency"""
+
+    def __init__(self):
+        self.hits = defaultdict(deque)  # route -> recent request times (simulated seconds)
+        self.requests = 0
+        self.rejections = 0
+
+    def now(self):
+        return time.perf_counter() * SCALE
+
+    def _check(self, key, limit, window):
+        now, hits = self.now(), self.hits[key]
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return hits[0] + window - now
+        hits.append(now)
+        return 0
+
+    async def send(self, route):
+        self.requests += 1
+        await asyncio.sleep(0.08 / SCALE)
+        limit, window = ROUTE_LIMITS[route.split(':')[0]]
+        wait = self._check('global', *GLOBAL_LIMIT) or self._check(route, limit, window)
+        if wait:
+            self.rejections += 1
+            raise RateLimited(wait)
+
+
+async def direct(discord, route, priority):
+    """Send now; on 429 sleep retry_after and try again"""
+    while True:
+        try:
+            return await discord.send(route)
+        except RateLimited as e:
+            await asyncio.sleep(e.retry_after / SCALE)
+
+
+async def run(mode, welcome, seconds):
+    discord = FakeDiscord()
+    scheduler = SendScheduler(max_retries=100, clock=discord.now)
+    latencies = defaultdict(list)
+
+    async def send(priority, route):
+        start = discord.now()
+        if mode == 'before':
+            await direct(discord, route, priority)
+        else:
+            await scheduler.send(priority, route, lambda: discord.send(route))
+        latencies[priority].append(discord.now() - start)
+
+    async def raid():
+        await asyncio.gather(*(send(BROADCAST, route_key('dm', n)) for n in range(welcome)),
+                             *(send(BROADCAST, route_key('channel', 'news')) for _ in range(3)))
+
+    async def steady(priority, kind, every, routes):
+        tasks = []
+        for tick in range(int(seconds / every)):
+            tasks.append(asyncio.create_task(send(priority, route_key(kind, tick % routes))))
+            await asyncio.sleep(every / SCALE)
+        await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    await asyncio.gather(raid(), steady(MODMAIL, 'channel', 0.5, 10), steady(INTERACTION, 'interaction', 1.0, 1000))
+    elapsed = (time.perf_counter() - start) * SCALE
+
+    print(f"\n== {mode}: {welcome} welcome DMs + news during {seconds}s of modmail/interactions ==")
+    print(f"requests: {discord.requests:,}  429s: {discord.rejections:,}  all sent after {elapsed:.1f}s")
+    for priority, name in ((INTERACTION, 'interaction'), (MODMAIL, 'modmail'), (BROADCAST, 'broadcast')):
+        values = sorted(latencies[priority])
+        print(f"{name:<12} p50 {statistics.median(values):6.2f}s   p99 {values[int(len(values) * 0.99) - 1]:6.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--welcome', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=20)
+    args = parser.parse_args()
+    for mode in ('before', 'after'):
+        asyncio.run(run(mode, args.welcome, args.seconds))
@@ -0,0 +1,103 @@
+"""
+FPSOS Tag Search Benchmark
+Per-query latency of searching tag content with N tags, comparing a
+`content LIKE '%word%'` scan ranked by how often the words occur ("before",
+the best available without an index) with the BM25-ranked FTS5 index behind
+search_tags ("after"). Both return the top 5. Also times a full reindex.
+
+Usage:
+    python benchmarks/bench_tag_search.py
+    python benchmarks/bench_tag_search.py --tags 1000 10000 50000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+os.chdir(tempfile.mkdtemp(prefix='fpsos-bench-'))
+
+from database import FPSOSDatabase
+
+WORDS = (
+    'hpet c-states bios xmp expo timings latency dpc interrupt msi mode nvidia amd ryzen intel driver '
+    'reflex vsync gsync freesync refresh monitor mouse polling rate usb hub ram dual channel gear ratio '
+    'windows update defender services startup power plan core parking thermal throttle undervolt '
+    'overclock gpu cpu ssd nvme network ping packet loss jitter router qos ethernet wifi cfg launch '
+    'options fps stutter frametime audio headset shader cache reinstall registry timer resolution'
+).split()
+
+
+# Everyday words that make up most of a tag's text, Zipf-weighted
+FILLER = [f'w{i}' for i in range(5000)]
+FILLER_WEIGHTS = [1 / (rank + 1) for rank in range(len(FILLER))]
+
+
+def make_tags(count, rng):
+    """Mostly filler with a few technical terms each, so searches are selective like real ones"""
+    tags = []
+    for i in range(count):
+        words = rng.choices(FILLER, FILLER_WEIGHTS, k=rng.randint(30, 120))
+        for term in rng.sample(WORDS, rng.randint(1, 4)):
+            words.insert(rng.randrange(len(words) + 1), term)
+        tags.append((f'tag-{i}', ' '.join(words) + '.', 'bench'))
+    return tags
+
+
+def old_search(conn, query, limit=5):
+    """Scan for tags containing every word, then rank by occurrences"""
+    words = query.lower().split()
+    where = ' AND '.join('content LIKE ?' for _ in words)
+    rows = conn.execute(f'SELECT name, content FROM tags WHERE {where}', [f'%{word}%' for word in words]).fetchall()
+    rows.sort(key=lambda row: -sum(row['content'].lower().count(word) for word in words))
+    return rows[:limit]
+
+
+def timed(call, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        call(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def bench(tag_count, query_count):
+    rng = random.Random(tag_count)
+    path = Path(f'tag-search-{tag_count}.db').resolve()
+    db = FPSOSDatabase(str(path))
+    conn = db.get_connection()
+    with conn:
+        conn.executemany('INSERT INTO tags (name, content, created_by) VALUES (?, ?, ?)', make_tags(tag_count, rng))
+
+    start = time.perf_counter()
+    db.reindex_tags()
+    reindex_ms = (time.perf_counter() - start) * 1000
+
+    queries = [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(query_count)]
+    before = timed(lambda q: old_search(conn, q), queries)
+    after = timed(lambda q: db.search_tags(q, limit=5), queries)
+
+    print(f"\n== {tag_count:,} tags, {query_count:,} queries (ms) ==")
+    print(f"{'search':<16}{'p50':>10}{'p99':>10}")
+    print(f"{'before (LIKE)':<16}{before[0]:>10.3f}{before[1]:>10.3f}")
+    print(f"{'after (FTS5)':<16}{after[0]:>10.3f}{after[1]:>10.3f}")
+    print(f"reindex: {reindex_ms:.0f} ms")
+    db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tags', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+    for count in args.tags:
+        bench(count, args.queries)
@@ -0,0 +1,110 @@
+"""
+FPSOS Tag Lookup Latency Benchmark
+Per-call latency of tag autocomplete and "did you mean" suggestions with N
+tags, comparing the old `get_all_tags()` + substring scan ("before") with
+the prefix/trigram TagIndex behind autocomplete_tags/suggest_tags ("after").
+Discord drops autocomplete responses after 3 seconds, so p99 is what matters.
+
+Usage:
+    python benchmarks/bench_tags.py
+    python benchmarks/bench_tags.py --tags 10000 100000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BOT_DIR))
+os.chdir(tempfile.mkdtemp(prefix='fpsos-bench-'))
+
+from database import FPSOSDatabase
+
+TOPICS = ('bios', 'xmp', 'nvidia', 'amd', 'ryzen', 'intel', 'fps', 'stutter', 'latency', 'mouse', 'monitor',
+          'driver', 'windows', 'network', 'ping', 'audio', 'cfg', 'launch', 'ram', 'gpu', 'cpu', 'thermal')
+
+
+def make_names(count, rng):
+    names = set()
+    while len(names) < count:
+        parts = rng.sample(TOPICS, rng.randint(1, 3))
+        names.add('-'.join(parts) + ('' if rng.random() < 0.5 else f'-{rng.randint(1, 999)}'))
+    return sorted(names)
+
+
+def typo(name, rng):
+    """Drop, swap or replace one character"""
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    roll = rng.random()
+    if roll < 0.33 and len(chars) > 3:
+        del chars[i]
+    elif roll < 0.66 and i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    else:
+        chars[i] = rng.choice(string.ascii_lowercase)
+    return ''.join(chars)
+
+
+def old_lookup(db, query):
+    """What /tag get did on a miss, and the closest thing to autocomplete it had"""
+    return [t for t in db.get_all_tags() if query.lower() in t.lower()][:25]
+
+
+def timed(call, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        call(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def bench(tag_count, query_count):
+    rng = random.Random(tag_count)
+    names = make_names(tag_count, rng)
+    path = Path(f'tags-{tag_count}.db').resolve()
+    FPSOSDatabase(str(path)).close()  # Create the schema
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            'INSERT INTO tags (name, content, created_by, usage_count) VALUES (?, ?, ?, ?)',
+            ((name, f'Content for {name}', 'bench', int(rng.paretovariate(1.2))) for name in names)
+        )
+    conn.close()
+    FPSOSDatabase._instances.clear()
+    db = FPSOSDatabase(str(path))
+
+    prefixes = [rng.choice(names)[:rng.randint(1, 6)] for _ in range(query_count)]
+    misspelled = [typo(rng.choice(names), rng) for _ in range(query_count)]
+
+    rows = {
+        'autocomplete': (timed(lambda q: old_lookup(db, q), prefixes), timed(db.autocomplete_tags, prefixes)),
+        'did you mean': (timed(lambda q: old_lookup(db, q)[:3], misspelled), timed(db.suggest_tags, misspelled)),
+    }
+    hits_before = sum(1 for q in misspelled if old_lookup(db, q))
+    hits_after = sum(1 for q in misspelled if db.suggest_tags(q))
+
+    print(f"\n== {tag_count:,} tags, {query_count:,} queries (ms) ==")
+    print(f"{'lookup':<16}{'before p50':>12}{'before p99':>12}{'after p50':>12}{'after p99':>12}")
+    for name, ((b50, b99), (a50, a99)) in rows.items():
+        print(f'{name:<16}{b50:>12.3f}{b99:>12.3f}{a50:>12.3f}{a99:>12.3f}')
+    print(f"misspelled names with a suggestion: before {hits_before / query_count:.0%}, after {hits_after / query_count:.0%}")
+    db.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tags', type=int, nargs='+', default=[10000])
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+    for count in args.tags:
+        bench(count, args.queries)
@@ -0,0 +1,216 @@
+"""
+Minimal Discord Gateway Stand-in
+Serves just enough of Discord's REST API and gateway v10 for bot.py and
+cluster.py to log in, identify any number of shards, receive guilds and
+message traffic, heartbeat, and resume, so sharded runs can be exercised
+without a real bot token. Guilds are spread over shards the way Discord
+does it, (guild_id >> 22) % shard_count.
+
+Not Discord: no auth, no rate limits, no compression, every REST call other
+than the login and command-sync handful answers 404.
+
+Usage:
+    python benchmarks/fake_gateway.py --port 8765 --shards 4 --guilds 40 --rate 5
+    DISCORD_API_BASE=http://127.0.0.1:8765/api/v10 DISCORD_GATEWAY_URL=ws://127.0.0.1:8765/gateway \\
+        DISCORD_BOT_TOKEN=fake python cluster.py --clusters 2
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+from datetime import datetime, timezone
+
+from aiohttp import WSMsgType, web
+
+BOT_USER = {'id': '900000000000000001', 'username': 'FPSOS Test', 'discriminator': '0', 'global_name': None,
+            'avatar': None, 'bot': True, 'flags': 0}
+APPLICATION_ID = '900000000000000002'
+
+# Gateway opcodes
+DISPATCH, HEARTBEAT, IDENTIFY, PRESENCE, RESUME, RECONNECT, REQUEST_MEMBERS, HELLO, HEARTBEAT_ACK = 0, 1, 2, 3, 6, 7, 8, 10, 11
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)
+
+
+def reply(data, status=200):
+    """JSON response; discord.py only parses bodies whose Content-Type is exactly application/json"""
+    return web.Response(body=json.dumps(data).encode(), status=status, content_type='application/json')
+
+
+def guild_ids(count, home=None):
+    """`count` guild ids with consecutive shard keys, plus the home guild if given"""
+    ids = [str(((1_000_000 + index) << 22) | 1) for index in range(count)]
+    return ids + [str(home)] if home else ids
+
+
+def guild_payload(guild_id):
+    channel_id = str(int(guild_id) + 1)
+    return {
+        'id': guild_id, 'name': f'Guild {guild_id[-6:]}', 'icon': None, 'owner_id': BOT_USER['id'],
+        'unavailable': False, 'large': False, 'member_count': 1, 'features': [], 'emojis': [], 'stickers': [],
+        'roles': [{'id': guild_id, 'name': '@everyone', 'permissions': '1071698660929', 'position': 0,
+                   'color': 0, 'hoist': False, 'managed': False, 'mentionable': False, 'flags': 0}],
+        'channels': [{'id': channel_id, 'type': 0, 'name': 'general', 'position': 0,
+                      'permission_overwrites': [], 'guild_id': guild_id}],
+        'members': [], 'threads': [], 'presences': [], 'voice_states': [], 'stage_instances': [],
+        'guild_scheduled_events': [], 'premium_tier': 0, 'verification_level': 0, 'preferred_locale': 'en-US',
+        'joined_at': datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def message_payload(guild_id):
+    now = datetime.now(timezone.utc).isoformat()
+    author = {'id': str(1_000 + random.randrange(1_000)), 'username': 'player', 'discriminator': '0',
+              'global_name': None, 'avatar': None}
+    return {
+        'id': str(next(_snowflakes)), 'channel_id': str(int(guild_id) + 1), 'guild_id': guild_id, 'type': 0,
+        'author': author, 'member': {'roles': [], 'joined_at': now, 'deaf': False, 'mute': False},
+        'content': 'gg', 'timestamp': now, 'edited_timestamp': None, 'tts': False, 'mention_everyone': False,
+        'mentions': [], 'mention_roles': [], 'attachments': [], 'embeds': [], 'pinned': False,
+    }
+
+
+class FakeGateway:
+    def __init__(self, shards, guilds, rate, reconnect_every, heartbeat_ms, max_concurrency):
+        self.shards = shards
+        self.guilds = guilds
+        self.rate = rate
+        self.reconnect_every = reconnect_every
+        self.heartbeat_ms = heartbeat_ms
+        self.max_concurrency = max_concurrency
+        self.sessions = {}  # session id -> (shard id, shard count)
+        self.identifies = 0
+        self.resumes = 0
+
+    # ========== REST ==========
+
+    async def gateway(self, request):
+        return reply({'url': self.ws_url(request)})
+
+    async def gateway_bot(self, request):
+        return reply({
+            'url': self.ws_url(request), 'shards': self.shards,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0,
+                                    'max_concurrency': self.max_concurrency},
+        })
+
+    async def users_me(self, request):
+        return reply(BOT_USER)
+
+    async def application_info(self, request):
+        return reply({
+            'id': APPLICATION_ID, 'name': BOT_USER['username'], 'icon': None, 'description': '', 'flags': 0,
+            'bot_public': False, 'bot_require_code_grant': False, 'verify_key': '', 'owner': BOT_USER,
+        })
+
+    async def application_commands(self, request):
+        return reply([])
+
+    async def not_found(self, request):
+        return reply({'message': 'Unknown route (fake gateway)', 'code': 0}, status=404)
+
+    def ws_url(self, request):
+        return f"ws://{request.host}/gateway"
+
+    # ========== GATEWAY ==========
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        sequence = itertools.count(1)
+        state = {'shard': None}
+        tasks = []
+
+        async def dispatch(event, data):
+            await ws.send_str(json.dumps({'op': DISPATCH, 't': event, 's': next(sequence), 'd': data}))
+
+        async def traffic(guilds):
+            """MESSAGE_CREATE at `rate` per second, from this shard's guilds"""
+            while self.rate and guilds:
+                await asyncio.sleep(1 / self.rate)
+                await dispatch('MESSAGE_CREATE', message_payload(random.choice(guilds)))
+
+        async def reconnect_drill():
+            await asyncio.sleep(self.reconnect_every)
+            await ws.send_str(json.dumps({'op': RECONNECT, 'd': None}))
+
+        await ws.send_str(json.dumps({'op': HELLO, 'd': {'heartbeat_interval': self.heartbeat_ms}}))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                payload = json.loads(msg.data)
+                op, data = payload['op'], payload.get('d')
+                if op == HEARTBEAT:
+                    await ws.send_str(json.dumps({'op': HEARTBEAT_ACK, 'd': None}))
+                elif op in (IDENTIFY, RESUME):
+                    if op == IDENTIFY:
+                        self.identifies += 1
+                        shard_id, shard_count = data.get('shard') or [0, 1]
+                        session_id = f'session-{next(_snowflakes)}'
+                        self.sessions[session_id] = (shard_id, shard_count)
+                    else:
+                        self.resumes += 1
+                        session_id = data['session_id']
+                        shard_id, shard_count = self.sessions.get(session_id, (0, 1))
+                    state['shard'] = shard_id
+                    guilds = [g for g in self.guilds if (int(g) >> 22) % shard_count == shard_id]
+                    if op == IDENTIFY:
+                        await dispatch('READY', {
+                            'v': 10, 'user': BOT_USER, 'session_id': session_id, 'shard': [shard_id, shard_count],
+                            'resume_gateway_url': self.ws_url(request), 'private_channels': [],
+                            'guilds': [{'id': g, 'unavailable': True} for g in guilds],
+                            'application': {'id': APPLICATION_ID, 'flags': 0},
+                        })
+                        for guild_id in guilds:
+                            await dispatch('GUILD_CREATE', guild_payload(guild_id))
+                    else:
+                        await dispatch('RESUMED', {})
+                    print(f"{'identify' if op == IDENTIFY else 'resume'}: shard {shard_id}/{shard_count}, {len(guilds)} guild(s)")
+                    tasks.append(asyncio.create_task(traffic(guilds)))
+                    if self.reconnect_every:
+                        tasks.append(asyncio.create_task(reconnect_drill()))
+                elif op == REQUEST_MEMBERS:
+                    await dispatch('GUILD_MEMBERS_CHUNK', {
+                        'guild_id': data['guild_id'], 'members': [], 'chunk_index': 0, 'chunk_count': 1,
+                        'nonce': data.get('nonce'),
+                    })
+        finally:
+            for task in tasks:
+                task.cancel()
+        print(f"closed: shard {state['shard']}")
+        return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--shards', type=int, default=2, help='shard count GET /gateway/bot recommends')
+    parser.add_argument('--max-concurrency', type=int, default=1)
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--home-guild', help='also serve this guild id (set DISCORD_GUILD_ID to match)')
+    parser.add_argument('--rate', type=float, default=2.0, help='MESSAGE_CREATE per second per shard')
+    parser.add_argument('--heartbeat-ms', type=int, default=5000)
+    parser.add_argument('--reconnect-every', type=float, default=0, help='send RECONNECT after this many seconds')
+    args = parser.parse_args()
+
+    gateway = FakeGateway(args.shards, guild_ids(args.guilds, args.home_guild), args.rate,
+                          args.reconnect_every, args.heartbeat_ms, args.max_concurrency)
+    app = web.Application()
+    app.router.add_get('/gateway', gateway.websocket)
+    app.router.add_get('/api/v10/gateway', gateway.gateway)
+    app.router.add_get('/api/v10/gateway/bot', gateway.gateway_bot)
+    app.router.add_get('/api/v10/users/@me', gateway.users_me)
+    app.router.add_get('/api/v10/oauth2/applications/@me', gateway.application_info)
+    app.router.add_put('/api/v10/applications/{app}/commands', gateway.application_commands)
+    app.router.add_put('/api/v10/applications/{app}/guilds/{guild}/commands', gateway.application_commands)
+    app.router.add_route('*', '/api/v10/{tail:.*}', gateway.not_found)
+    print(f"Fake gateway on ws://{args.host}:{args.port}/gateway, REST on http://{args.host}:{args.port}/api/v10")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Minimal libSQL (sqld) Stand-in
+Serves the Hrana-over-HTTP v2 `/v2/pipeline` endpoint on top of a local SQLite
+file, so the LibSQLBackend can be exercised and benchmarked without a Turso
+account. Supports execute, batch (with ok/error/not/and/or conditions) and
+close requests, streams identified by batons, and an optional artificial
+per-request latency to model a remote region.
+
+Not a production server: no auth, no replication, one SQLite connection per stream.
+
+Usage:
+    python benchmarks/sqld_standin.py --db standin.db --port 8080 --latency-ms 20
+"""
+
+import argparse
+import base64
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _to_value(value):
+    if value is None:
+        return {'type': 'null'}
+    if isinstance(value, int):
+        return {'type': 'integer', 'value': str(value)}
+    if isinstance(value, float):
+        return {'type': 'float', 'value': value}
+    if isinstance(value, bytes):
+        return {'type': 'blob', 'base64': base64.b64encode(value).decode('ascii')}
+    return {'type': 'text', 'value': value}
+
+
+def _from_value(value):
+    kind = value['type']
+    if kind == 'null':
+        return None
+    if kind == 'integer':
+        return int(value['value'])
+    if kind == 'float':
+        return float(value['value'])
+    if kind == 'blob':
+        return base64.b64decode(value['base64'])
+    return value['value']
+
+
+def _execute(conn, stmt):
+    cursor = conn.execute(stmt['sql'], [_from_value(v) for v in stmt.get('args', [])])
+    rows = cursor.fetchall() if cursor.description else []
+    return {
+        'cols': [{'name': col[0], 'decltype': None} for col in cursor.description or []],
+        'rows': [[_to_value(v) for v in row] for row in rows] if stmt.get('want_rows', True) else [],
+        'affected_row_count': max(cursor.rowcount, 0),
+        'last_insert_rowid': str(cursor.lastrowid) if cursor.lastrowid is not None else None,
+    }
+
+
+def _error(exc):
+    return {'message': str(exc), 'code': 'SQLITE_ERROR'}
+
+
+def _condition(conn, cond, errors, results):
+    kind = cond['type']
+    if kind == 'ok':
+        return results[cond['step']] is not None
+    if kind == 'error':
+        return errors[cond['step']] is not None
+    if kind == 'not':
+        return not _condition(conn, cond['cond'], errors, results)
+    if kind == 'and':
+        return all(_condition(conn, c, errors, results) for c in cond['conds'])
+    if kind == 'or':
+        return any(_condition(conn, c, errors, results) for c in cond['conds'])
+    if kind == 'is_autocommit':
+        return not conn.in_transaction
+    raise ValueError(f"Unknown condition: {kind}")
+
+
+def _batch(conn, batch):
+    results, errors = [], []
+    for step in batch['steps']:
+        condition = step.get('condition')
+        if condition is not None and not _condition(conn, condition, errors, results):
+            results.append(None)
+            errors.append(None)
+            continue
+        try:
+            results.append(_execute(conn, step['stmt']))
+            errors.append(None)
+        except sqlite3.Error as exc:
+            results.append(None)
+            errors.append(_error(exc))
+    return {'step_results': results, 'step_errors': errors}
+
+
+class HranaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db_path, latency_ms=0):
+        super().__init__(address, HranaHandler)
+        self.db_path = db_path
+        self.latency = latency_ms / 1000
+        self.streams = {}  # baton -> sqlite3 connection
+        self.streams_lock = threading.Lock()
+        self.requests_served = 0
+
+    def open_stream(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA busy_timeout = 5000')
+        return conn
+
+
+class HranaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like sqld
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if self.path != '/v2/pipeline':
+            self._reply(404, {'error': 'not found'})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+
+        baton = body.get('baton')
+        with server.streams_lock:
+            server.requests_served += 1
+            if baton is None:
+                conn = server.open_stream()
+            else:
+                conn = server.streams.pop(baton, None)
+        if conn is None:
+            self._reply(400, {'error': 'invalid baton'})
+            return
+
+        results, closed = [], False
+        for request in body.get('requests', []):
+            kind = request['type']
+            try:
+                if kind == 'execute':
+                    response = {'type': 'execute', 'result': _execute(conn, request['stmt'])}
+                elif kind == 'batch':
+                    response = {'type': 'batch', 'result': _batch(conn, request['batch'])}
+                elif kind == 'close':
+                    closed = True
+                    response = {'type': 'close'}
+                else:
+                    raise ValueError(f"Unsupported request type: {kind}")
+                results.append({'type': 'ok', 'response': response})
+            except (sqlite3.Error, ValueError) as exc:
+                results.append({'type': 'error', 'error': _error(exc)})
+
+        if closed:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            conn.close()
+            new_baton = None
+        else:
+            new_baton = secrets.token_urlsafe(12)
+            with server.streams_lock:
+                server.streams[new_baton] = conn
+        self._reply(200, {'baton': new_baton, 'base_url': None, 'results': results})
+
+
+def serve(db_path, port=0, latency_ms=0):
+    """Start a stand-in server on a background thread; returns (server, url)"""
+    server = HranaServer(('127.0.0.1', port), db_path, latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='standin.db')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    args = parser.parse_args()
+    server = HranaServer(('127.0.0.1', args.port), args.db, args.latency_ms)
+    print(f"Serving {args.db} on http://127.0.0.1:{args.port}/v2/pipeline")
+    server.serve_forever()
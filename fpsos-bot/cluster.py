@@ -0,0 +1,170 @@
+"""
+FPSOS Cluster Launcher
+Runs the bot as several processes, each an AutoShardedBot over its own range of shards
+
+Shard 0 (DMs) and the home guild's shard always land in cluster 0. Each
+cluster is started once the previous one has had time to identify its
+shards, restarted with backoff if it exits, and stopped with Ctrl+C/SIGTERM.
+Singleton tasks (control plane, news ticker, archiver) are elected through
+the bot database, so every cluster must use the same BOT_DATABASE_URL.
+
+Usage:
+    python cluster.py --clusters 2                # Discord's recommended shard count
+    python cluster.py --clusters 4 --shards 16
+    python cluster.py --clusters 2 --shards 4 --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from utils.config import TOKEN, GUILD_ID, DISCORD_API_BASE
+from utils.sharding import format_shard_ids, plan_clusters, shard_for_guild
+
+BOT_DIR = Path(__file__).resolve().parent
+IDENTIFY_INTERVAL = 5.0  # Seconds Discord wants between identifies in one max_concurrency bucket
+
+
+def fetch_gateway():
+    """Discord's recommended shard count and identify concurrency (GET /gateway/bot)"""
+    request = urllib.request.Request(
+        f"{(DISCORD_API_BASE or 'https://discord.com/api/v10').rstrip('/')}/gateway/bot",
+        headers={'Authorization': f'Bot {TOKEN}', 'User-Agent': 'FPSOS cluster launcher'},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        data = json.load(response)
+    return data['shards'], data['session_start_limit']['max_concurrency']
+
+
+class Cluster:
+    """One bot process over a fixed list of shards"""
+
+    def __init__(self, cluster_id, shard_ids, shard_count):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.restarts = 0
+
+    async def spawn(self):
+        env = dict(os.environ,
+                   SHARD_COUNT=str(self.shard_count),
+                   SHARD_IDS=format_shard_ids(self.shard_ids),
+                   CLUSTER_ID=str(self.cluster_id),
+                   PYTHONUNBUFFERED='1')
+        # Own process group, so a terminal Ctrl+C reaches only the launcher, which then stops each child in turn
+        group = {'creationflags': 0x200} if os.name == 'nt' else {'start_new_session': True}  # CREATE_NEW_PROCESS_GROUP
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, 'bot.py', cwd=BOT_DIR, env=env,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, **group,
+        )
+        print(f"[launcher] cluster {self.cluster_id}: shards {format_shard_ids(self.shard_ids)} (pid {self.process.pid})")
+
+    async def pipe_output(self):
+        """Echo the child's output, prefixed with its cluster id"""
+        async for line in self.process.stdout:
+            print(f"[cluster {self.cluster_id}] {line.decode(errors='replace').rstrip()}", flush=True)
+
+    async def run(self, stopping):
+        """Keep the cluster running until `stopping` is set, restarting it with exponential backoff"""
+        backoff = 1.0
+        while not stopping.is_set():
+            started = time.monotonic()
+            await self.spawn()
+            await self.pipe_output()
+            code = await self.process.wait()
+            if stopping.is_set():
+                break
+            if time.monotonic() - started > 60:
+                backoff = 1.0  # Ran for a while: treat this as a fresh failure
+            self.restarts += 1
+            print(f"[launcher] cluster {self.cluster_id} exited with {code}; restarting in {backoff:.0f}s")
+            try:
+                await asyncio.wait_for(stopping.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 60.0)
+
+    async def stop(self, grace):
+        """Ask the bot to shut down cleanly (flushing its queues), then kill it after `grace` seconds"""
+        if self.process is None or self.process.returncode is not None:
+            return
+        if os.name == 'nt':
+            self.process.terminate()
+        else:
+            self.process.send_signal(signal.SIGINT)  # bot.run closes the bot on KeyboardInterrupt
+        try:
+            await asyncio.wait_for(self.process.wait(), grace)
+        except asyncio.TimeoutError:
+            print(f"[launcher] cluster {self.cluster_id} did not stop within {grace:g}s; killing it")
+            self.process.kill()
+            await self.process.wait()
+
+
+async def launch(plan, shard_count, max_concurrency, grace):
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows: Ctrl+C arrives as KeyboardInterrupt in main()
+
+    clusters = [Cluster(cluster_id, shard_ids, shard_count) for cluster_id, shard_ids in enumerate(plan)]
+    runners = []
+    try:
+        for cluster in clusters:
+            runners.append(asyncio.create_task(cluster.run(stopping)))
+            # The next cluster identifies once this one's shards are through their identify slots
+            delay = IDENTIFY_INTERVAL * -(-len(cluster.shard_ids) // max_concurrency)
+            try:
+                await asyncio.wait_for(stopping.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        await stopping.wait()
+    finally:
+        stopping.set()
+        print("[launcher] stopping clusters...")
+        await asyncio.gather(*(cluster.stop(grace) for cluster in clusters))
+        await asyncio.gather(*runners, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clusters', type=int, default=1, help='bot processes to run')
+    parser.add_argument('--shards', type=int, help='total shards (default: ask Discord)')
+    parser.add_argument('--max-concurrency', type=int, help='identifies per 5 s (default: ask Discord, else 1)')
+    parser.add_argument('--grace', type=float, default=20.0, help='seconds a cluster gets to shut down')
+    parser.add_argument('--dry-run', action='store_true', help='print the plan and exit')
+    args = parser.parse_args()
+
+    shard_count, max_concurrency = args.shards, args.max_concurrency
+    if shard_count is None:
+        shard_count, recommended_concurrency = fetch_gateway()
+        max_concurrency = max_concurrency or recommended_concurrency
+        print(f"[launcher] Discord recommends {shard_count} shard(s), max_concurrency {recommended_concurrency}")
+    max_concurrency = max_concurrency or 1
+
+    pinned = {0}
+    if GUILD_ID:
+        pinned.add(shard_for_guild(GUILD_ID, shard_count))
+    plan = plan_clusters(shard_count, args.clusters, pinned)
+    for cluster_id, shard_ids in enumerate(plan):
+        print(f"[launcher] cluster {cluster_id}: shards {format_shard_ids(shard_ids)} of {shard_count}")
+    if args.dry_run:
+        return
+
+    try:
+        asyncio.run(launch(plan, shard_count, max_concurrency, args.grace))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.config import Colors
-from database import db
+from async_database import adb
 
 
 
@@ -55,21 +55,27 @@ class AdminCommands(commands.Cog):
             await interaction.followup.send(f"❌ **Error during setup**: {e}", ephemeral=True)
 
     @app_commands.command(name="stats", description="View bot statistics (admin only)")
-    async def stats_cmd(self, interaction: discord.Interaction):
+    @app_commands.describe(window="Time window (defaults to all time)")
+    @app_commands.choices(window=[
+        app_commands.Choice(name="Today", value="today"),
+        app_commands.Choice(name="Last 7 days", value="7d"),
+        app_commands.Choice(name="Last 30 days", value="30d"),
+    ])
+    async def stats_cmd(self, interaction: discord.Interaction, window: app_commands.Choice[str] = None):
         """View bot statistics (admin only)"""
         if not interaction.user.guild_permissions.administrator:
             await interaction.response.send_message("❌ This command is for administrators only.", ephemeral=True)
             return
         
-        stats = db.get_stats()
+        stats = await adb.get_stats(window.value if window else None)
         
         embed = discord.Embed(
             title="📊 FPSOS Bot Statistics",
-            description="Current performance metrics",
+            description=f"Performance metrics • {window.name if window else 'All time'}",
             color=Colors.FPSOS_PURPLE
         )
         
-        embed.add_field(name="👥 Total Users", value=f"{stats['total_users']}", inline=True)
+        embed.add_field(name="👥 Total Users" if not window else "👥 New Users", value=f"{stats['total_users']}", inline=True)
         embed.add_field(name="🔬 Diagnostics Run", value=f"{stats['total_diagnostics']}", inline=True)
         embed.add_field(name="📅 Total Bookings", value=f"{stats['total_bookings']}", inline=True)
         
@@ -78,11 +84,32 @@ class AdminCommands(commands.Cog):
         embed.add_field(name="📈 Conversion Rate", value=f"{stats['conversion_rate']}%", inline=True)
         
         embed.add_field(name="🏆 Popular Service", value=stats['popular_service'], inline=False)
+        if stats['cache_hit_ratio'] is not None:
+            embed.add_field(
+                name="♻️ Re-upload Cache",
+                value=f"{stats['cache_hit_ratio']}% hit rate ({stats['cache_hits']} re-uploads answered without a new diagnostic)",
+                inline=False
+            )
         
         embed.set_footer(text=f"Requested by {interaction.user.name}")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="stats_rebuild", description="Recompute statistics from raw data (Admin only)")
+    async def stats_rebuild_cmd(self, interaction: discord.Interaction):
+        """Rebuild the stats rollups and report any drift"""
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Admin only.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        before, after = await adb.rebuild_stats()
+        drift = [f"**{key}**: {before[key]} → {after[key]}" for key in after if before[key] != after[key]]
+        if drift:
+            await interaction.followup.send("🔧 Stats rebuilt. Corrected:\n" + "\n".join(drift))
+        else:
+            await interaction.followup.send("✅ Stats rebuilt. Counters were already consistent.")
+
     @app_commands.command(name="sync", description="Force sync slash commands (Admin only)")
     async def sync_cmd(self, interaction: discord.Interaction):
         """Force sync slash commands (Admin only)"""
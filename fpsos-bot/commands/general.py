@@ -3,64 +3,17 @@ import asyncio
 from discord import app_commands
 from discord.ext import commands
 from utils.config import Colors
+from utils.embed_templates import render
 from utils.views import DiagnosticView, PreBookingView, WelcomeView, BookingView, AIAskModal
-from database import db
+from async_database import adb
 
 # Helper Functions
 def get_welcome_embed(member):
-    embed = discord.Embed(
-        title=f"👋 Welcome to the Elite Circle, {member.name}!",
-        description=(
-            f"Glad to have you here, **{member.name}**.\n\n"
-            "We specialize in pushing **CS2 performance** to its absolute limit. "
-            "Whether you're looking for a quick fix or a complete system overhaul, we've got you covered.\n\n"
-            "**Let's start by analyzing your rig.**\n"
-            "Click **'Start System Profiling'** below so I can give you a personalized recommendation."
-        ),
-        color=Colors.FPSOS_BLUE
-    )
-    embed.set_thumbnail(url=member.display_avatar.url)
-    embed.set_footer(text="FPS Optimization Station • Official Bot")
-    return embed
+    return render('welcome', name=member.name, avatar_url=member.display_avatar.url)
 
 def get_resources_embed():
     """Returns a beautifully formatted resource hub embed"""
-    embed = discord.Embed(
-        title="🚀 FPSOS Optimization & Resource Hub",
-        description=(
-            "Everything you need to squeeze every frame out of your system and minimize input latency.\n\n"
-            "**Official Links & Tools:**"
-        ),
-        color=Colors.FPSOS_BLUE
-    )
-    
-    embed.add_field(
-        name="🌳 Linktree (DDU & NVCleanInstall)",
-        value="👉 [linktr.ee/t1glish](https://linktr.ee/t1glish)\n*Download recommended DDU versions and NVCleanInstall profiles.*",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🔬 FPSOS CS2 Suite v4.0",
-        value="👉 [Download Script](https://fpsos.gg/FPSOS-CS2-Suite.ps1)\n*Unified interrupt affinity, Process Lasso profiles, and system diagnostics.*",
-        inline=True
-    )
-    
-    embed.add_field(
-        name="📚 Optimization Guide",
-        value="👉 [Read Guide](https://fpsos.gg/guides/basic-optimization)\n*Step-by-step walkthrough for a responsive system.*",
-        inline=True
-    )
-    
-    embed.add_field(
-        name="🛠️ Hardware Recommendations",
-        value="Optimized for 9800X3D + RTX 40-series builds.",
-        inline=False
-    )
-    
-    embed.set_footer(text="FPSOS.GG • Subtick-Perfect Performance")
-    # embed.set_thumbnail(url="https://fpsos.gg/logo.png") 
-    return embed
+    return render('resources')
 
 class GeneralCommands(commands.Cog):
     def __init__(self, bot):
@@ -190,7 +143,7 @@ class GeneralCommands(commands.Cog):
         # Let's try to verify if 'specs' column exists or if I should add it.
         # Assuming we will add `update_user_specs` to database.py
         try:
-             db.update_user_specs(interaction.user.id, specs_str) # Expecting to add this method
+             await adb.update_user_specs(interaction.user.id, specs_str) # Expecting to add this method
              await interaction.response.send_message(f"✅ Specs saved!", ephemeral=True)
         except AttributeError:
              # Fallback if DB method not yet added
@@ -202,7 +155,7 @@ class GeneralCommands(commands.Cog):
         target = member or interaction.user
         # Again, speculatively calling a get_user_specs or similar
         try:
-             user_data = db.get_user(target.id) # Assuming this returns a dict
+             user_data = await adb.get_user(target.id) # Assuming this returns a dict
              specs = user_data.get('specs', 'No specs saved.') if user_data else 'User not found.'
         except:
              specs = "No specs found (DB connection check required)."
@@ -0,0 +1,64 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from utils.config import Colors
+from utils.intents import IntentMatcher
+from async_database import adb
+
+class Intents(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    intent_group = app_commands.Group(name="intent", description="Manage the phrases the DM assistant understands (Admin only)")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Admin only.", ephemeral=True)
+            return False
+        return True
+
+    @intent_group.command(name="add", description="Teach an intent a new phrase")
+    @app_commands.describe(
+        intent="Intent name (greeting, booking, or a tag name to reply with)",
+        phrase="Phrase to recognise",
+        match="exact: the whole message; keyword: anywhere in the message",
+        priority="Higher wins when several intents match"
+    )
+    @app_commands.choices(match=[
+        app_commands.Choice(name="keyword", value="keyword"),
+        app_commands.Choice(name="exact", value="exact"),
+    ])
+    async def add_phrase(self, interaction: discord.Interaction, intent: str, phrase: str,
+                         match: app_commands.Choice[str] = None, priority: int = 0):
+        await adb.add_intent_phrase(intent, phrase, match.value if match else 'keyword', priority, interaction.user.id)
+        await interaction.response.send_message(f"✅ `{phrase}` now triggers **{intent}**. Live immediately.", ephemeral=True)
+
+    @intent_group.command(name="remove", description="Remove a phrase from an intent")
+    async def remove_phrase(self, interaction: discord.Interaction, intent: str, phrase: str):
+        if await adb.delete_intent_phrase(intent, phrase):
+            await interaction.response.send_message(f"🗑️ Removed `{phrase}` from **{intent}**.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"❌ **{intent}** has no phrase `{phrase}`.", ephemeral=True)
+
+    @intent_group.command(name="list", description="List intents and their phrases")
+    async def list_phrases(self, interaction: discord.Interaction):
+        by_intent = {}
+        for row in sorted(await adb.get_intent_phrases(), key=lambda r: (r['intent'], r['match'], r['phrase'])):
+            marker = f"`{row['phrase']}`" if row['match'] == 'keyword' else f"`={row['phrase']}`"
+            by_intent.setdefault(row['intent'], []).append(marker)
+
+        embed = discord.Embed(title="🧭 DM Intents", color=Colors.FPSOS_BLUE)
+        for intent, phrases in list(by_intent.items())[:25]:
+            embed.add_field(name=intent, value=", ".join(phrases)[:1024], inline=False)
+        embed.set_footer(text="`=phrase` must be the whole message")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @intent_group.command(name="test", description="Show which intent a message would trigger")
+    async def test_phrase(self, interaction: discord.Interaction, message: str):
+        intent = IntentMatcher(await adb.get_intent_phrases()).match(message)
+        await interaction.response.send_message(
+            f"🎯 **{intent}**" if intent else "🤷 No intent matches that message.", ephemeral=True
+        )
+
+async def setup(bot):
+    await bot.add_cog(Intents(bot))
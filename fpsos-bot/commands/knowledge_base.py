@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.config import Colors
-from database import db
+from async_database import adb
 
 class KnowledgeBase(commands.Cog):
     def __init__(self, bot):
@@ -13,12 +13,11 @@ class KnowledgeBase(commands.Cog):
     @tag_group.command(name="get", description="Retrieve a tag by name")
     @app_commands.describe(name="The name of the tag")
     async def get_tag(self, interaction: discord.Interaction, name: str):
-        tag = db.get_tag(name)
+        tag = await adb.get_tag(name)
         if not tag:
             # Fuzzy search
-            all_tags = db.get_all_tags()
-            matches = [t for t in all_tags if name.lower() in t.lower()]
-            hint = f"\nDid you mean: {', '.join(matches[:3])}?" if matches else ""
+            matches = await adb.suggest_tags(name)
+            hint = f"\nDid you mean: {', '.join(matches)}?" if matches else ""
             await interaction.response.send_message(f"❌ Tag `{name}` not found.{hint}", ephemeral=True)
             return
             
@@ -26,6 +25,11 @@ class KnowledgeBase(commands.Cog):
         embed.set_footer(text=f"Requested by {interaction.user.name}")
         await interaction.response.send_message(embed=embed)
 
+    @get_tag.autocomplete('name')
+    async def tag_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        names = await adb.autocomplete_tags(current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
     @tag_group.command(name="add", description="Create or update a tag (Admin only)")
     @app_commands.describe(name="Tag name", content="Content of the tag")
     async def add_tag(self, interaction: discord.Interaction, name: str, content: str):
@@ -33,7 +37,7 @@ class KnowledgeBase(commands.Cog):
             await interaction.response.send_message("❌ Admin only.", ephemeral=True)
             return
             
-        db.add_tag(name, content, interaction.user.id)
+        await adb.add_tag(name, content, interaction.user.id)
         await interaction.response.send_message(f"✅ Tag `{name}` saved!", ephemeral=True)
 
     @tag_group.command(name="delete", description="Delete a tag (Admin only)")
@@ -44,7 +48,7 @@ class KnowledgeBase(commands.Cog):
             return
 
         # Verification if tag exists
-        if not db.get_tag(name):
+        if not await adb.get_tag(name):
              await interaction.response.send_message(f"❌ Tag `{name}` does not exist.", ephemeral=True)
              return
 
@@ -59,14 +63,42 @@ class KnowledgeBase(commands.Cog):
         # I'll optimistically call db.delete_tag(name) and implement it in database.py next.
         
         try:
-            db.delete_tag(name) # Will implement this
+            await adb.delete_tag(name)
             await interaction.response.send_message(f"🗑️ Tag `{name}` deleted.", ephemeral=True)
         except AttributeError:
              await interaction.response.send_message("❌ Database method `delete_tag` missing. Please update database.py.", ephemeral=True)
 
+    @delete_tag.autocomplete('name')
+    async def delete_tag_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.tag_name_autocomplete(interaction, current)
+
+    @tag_group.command(name="search", description="Search tag contents")
+    @app_commands.describe(query="Words to look for, e.g. hpet or c-states")
+    async def search_tags(self, interaction: discord.Interaction, query: str):
+        results = await adb.search_tags(query, limit=5)
+        if not results:
+            await interaction.response.send_message(f"🔍 No tags mention `{query}`.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=f"🔍 Tags matching \"{query[:200]}\"", color=Colors.FPSOS_BLUE)
+        for result in results:
+            embed.add_field(name=f"🏷️ {result['name']}", value=result['snippet'][:1024] or "—", inline=False)
+        embed.set_footer(text="Use /tag get <name> to post one")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @tag_group.command(name="reindex", description="Rebuild the tag search index (Admin only)")
+    async def reindex_tags(self, interaction: discord.Interaction):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Admin only.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        count = await adb.reindex_tags()
+        await interaction.followup.send(f"✅ Search index rebuilt for {count} tag(s).", ephemeral=True)
+
     @tag_group.command(name="list", description="List all available tags")
     async def list_tags(self, interaction: discord.Interaction):
-        tags = db.get_all_tags()
+        tags = await adb.get_all_tags()
         if not tags:
             await interaction.response.send_message("No tags found.", ephemeral=True)
             return
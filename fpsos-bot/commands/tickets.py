@@ -2,7 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.config import Colors
-from database import db
+from async_database import adb
 
 class TicketSystem(commands.Cog):
     def __init__(self, bot):
@@ -13,7 +13,7 @@ class TicketSystem(commands.Cog):
     @ticket_group.command(name="close", description="Close the current ticket")
     async def close_ticket(self, interaction: discord.Interaction):
         # 1. Check if channel is a ticket channel
-        ticket = db.get_ticket_by_channel(interaction.channel_id)
+        ticket = await adb.get_ticket_by_channel(interaction.channel_id)
         if not ticket:
             await interaction.response.send_message("❌ This is not an active ticket channel.", ephemeral=True)
             return
@@ -24,7 +24,13 @@ class TicketSystem(commands.Cog):
         await interaction.response.send_message("🔒 Closing ticket in 5 seconds...")
         
         # 3. Update DB
-        db.close_ticket(ticket['id'])
+        await adb.close_ticket(ticket['id'])
+
+        # Deliver messages still being batched before the channel goes away
+        await self.bot.user_relay.flush(interaction.channel)
+        user = self.bot.get_user(int(ticket['user_id']))
+        if user:
+            await self.bot.staff_relay.flush(user)
         
         # 4. Delete Channel (with a delay usually, but here immediate for simplicity)
         import asyncio
@@ -33,7 +39,7 @@ class TicketSystem(commands.Cog):
 
     @ticket_group.command(name="add_user", description="Add a user to this ticket")
     async def add_user(self, interaction: discord.Interaction, member: discord.Member):
-        ticket = db.get_ticket_by_channel(interaction.channel_id)
+        ticket = await adb.get_ticket_by_channel(interaction.channel_id)
         if not ticket:
              await interaction.response.send_message("❌ This is not an active ticket channel.", ephemeral=True)
              return
@@ -42,5 +48,22 @@ class TicketSystem(commands.Cog):
         await interaction.channel.set_permissions(member, read_messages=True, send_messages=True)
         await interaction.response.send_message(f"✅ Added {member.mention} to the ticket.")
 
+    @ticket_group.command(name="verify", description="Check the open-ticket index against the database (Admin only)")
+    async def verify_index(self, interaction: discord.Interaction, repair: bool = False):
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ Admin only.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        report = await adb.verify_ticket_index(repair=repair)
+        lines = [f"🎫 {report['open']} open ticket(s) in the database, {report['indexed']} indexed"]
+        problems = [f"**{key}**: {', '.join(map(str, report[key]))}" for key in ('missing', 'stale', 'mismatched') if report[key]]
+        if not problems:
+            lines.append("✅ Index matches the database.")
+        else:
+            lines.extend(problems)
+            lines.append("🔧 Index reloaded from the database." if repair else "Run again with `repair: True` to reload it.")
+        await interaction.followup.send("\n".join(lines))
+
 async def setup(bot):
     await bot.add_cog(TicketSystem(bot))
@@ -3,147 +3,155 @@ FPSOS Bot Database Service
 Handles all database operations for users, diagnostics, bookings, and testimonials
 """
 
-import sqlite3
+import atexit
+from collections import OrderedDict
+import csv
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+import zlib
 from pathlib import Path
 from datetime import datetime
 import json
 
+from db_backends import make_backend
+from utils.config import ANALYSIS_CACHE_SIZE, BOT_DATABASE_URL, BOT_DATABASE_AUTH_TOKEN
+from utils.diagnostic_schema import extract_diagnostic_fields
+from utils.tag_index import TagIndex, rank_by_usage
+from migrations import run_migrations, CACHE_STATS_REBUILD, STATS_REBUILD
+
+
+# ========== DIAGNOSTIC PAYLOAD HELPERS ==========
+
+PAYLOAD_CODEC = 'zlib'
+
+
+def compress_payload(json_data):
+    """Canonical JSON -> (sha256 hex, codec, raw size, compressed bytes)
+
+    Keys are sorted so the same upload always hashes to the same payload.
+    """
+    raw = json.dumps(json_data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(raw).hexdigest(), PAYLOAD_CODEC, len(raw), zlib.compress(raw, 6)
+
+
+def decompress_payload(codec, data):
+    """Compressed payload -> JSON text"""
+    if codec != 'zlib':
+        raise ValueError(f"Unknown payload codec: {codec}")
+    return zlib.decompress(data).decode('utf-8')
+
+
+# Columns returned by history pages (the payload is fetched separately)
+DIAGNOSTIC_SUMMARY_COLUMNS = (
+    'id', 'user_id', 'critical_count', 'warning_count', 'recommendation', 'created_at',
+    'cpu', 'gpu', 'ram_gb', 'network', 'current_fps', 'target_fps', 'latency_ms', 'payload_hash',
+)
+
+
+def _hydrate_diagnostic(row):
+    """Diagnostics row joined with its payload -> dict with json_data restored"""
+    result = dict(row)
+    codec, data = result.pop('payload_codec', None), result.pop('payload_data', None)
+    if data is not None:
+        result['json_data'] = decompress_payload(codec, data)
+    return result
+
 
 class FPSOSDatabase:
-    """Singleton database connection for FPSOS bot"""
-    
-    _instance = None
+    """Shared database service for FPSOS bot (one instance per database file)
+
+    Connections are long-lived and pooled per thread: the first call from a
+    thread opens a connection in WAL mode and every later call on that thread
+    reuses it, so lookups skip the connect/schema-parse cost. WAL lets readers
+    keep reading while a writer commits.
+
+    `db_path` may also be a libsql:// (or https://) URL, in which case the
+    same methods run against a remote libSQL/Turso database; see db_backends.
+    """
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
-        return cls._instance
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    # Seconds between checks for tag/intent edits made by other processes
+    CACHE_CHECK_INTERVAL = 1.0
+
+    def __new__(cls, db_path='fpsos_bot.db', auth_token=None):
+        key = (cls, db_path if '://' in db_path else os.path.abspath(db_path))
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.initialized = False
+                cls._instances[key] = instance
+        return instance
     
-    def __init__(self, db_path='fpsos_bot.db'):
+    def __init__(self, db_path='fpsos_bot.db', auth_token=None):
         if not self.initialized:
             self.db_path = db_path
+            self.backend = make_backend(db_path, auth_token)
+            self._local = threading.local()
+            self._pool = {}  # thread -> connection
+            self._pool_lock = threading.Lock()
+            self._tags = {}  # name -> row, the whole tags table
+            self._tag_usage = {}  # name -> uses not yet written to disk
+            self._tag_lock = threading.Lock()
+            self._tag_index = TagIndex()  # names, for autocomplete and suggestions
+            self._tickets = {}  # ticket id -> open ticket row
+            self._tickets_by_user = {}  # user_id -> {ticket id: None}, oldest first
+            self._tickets_by_channel = {}  # channel_id -> ticket id
+            self._ticket_lock = threading.Lock()
+            self._archives = []  # diagnostic_archives rows, newest first
+            self._archive_lock = threading.Lock()
+            self._intents = {}  # (intent, phrase) -> row
+            self._intent_lock = threading.Lock()
+            self.intents_version = 0
+            self._analyses = OrderedDict()  # (upload hash, user_id) -> (rules_version, result), least recently used first
+            self._analysis_lock = threading.Lock()
+            self._cache_versions = {}  # cached table -> cache_versions.version it was loaded at
+            self._cache_checked = 0.0
             self.init_database()
+            self._cache_versions = self._read_cache_versions()
+            self._cache_checked = time.monotonic()
+            self._load_tags()
+            self._load_tickets()
+            self._load_archives()
+            self._load_intents()
             self.initialized = True
+            atexit.register(self.close)
+    
+    def _open_connection(self):
+        """Open a new connection on the configured backend"""
+        return self.backend.connect()
     
     def get_connection(self):
-        """Get a database connection with row factory"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's pooled connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._pool_lock:
+                # Drop connections left behind by threads that have exited
+                for thread in [t for t in self._pool if not t.is_alive()]:
+                    self._pool.pop(thread).close()
+                self._pool[threading.current_thread()] = conn
         return conn
+
+    def close(self):
+        """Flush buffered writes and close every pooled connection (safe to call more than once)"""
+        self.flush_tag_usage()
+        with self._pool_lock:
+            for conn in self._pool.values():
+                conn.close()
+            self._pool.clear()
+        self._local = threading.local()
     
     def init_database(self):
-        """Create all tables if they don't exist"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                discord_id TEXT PRIMARY KEY,
-                username TEXT NOT NULL,
-                email TEXT,
-                join_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-                referral_code TEXT UNIQUE,
-                referred_by TEXT,
-                total_bookings INTEGER DEFAULT 0,
-                total_diagnostics INTEGER DEFAULT 0,
-                FOREIGN KEY (referred_by) REFERENCES users(discord_id)
-            )
-        ''')
-        
-        # Diagnostics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS diagnostics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                json_data TEXT NOT NULL,
-                critical_count INTEGER DEFAULT 0,
-                warning_count INTEGER DEFAULT 0,
-                recommendation TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(discord_id)
-            )
-        ''')
-        
-        # Bookings table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bookings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                service_type TEXT NOT NULL,
-                calendly_event_id TEXT UNIQUE,
-                scheduled_date DATETIME,
-                completed BOOLEAN DEFAULT 0,
-                payment_received BOOLEAN DEFAULT 0,
-                amount_aed REAL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(discord_id)
-            )
-        ''')
-        
-        # Testimonials table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS testimonials (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                booking_id INTEGER,
-                rating INTEGER CHECK(rating >= 1 AND rating <= 10),
-                feedback TEXT,
-                fps_before INTEGER,
-                fps_after INTEGER,
-                latency_before INTEGER,
-                latency_after INTEGER,
-                approved BOOLEAN DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(discord_id),
-                FOREIGN KEY (booking_id) REFERENCES bookings(id)
-            )
-        ''')
-        
-        # Referrals table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS referrals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                referrer_id TEXT NOT NULL,
-                referred_id TEXT NOT NULL,
-                booking_id INTEGER,
-                credit_amount REAL DEFAULT 50.00,
-                credit_used BOOLEAN DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (referrer_id) REFERENCES users(discord_id),
-                FOREIGN KEY (referred_id) REFERENCES users(discord_id),
-                FOREIGN KEY (booking_id) REFERENCES bookings(id)
-            )
-        ''')
-        
-
-        # Tickets table (Modmail)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                channel_id TEXT NOT NULL,
-                status TEXT DEFAULT 'open',
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(discord_id)
-            )
-        ''')
-
-        # Tags table (Dynamic Knowledge Base)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tags (
-                name TEXT PRIMARY KEY,
-                content TEXT NOT NULL,
-                created_by TEXT,
-                usage_count INTEGER DEFAULT 0,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        self._ensure_specs_column()
+        """Bring the schema up to date (see migrations.py)"""
+        run_migrations(self.get_connection())
         print("Database initialized with all tables")
     
     # ========== USER OPERATIONS ==========
@@ -151,293 +159,1036 @@ class FPSOSDatabase:
     def add_user(self, discord_id, username, email=None):
         """Add or update user in database"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO users (discord_id, username, email)
-            VALUES (?, ?, ?)
-            ON CONFLICT(discord_id) DO UPDATE SET
-                username = excluded.username,
-                email = COALESCE(excluded.email, email)
-        ''', (str(discord_id), username, email))
+        with conn:
+            conn.execute('''
+                INSERT INTO users (discord_id, username, email)
+                VALUES (?, ?, ?)
+                ON CONFLICT(discord_id) DO UPDATE SET
+                    username = excluded.username,
+                    email = COALESCE(excluded.email, email)
+            ''', (str(discord_id), username, email))
+    
+    def bulk_upsert_users(self, users):
+        """Add or update many (discord_id, username) pairs in one transaction"""
+        rows = [(str(discord_id), username) for discord_id, username in users]
+        conn = self.get_connection()
+        
+        with conn:
+            conn.executemany('''
+                INSERT INTO users (discord_id, username)
+                VALUES (?, ?)
+                ON CONFLICT(discord_id) DO UPDATE SET
+                    username = excluded.username
+            ''', rows)
         
-        conn.commit()
-        conn.close()
+        return len(rows)
     
     def get_user(self, discord_id):
         """Get user by Discord ID"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM users WHERE discord_id = ?', (str(discord_id),))
-        result = cursor.fetchone()
-        conn.close()
+        result = conn.execute('SELECT * FROM users WHERE discord_id = ?', (str(discord_id),)).fetchone()
         
         return dict(result) if result else None
     
     def update_user_specs(self, discord_id, specs_str):
         """Update user's PC specs"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
         # Ensure user exists first
         self.add_user(discord_id, "Unknown", None)
         
-        cursor.execute('''
-            UPDATE users 
-            SET specs = ? 
-            WHERE discord_id = ?
-        ''', (specs_str, str(discord_id)))
-        
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+                UPDATE users 
+                SET specs = ? 
+                WHERE discord_id = ?
+            ''', (specs_str, str(discord_id)))
 
-    def _ensure_specs_column(self):
-        """Migration: Ensure specs column exists in users table"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("ALTER TABLE users ADD COLUMN specs TEXT")
-            conn.commit()
-            print("Added 'specs' column to users table.")
-        except sqlite3.OperationalError:
-            pass # Column likely exists
-        conn.close()
-    
     # ========== DIAGNOSTIC OPERATIONS ==========
+    # Hot fields from the upload are stored as typed columns; the full payload is
+    # stored once per distinct content in diagnostic_payloads, compressed.
+
+    def _store_payload(self, conn, json_data):
+        """Store a compressed payload if it is new; returns its content hash"""
+        content_hash, codec, raw_size, blob = compress_payload(json_data)
+        conn.execute('''
+            INSERT OR IGNORE INTO diagnostic_payloads (hash, codec, raw_size, data)
+            VALUES (?, ?, ?, ?)
+        ''', (content_hash, codec, raw_size, blob))
+        return content_hash
     
-    def save_diagnostic(self, user_id, json_data, critical_count, warning_count, recommendation):
-        """Save diagnostic result to database"""
+    def save_diagnostic(self, user_id, json_data, critical_count, warning_count, recommendation, rules_version=None):
+        """Save diagnostic result to database; `rules_version` is the recommendation rules version that scored it"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Save diagnostic
-        cursor.execute('''
-            INSERT INTO diagnostics (user_id, json_data, critical_count, warning_count, recommendation)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (str(user_id), json.dumps(json_data), critical_count, warning_count, recommendation))
+        fields = extract_diagnostic_fields(json_data)
         
-        # Update user's diagnostic count
-        cursor.execute('''
-            UPDATE users 
-            SET total_diagnostics = total_diagnostics + 1
-            WHERE discord_id = ?
-        ''', (str(user_id),))
-        
-        conn.commit()
-        diagnostic_id = cursor.lastrowid
-        conn.close()
+        with conn:
+            payload_hash = self._store_payload(conn, json_data)
+
+            # Save diagnostic (json_data now lives in diagnostic_payloads)
+            cursor = conn.execute('''
+                INSERT INTO diagnostics (
+                    user_id, json_data, critical_count, warning_count, recommendation,
+                    cpu, gpu, ram_gb, network, current_fps, target_fps, latency_ms, payload_hash, rules_version
+                )
+                VALUES (?, '', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                str(user_id), critical_count, warning_count, recommendation,
+                fields['cpu'], fields['gpu'], fields['ram_gb'], fields['network'],
+                fields['current_fps'], fields['target_fps'], fields['latency_ms'], payload_hash, rules_version
+            ))
+            diagnostic_id = cursor.lastrowid
+            
+            # Update user's diagnostic count
+            conn.execute('''
+                UPDATE users 
+                SET total_diagnostics = total_diagnostics + 1
+                WHERE discord_id = ?
+            ''', (str(user_id),))
         
         return diagnostic_id
     
     def get_user_diagnostics(self, discord_id, limit=5):
-        """Get user's recent diagnostics"""
+        """Get user's recent diagnostics (json_data decompressed from the payload store)"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM diagnostics 
-            WHERE user_id = ?
-            ORDER BY created_at DESC
+        results = conn.execute('''
+            SELECT d.*, p.codec AS payload_codec, p.data AS payload_data
+            FROM diagnostics d
+            LEFT JOIN diagnostic_payloads p ON p.hash = d.payload_hash
+            WHERE d.user_id = ?
+            ORDER BY d.created_at DESC
             LIMIT ?
-        ''', (str(discord_id), limit))
-        
-        results = cursor.fetchall()
-        conn.close()
+        ''', (str(discord_id), limit)).fetchall()
         
-        return [dict(row) for row in results]
+        return [_hydrate_diagnostic(row) for row in results]
+
+    def get_diagnostic_payload(self, diagnostic_id):
+        """Get the full uploaded JSON for one diagnostic as a dict"""
+        conn = self.get_connection()
+        row = conn.execute('''
+            SELECT d.json_data, p.codec, p.data
+            FROM diagnostics d
+            LEFT JOIN diagnostic_payloads p ON p.hash = d.payload_hash
+            WHERE d.id = ?
+        ''', (diagnostic_id,)).fetchone()
+        if not row:
+            archive = next((a for a in self._archive_index() if a['min_id'] <= diagnostic_id <= a['max_id']), None)
+            if archive is None:
+                return None
+            alias = self._attach_archive(conn, archive['filename'])
+            row = conn.execute(f'''
+                SELECT d.json_data, p.codec, p.data
+                FROM {alias}.diagnostics d
+                LEFT JOIN {alias}.diagnostic_payloads p ON p.hash = d.payload_hash
+                WHERE d.id = ?
+            ''', (diagnostic_id,)).fetchone()
+            if not row:
+                return None
+        if row['data'] is not None:
+            return json.loads(decompress_payload(row['codec'], row['data']))
+        return json.loads(row['json_data'])
+
+    def get_latest_diagnostic(self, discord_id):
+        """Get a user's most recent diagnostic summary (typed columns, no payload)"""
+        rows, _ = self.get_diagnostics_page(discord_id, limit=1)
+        return rows[0] if rows else None
+
+    def get_diagnostics_page(self, discord_id, before_id=None, limit=10):
+        """Get one page of a user's diagnostics history, newest first
+
+        Keyset pagination on id: pass the returned `next_before_id` back as
+        `before_id` for the next page, so every page is one index range read
+        however deep it is. Once the live table runs out the walk continues
+        into the monthly archives. Returns (rows, next_before_id), where
+        next_before_id is None after the last page.
+        """
+        conn = self.get_connection()
+        columns = ', '.join(DIAGNOSTIC_SUMMARY_COLUMNS)
+        cursor = before_id if before_id is not None else 2 ** 63 - 1
+        rows = [dict(row) for row in conn.execute(f'''
+            SELECT {columns} FROM diagnostics
+            WHERE user_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (str(discord_id), cursor, limit))]
+
+        for archive in self._archive_index():
+            if len(rows) >= limit:
+                break
+            cursor = rows[-1]['id'] if rows else cursor
+            if archive['min_id'] >= cursor:
+                continue
+            alias = self._attach_archive(conn, archive['filename'])
+            rows.extend(dict(row) for row in conn.execute(f'''
+                SELECT {columns} FROM {alias}.diagnostics
+                WHERE user_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (str(discord_id), cursor, limit - len(rows))))
+
+        return rows, (rows[-1]['id'] if len(rows) == limit else None)
+
+    # ========== DIAGNOSTIC ARCHIVES ==========
+    # Diagnostics older than the retention window move to one SQLite file per
+    # month under archive/ next to the database, together with the payloads
+    # they reference. Archives are ATTACHed to a connection only when a history
+    # page or payload lookup reaches them.
+
+    MAX_ATTACHED_ARCHIVES = 8  # SQLite allows 10 attached databases by default
+
+    @property
+    def archive_dir(self):
+        return Path(self.db_path).resolve().parent / 'archive'
+
+    def _load_archives(self):
+        """(Re)load the archive catalogue, newest first"""
+        rows = self.get_connection().execute('SELECT * FROM diagnostic_archives ORDER BY max_id DESC').fetchall()
+        with self._archive_lock:
+            self._archives = [dict(row) for row in rows]
+
+    def _archive_index(self):
+        """Cached diagnostic_archives rows, newest first"""
+        with self._archive_lock:
+            return self._archives
+
+    def _attach_archive(self, conn, filename):
+        """ATTACH an archive file to this thread's connection (if needed); returns its schema name"""
+        attached = getattr(self._local, 'archives', None)
+        if attached is None:
+            attached = self._local.archives = OrderedDict()
+        alias = 'archive_' + re.sub(r'\W', '_', Path(filename).stem.split('-', 1)[-1])
+        if alias in attached:
+            attached.move_to_end(alias)
+            return alias
+
+        if len(attached) >= self.MAX_ATTACHED_ARCHIVES:
+            oldest, _ = attached.popitem(last=False)
+            conn.execute(f'DETACH DATABASE {oldest}')
+        conn.execute(f'ATTACH DATABASE ? AS {alias}', (str(self.archive_dir / filename),))
+        conn.execute(f'PRAGMA {alias}.journal_mode = WAL')
+        attached[alias] = filename
+        return alias
+
+    def _ensure_archive_schema(self, conn, alias):
+        """Create or widen the archive tables to match diagnostics; returns the shared columns"""
+        columns = conn.execute('PRAGMA main.table_info(diagnostics)').fetchall()
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {alias}.diagnostics (id INTEGER PRIMARY KEY)')
+        existing = {row['name'] for row in conn.execute(f'PRAGMA {alias}.table_info(diagnostics)')}
+        for column in columns:
+            if column['name'] not in existing:
+                conn.execute(f'ALTER TABLE {alias}.diagnostics ADD COLUMN {column["name"]} {column["type"]}')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {alias}.idx_diagnostics_user_id ON diagnostics(user_id, id)')
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {alias}.diagnostic_payloads (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                raw_size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                created_at DATETIME
+            )
+        ''')
+        return [column['name'] for column in columns]
+
+    def archive_diagnostics(self, days, batch_size=500):
+        """Move diagnostics older than `days` into monthly archive files
+
+        Works through the oldest rows in id order, one committed batch at a
+        time, and stops at the first row inside the retention window. Rows are
+        copied with INSERT OR IGNORE before they are deleted from the live
+        table, so an interrupted run can simply be repeated. Payloads go with
+        their diagnostics and are dropped from the live store once nothing
+        references them. Local SQLite databases only.
+        Returns {'archived': n, 'payloads': n, 'months': {month: n}}.
+        """
+        if not self.backend.supports_attach:
+            raise NotImplementedError(f"Archiving needs ATTACH, which the {self.backend.name} backend does not support")
+
+        conn = self.get_connection()
+        cutoff = conn.execute('SELECT datetime(\'now\', ?)', (f'{-int(days)} days',)).fetchone()[0]
+        self.archive_dir.mkdir(exist_ok=True)
+        report = {'archived': 0, 'payloads': 0, 'months': {}}
+        last_id = 0
+
+        while True:
+            batch = conn.execute('''
+                SELECT id, created_at, payload_hash FROM diagnostics
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            # Ids follow insertion time, so the batch is cut at the first row inside the window
+            rows = []
+            for row in batch:
+                if row['created_at'] >= cutoff:
+                    break
+                rows.append(row)
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            by_month = {}
+            for row in rows:
+                by_month.setdefault(row['created_at'][:7], []).append(row)
+            for month, month_rows in by_month.items():
+                # ATTACH and DDL cannot run inside the transaction
+                alias = self._attach_archive(conn, f'diagnostics-{month}.db')
+                column_list = ', '.join(self._ensure_archive_schema(conn, alias))
+
+                with conn:
+                    ids = [row['id'] for row in month_rows]
+                    hashes = list({row['payload_hash'] for row in month_rows if row['payload_hash']})
+                    id_marks, hash_marks = ', '.join('?' * len(ids)), ', '.join('?' * len(hashes))
+
+                    copied = conn.execute(f'''
+                        INSERT OR IGNORE INTO {alias}.diagnostics ({column_list})
+                        SELECT {column_list} FROM main.diagnostics WHERE id IN ({id_marks})
+                    ''', ids).rowcount
+                    if hashes:
+                        conn.execute(f'''
+                            INSERT OR IGNORE INTO {alias}.diagnostic_payloads (hash, codec, raw_size, data, created_at)
+                            SELECT hash, codec, raw_size, data, created_at FROM main.diagnostic_payloads
+                            WHERE hash IN ({hash_marks})
+                        ''', hashes)
+                    conn.execute(f'DELETE FROM main.diagnostics WHERE id IN ({id_marks})', ids)
+                    if hashes:
+                        report['payloads'] += conn.execute(f'''
+                            DELETE FROM main.diagnostic_payloads
+                            WHERE hash IN ({hash_marks})
+                            AND NOT EXISTS (SELECT 1 FROM main.diagnostics d WHERE d.payload_hash = diagnostic_payloads.hash)
+                        ''', hashes).rowcount
+
+                    conn.execute('''
+                        INSERT INTO diagnostic_archives (month, filename, min_id, max_id, row_count)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(month) DO UPDATE SET
+                            min_id = min(min_id, excluded.min_id),
+                            max_id = max(max_id, excluded.max_id),
+                            row_count = row_count + excluded.row_count,
+                            archived_at = CURRENT_TIMESTAMP
+                    ''', (month, f'diagnostics-{month}.db', min(ids), max(ids), copied))
+                    report['months'][month] = report['months'].get(month, 0) + len(ids)
+                    report['archived'] += len(ids)
+
+            self._load_archives()
+
+            # A cut or short batch means the run reached the window or the end of the table
+            if len(rows) < batch_size:
+                break
+
+        return report
+
+    def backfill_diagnostics(self, batch_size=500):
+        """Move legacy json_data rows into typed columns and the compressed payload store
+
+        Walks the table in id order one batch at a time, committing each batch,
+        so memory stays flat and the bot can keep writing meanwhile. Rows whose
+        json_data is not valid JSON are left untouched. Returns a report dict.
+        """
+        conn = self.get_connection()
+        report = {'converted': 0, 'skipped': 0, 'bytes_before': 0, 'bytes_after': 0}
+        last_id = 0
+
+        while True:
+            rows = conn.execute('''
+                SELECT id, json_data FROM diagnostics
+                WHERE id > ? AND payload_hash IS NULL
+                ORDER BY id
+                LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            with conn:
+                for row in rows:
+                    try:
+                        json_data = json.loads(row['json_data'])
+                    except (TypeError, ValueError):
+                        report['skipped'] += 1
+                        continue
+
+                    fields = extract_diagnostic_fields(json_data)
+                    content_hash, codec, raw_size, blob = compress_payload(json_data)
+                    inserted = conn.execute('''
+                        INSERT OR IGNORE INTO diagnostic_payloads (hash, codec, raw_size, data)
+                        VALUES (?, ?, ?, ?)
+                    ''', (content_hash, codec, raw_size, blob)).rowcount
+                    conn.execute('''
+                        UPDATE diagnostics
+                        SET json_data = '', cpu = ?, gpu = ?, ram_gb = ?, network = ?,
+                            current_fps = ?, target_fps = ?, latency_ms = ?, payload_hash = ?
+                        WHERE id = ?
+                    ''', (
+                        fields['cpu'], fields['gpu'], fields['ram_gb'], fields['network'],
+                        fields['current_fps'], fields['target_fps'], fields['latency_ms'],
+                        content_hash, row['id']
+                    ))
+
+                    report['converted'] += 1
+                    report['bytes_before'] += len(row['json_data'].encode('utf-8'))
+                    report['bytes_after'] += len(blob) if inserted else 0
+
+        return report
     
+    def get_diagnostic_features(self, features):
+        """Every live diagnostic's id, recommendation and the given numeric columns, as {column: list}
+
+        Feeds the recommendation re-score, which evaluates the whole table at
+        once; archived diagnostics are not included.
+        """
+        columns = ('id', 'recommendation', *features)
+        if not set(features) <= set(DIAGNOSTIC_SUMMARY_COLUMNS):
+            raise ValueError(f"Unknown diagnostics columns: {sorted(set(features) - set(DIAGNOSTIC_SUMMARY_COLUMNS))}")
+        rows = self.get_connection().execute(f"SELECT {', '.join(columns)} FROM diagnostics ORDER BY id").fetchall()
+        return {column: [row[index] for row in rows] for index, column in enumerate(columns)}
+
+    def update_recommendations(self, updates, rules_version, batch_size=1000):
+        """Set (id, recommendation) pairs, stamping `rules_version`, one committed batch at a time; returns rows updated"""
+        conn = self.get_connection()
+        updated = 0
+        for start in range(0, len(updates), batch_size):
+            batch = updates[start:start + batch_size]
+            with conn:
+                conn.executemany(
+                    'UPDATE diagnostics SET recommendation = ?, rules_version = ? WHERE id = ?',
+                    [(recommendation, rules_version, diagnostic_id) for diagnostic_id, recommendation in batch]
+                )
+            updated += len(batch)
+        return updated
+
+    # ========== ANALYSIS CACHE ==========
+    # Results of accepted uploads keyed by (upload content hash, user), so a user
+    # re-uploading the same file is answered without re-analysis or a new
+    # diagnostics row. The most recently used ANALYSIS_CACHE_SIZE entries are
+    # also kept in memory; triggers count hits and misses into stats_counters.
+
+    def _remember_analysis(self, key, entry):
+        with self._analysis_lock:
+            self._analyses[key] = entry
+            self._analyses.move_to_end(key)
+            while len(self._analyses) > ANALYSIS_CACHE_SIZE:
+                self._analyses.popitem(last=False)
+
+    def get_cached_analysis(self, upload_hash, user_id, rules_version):
+        """The cached result for this user's upload, or None if there is none or other rules scored it"""
+        key = (upload_hash, str(user_id))
+        with self._analysis_lock:
+            entry = self._analyses.get(key)
+            if entry is not None:
+                self._analyses.move_to_end(key)
+        if entry is None:
+            row = self.get_connection().execute(
+                'SELECT rules_version, result FROM analysis_cache WHERE upload_hash = ? AND user_id = ?', key
+            ).fetchone()
+            if row is None:
+                return None
+            entry = (row['rules_version'], json.loads(row['result']))
+            self._remember_analysis(key, entry)
+        version, result = entry
+        return dict(result) if version == rules_version else None
+
+    def cache_analysis(self, upload_hash, user_id, rules_version, result, diagnostic_id=None):
+        """Store the result of analyzing this user's upload (replacing one from older rules); counts a miss"""
+        key = (upload_hash, str(user_id))
+        conn = self.get_connection()
+        with conn:
+            conn.execute('''
+                INSERT INTO analysis_cache (upload_hash, user_id, rules_version, result, diagnostic_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(upload_hash, user_id) DO UPDATE SET
+                    rules_version = excluded.rules_version,
+                    result = excluded.result,
+                    diagnostic_id = excluded.diagnostic_id,
+                    analyses = analyses + 1,
+                    last_used_at = CURRENT_TIMESTAMP
+            ''', (*key, rules_version, json.dumps(result), diagnostic_id))
+        self._remember_analysis(key, (rules_version, dict(result)))
+
+    def record_cache_hit(self, upload_hash, user_id):
+        """Count a re-upload answered from the cache"""
+        conn = self.get_connection()
+        with conn:
+            conn.execute('''
+                UPDATE analysis_cache
+                SET hits = hits + 1, last_used_at = CURRENT_TIMESTAMP
+                WHERE upload_hash = ? AND user_id = ?
+            ''', (upload_hash, str(user_id)))
+
     # ========== BOOKING OPERATIONS ==========
     
     def create_booking(self, user_id, service_type, calendly_event_id=None, scheduled_date=None, amount_aed=None):
         """Create a new booking"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO bookings (user_id, service_type, calendly_event_id, scheduled_date, amount_aed)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (str(user_id), service_type, calendly_event_id, scheduled_date, amount_aed))
         
-        # Update user's booking count
-        cursor.execute('''
-            UPDATE users
-            SET total_bookings = total_bookings + 1
-            WHERE discord_id = ?
-        ''', (str(user_id),))
-        
-        conn.commit()
-        booking_id = cursor.lastrowid
-        conn.close()
+        with conn:
+            cursor = conn.execute('''
+                INSERT INTO bookings (user_id, service_type, calendly_event_id, scheduled_date, amount_aed)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (str(user_id), service_type, calendly_event_id, scheduled_date, amount_aed))
+            booking_id = cursor.lastrowid
+            
+            # Update user's booking count
+            conn.execute('''
+                UPDATE users
+                SET total_bookings = total_bookings + 1
+                WHERE discord_id = ?
+            ''', (str(user_id),))
         
         return booking_id
     
     def get_booking_by_calendly_id(self, calendly_event_id):
         """Get booking by Calendly event ID"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM bookings WHERE calendly_event_id = ?', (calendly_event_id,))
-        result = cursor.fetchone()
-        conn.close()
+        result = conn.execute('SELECT * FROM bookings WHERE calendly_event_id = ?', (calendly_event_id,)).fetchone()
         
         return dict(result) if result else None
     
     def mark_booking_complete(self, booking_id):
         """Mark booking as completed"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE bookings
-            SET completed = 1
-            WHERE id = ?
-        ''', (booking_id,))
         
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+                UPDATE bookings
+                SET completed = 1
+                WHERE id = ?
+            ''', (booking_id,))
         
     # ========== TICKET OPERATIONS (MODMAIL) ==========
 
+    # Open tickets are mirrored in memory (by id, user and channel), so modmail
+    # routing on every DM and ticket-channel message never reads the database.
+    # Only create_ticket() and close_ticket() change ticket status.
+
+    def _load_tickets(self):
+        """(Re)load the open-ticket index from the database"""
+        conn = self.get_connection()
+        rows = conn.execute("SELECT * FROM tickets WHERE status = 'open' ORDER BY id").fetchall()
+        with self._ticket_lock:
+            self._tickets, self._tickets_by_user, self._tickets_by_channel = {}, {}, {}
+            for row in rows:
+                self._index_ticket(dict(row))
+
+    def _index_ticket(self, ticket):
+        """Add an open ticket to the index (caller holds _ticket_lock)"""
+        self._tickets[ticket['id']] = ticket
+        self._tickets_by_user.setdefault(ticket['user_id'], {})[ticket['id']] = None
+        self._tickets_by_channel[ticket['channel_id']] = ticket['id']
+
+    def _unindex_ticket(self, ticket_id):
+        """Remove a ticket from the index (caller holds _ticket_lock)"""
+        ticket = self._tickets.pop(ticket_id, None)
+        if ticket is None:
+            return
+        user_tickets = self._tickets_by_user.get(ticket['user_id'], {})
+        user_tickets.pop(ticket_id, None)
+        if not user_tickets:
+            self._tickets_by_user.pop(ticket['user_id'], None)
+        if self._tickets_by_channel.get(ticket['channel_id']) == ticket_id:
+            del self._tickets_by_channel[ticket['channel_id']]
+
     def create_ticket(self, user_id, channel_id):
         """Create a new open ticket"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO tickets (user_id, channel_id, status) VALUES (?, ?, ?)', 
-                       (str(user_id), str(channel_id), 'open'))
-        conn.commit()
-        ticket_id = cursor.lastrowid
-        conn.close()
-        return ticket_id
+        with conn:
+            row = conn.execute('INSERT INTO tickets (user_id, channel_id, status) VALUES (?, ?, ?) RETURNING *', 
+                               (str(user_id), str(channel_id), 'open')).fetchone()
+        with self._ticket_lock:
+            self._index_ticket(dict(row))
+        return row['id']
 
     def get_active_ticket(self, user_id):
         """Get active (open) ticket for a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tickets WHERE user_id = ? AND status = 'open'", (str(user_id),))
-        result = cursor.fetchone()
-        conn.close()
-        return dict(result) if result else None
+        with self._ticket_lock:
+            ticket_ids = self._tickets_by_user.get(str(user_id))
+            return dict(self._tickets[next(iter(ticket_ids))]) if ticket_ids else None
         
     def get_ticket_by_channel(self, channel_id):
         """Get ticket associated with a channel ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM tickets WHERE channel_id = ? AND status = 'open'", (str(channel_id),))
-        result = cursor.fetchone()
-        conn.close()
-        return dict(result) if result else None
+        with self._ticket_lock:
+            ticket_id = self._tickets_by_channel.get(str(channel_id))
+            return dict(self._tickets[ticket_id]) if ticket_id is not None else None
 
     def close_ticket(self, ticket_id):
         """Close a ticket"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE tickets SET status = 'closed' WHERE id = ?", (ticket_id,))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("UPDATE tickets SET status = 'closed' WHERE id = ?", (ticket_id,))
+        with self._ticket_lock:
+            self._unindex_ticket(ticket_id)
+
+    def verify_ticket_index(self, repair=False):
+        """Compare the open-ticket index with the tickets table
+
+        Returns {'open': n, 'indexed': n, 'missing': [ids], 'stale': [ids],
+        'mismatched': [ids]}; with repair=True the index is reloaded afterwards.
+        """
+        conn = self.get_connection()
+        rows = {row['id']: dict(row) for row in conn.execute("SELECT * FROM tickets WHERE status = 'open'")}
+        with self._ticket_lock:
+            indexed = {ticket_id: dict(ticket) for ticket_id, ticket in self._tickets.items()}
+            lookups_ok = {
+                ticket_id for ticket_id, ticket in indexed.items()
+                if ticket_id in self._tickets_by_user.get(ticket['user_id'], {})
+                and self._tickets_by_channel.get(ticket['channel_id']) == ticket_id
+            }
+
+        report = {
+            'open': len(rows),
+            'indexed': len(indexed),
+            'missing': sorted(rows.keys() - indexed.keys()),
+            'stale': sorted(indexed.keys() - rows.keys()),
+            'mismatched': sorted(
+                ticket_id for ticket_id in rows.keys() & indexed.keys()
+                if rows[ticket_id] != indexed[ticket_id] or ticket_id not in lookups_ok
+            ),
+        }
+        if repair:
+            self._load_tickets()
+        return report
 
     # ========== TAG OPERATIONS (KNOWLEDGE BASE) ==========
+    # Tags are read from an in-memory copy of the table, so `?tag` lookups never
+    # touch the disk. Usage counts are buffered and written in batches by
+    # flush_tag_usage(), which the bot runs on a timer and close() runs on exit.
+
+    def _load_tags(self):
+        """(Re)load the tag cache from the database"""
+        conn = self.get_connection()
+        tags = {row['name']: dict(row) for row in conn.execute('SELECT * FROM tags')}
+        with self._tag_lock:
+            self._tags = tags
+            self._tag_index.rebuild(tags)
+
+    def _refresh_tag(self, name):
+        """Re-read one tag into the cache after it changed on disk"""
+        conn = self.get_connection()
+        row = conn.execute('SELECT * FROM tags WHERE name = ?', (name,)).fetchone()
+        with self._tag_lock:
+            if row:
+                self._tags[name] = dict(row)
+                self._tag_index.add(name)
+            else:
+                self._tags.pop(name, None)
+                self._tag_usage.pop(name, None)
+                self._tag_index.remove(name)
 
     def add_tag(self, name, content, created_by):
         """Create or update a tag"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO tags (name, content, created_by) VALUES (?, ?, ?)
-            ON CONFLICT(name) DO UPDATE SET content=excluded.content, created_by=excluded.created_by
-        ''', (name.lower(), content, str(created_by)))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+                INSERT INTO tags (name, content, created_by) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET content=excluded.content, created_by=excluded.created_by
+            ''', (name.lower(), content, str(created_by)))
+        self._refresh_tag(name.lower())
 
     def delete_tag(self, name):
         """Delete a tag by name"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM tags WHERE name = ?', (name.lower(),))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('DELETE FROM tags WHERE name = ?', (name.lower(),))
+        self._refresh_tag(name.lower())
 
     def get_tag(self, name):
-        """Get a tag and increment usage"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM tags WHERE name = ?', (name.lower(),))
-        result = cursor.fetchone()
-        
-        if result:
-            cursor.execute('UPDATE tags SET usage_count = usage_count + 1 WHERE name = ?', (name.lower(),))
-            conn.commit()
-            
-        conn.close()
-        return dict(result) if result else None
+        """Get a tag and count a use (served from memory)"""
+        self._check_caches()
+        name = name.lower()
+        with self._tag_lock:
+            tag = self._tags.get(name)
+            if not tag:
+                return None
+            pending = self._tag_usage.get(name, 0) + 1
+            self._tag_usage[name] = pending
+            return dict(tag, usage_count=tag['usage_count'] + pending - 1)
     
     def get_all_tags(self):
         """List all available tags"""
+        self._check_caches()
+        with self._tag_lock:
+            return list(self._tag_index.names)
+
+    def _tag_uses(self, name):
+        """Stored plus buffered uses of a tag (caller holds _tag_lock)"""
+        return self._tags[name]['usage_count'] + self._tag_usage.get(name, 0)
+
+    def autocomplete_tags(self, prefix, limit=25):
+        """Tag names for a slash-command autocomplete, most used first
+
+        Names starting with what was typed come first; if there are fewer than
+        `limit`, close fuzzy matches fill the rest.
+        """
+        self._check_caches()
+        prefix = prefix.strip().lower()
+        with self._tag_lock:
+            names = sorted(self._tag_index.prefixed(prefix), key=self._tag_uses, reverse=True)[:limit]
+            if len(names) < limit and prefix:
+                seen = set(names)
+                fuzzy = self._tag_index.similar(prefix, limit=limit)
+                names += [name for name, _ in rank_by_usage(fuzzy, self._tag_uses) if name not in seen][:limit - len(names)]
+            return names
+
+    def suggest_tags(self, name, limit=3):
+        """'Did you mean' candidates for a missing tag, by similarity and usage"""
+        self._check_caches()
+        with self._tag_lock:
+            matches = self._tag_index.similar(name.strip().lower(), limit=limit * 3)
+            return [name for name, _ in rank_by_usage(matches, self._tag_uses)[:limit]]
+
+    @staticmethod
+    def _fts_query(text):
+        """User text -> FTS5 MATCH expression: every word required, the last one as a prefix
+
+        Each word is quoted, so punctuation and FTS operators (AND, NEAR, ^, :)
+        in what staff type are searched for literally instead of raising.
+        """
+        words = [word.replace('"', '""') for word in text.split()]
+        if not words:
+            return None
+        return ' '.join(f'"{word}"' for word in words) + '*'
+
+    def search_tags(self, query, limit=10):
+        """Full-text search over tag names and content, best match first
+
+        Returns dicts with name, snippet (matches wrapped in ** for Discord)
+        and score (the index's BM25 rank, lower is better).
+        """
+        match = self._fts_query(query)
+        if match is None:
+            return []
+        conn = self.get_connection()
+        rows = conn.execute('''
+            SELECT name, snippet(tags_fts, 1, '**', '**', '…', 16) AS snippet, rank AS score
+            FROM tags_fts
+            WHERE tags_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ''', (match, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def reindex_tags(self):
+        """Rebuild the tag full-text index from the tags table; returns tags indexed
+
+        The triggers keep the index current, so this is only needed after
+        editing tags outside the bot or to compact the index after bulk edits.
+        """
+        conn = self.get_connection()
+        with conn:
+            conn.execute("INSERT INTO tags_fts (tags_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO tags_fts (tags_fts) VALUES ('optimize')")
+        return conn.execute('SELECT COUNT(*) FROM tags').fetchone()[0]
+
+    def flush_tag_usage(self):
+        """Write buffered tag usage counts in one batch; returns tags updated"""
+        with self._tag_lock:
+            pending, self._tag_usage = self._tag_usage, {}
+        if not pending:
+            return 0
+
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.executemany(
+                    'UPDATE tags SET usage_count = usage_count + ? WHERE name = ?',
+                    [(count, name) for name, count in pending.items()]
+                )
+        except Exception:
+            # Put the counts back so the next flush retries them
+            with self._tag_lock:
+                for name, count in pending.items():
+                    self._tag_usage[name] = self._tag_usage.get(name, 0) + count
+            raise
+
+        with self._tag_lock:
+            for name, count in pending.items():
+                if name in self._tags:
+                    self._tags[name]['usage_count'] += count
+        return len(pending)
+
+    # ========== INTENT OPERATIONS (DM ASSISTANT) ==========
+    # Intent phrases are kept in memory like tags. intents_version goes up on
+    # every change so utils.intents knows when to recompile its matcher.
+
+    def _load_intents(self):
+        """(Re)load the intent phrases from the database"""
+        conn = self.get_connection()
+        rows = [dict(row) for row in conn.execute('SELECT * FROM intents')]
+        with self._intent_lock:
+            self._intents = {(row['intent'], row['phrase']): row for row in rows}
+            self.intents_version += 1
+
+    def get_intent_phrases(self):
+        """All intent phrases as dicts (intent, phrase, match, priority, ...)"""
+        self._check_caches()
+        with self._intent_lock:
+            return [dict(row) for row in self._intents.values()]
+
+    def add_intent_phrase(self, intent, phrase, match='keyword', priority=0, created_by=None):
+        """Create or update one intent phrase"""
+        intent, phrase = intent.strip().lower(), ' '.join(phrase.lower().split())
+        conn = self.get_connection()
+        with conn:
+            row = conn.execute('''
+                INSERT INTO intents (intent, phrase, match, priority, created_by) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(intent, phrase) DO UPDATE SET
+                    match = excluded.match, priority = excluded.priority, created_by = excluded.created_by
+                RETURNING *
+            ''', (intent, phrase, match, priority, str(created_by) if created_by else None)).fetchone()
+        with self._intent_lock:
+            self._intents[(intent, phrase)] = dict(row)
+            self.intents_version += 1
+
+    def delete_intent_phrase(self, intent, phrase):
+        """Delete one intent phrase; returns True if it existed"""
+        intent, phrase = intent.strip().lower(), ' '.join(phrase.lower().split())
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT name FROM tags ORDER BY name ASC')
-        results = cursor.fetchall()
-        conn.close()
-        return [row['name'] for row in results]
+        with conn:
+            deleted = conn.execute('DELETE FROM intents WHERE intent = ? AND phrase = ?', (intent, phrase)).rowcount
+        with self._intent_lock:
+            self._intents.pop((intent, phrase), None)
+            self.intents_version += 1
+        return deleted > 0
+
+    # ========== CACHE INVALIDATION ==========
+    # Every process keeps its own copy of tags and intents. Triggers bump
+    # cache_versions on each edit, and the cached reads above check it at most
+    # once per CACHE_CHECK_INTERVAL, so an edit made on another cluster (or
+    # outside the bot) is served within about a second.
+
+    _CACHED_TABLES = {'tags': '_load_tags', 'intents': '_load_intents'}
+
+    def _read_cache_versions(self):
+        conn = self.get_connection()
+        rows = conn.execute('SELECT name, version FROM cache_versions WHERE name IN (?, ?)', tuple(self._CACHED_TABLES))
+        return {row['name']: row['version'] for row in rows}
+
+    def cache_check_due(self):
+        """Whether the next cached read will check cache_versions"""
+        return time.monotonic() - self._cache_checked >= self.CACHE_CHECK_INTERVAL
+
+    def refresh_caches(self):
+        """Reload any cached table edited since it was loaded; returns the tables reloaded"""
+        self._cache_checked = time.monotonic()
+        versions = self._read_cache_versions()
+        reloaded = []
+        for table, loader in self._CACHED_TABLES.items():
+            if versions.get(table) != self._cache_versions.get(table):
+                # Versions are read before reloading, so an edit in between is caught next time
+                getattr(self, loader)()
+                self._cache_versions[table] = versions.get(table)
+                reloaded.append(table)
+        return reloaded
+
+    def _check_caches(self):
+        if self.cache_check_due():
+            self.refresh_caches()
+
+    # ========== CLUSTER LEASES ==========
+
+    # Unix seconds from the database clock; every cluster compares against the same clock
+    _NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+    def acquire_lease(self, name, holder, ttl):
+        """Take or renew the lease `name` for `ttl` seconds; returns the holder afterwards
+
+        The lease goes to `holder` if it is free, expired or already theirs,
+        in one statement, so two clusters racing for it cannot both win.
+        """
+        conn = self.get_connection()
+        with conn:
+            conn.execute(f'''
+                INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, {self._NOW} + ?)
+                ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                WHERE leases.holder = excluded.holder OR leases.expires_at < {self._NOW}
+            ''', (name, holder, ttl))
+            row = conn.execute('SELECT holder FROM leases WHERE name = ?', (name,)).fetchone()
+        return row['holder']
+
+    def release_lease(self, name, holder):
+        """Give up the lease `name` if `holder` has it, so another cluster can take over at once"""
+        conn = self.get_connection()
+        with conn:
+            released = conn.execute('DELETE FROM leases WHERE name = ? AND holder = ?', (name, holder)).rowcount
+        return released > 0
+
+    def get_leases(self):
+        """Every lease with its holder and seconds left (negative once expired)"""
+        conn = self.get_connection()
+        rows = conn.execute(f'SELECT name, holder, expires_at - {self._NOW} AS remaining FROM leases ORDER BY name')
+        return [dict(row) for row in rows]
+
+    # ========== EXPORTS ==========
+
+    # Exported columns per table (payload blobs are left out of diagnostics)
+    EXPORT_COLUMNS = {
+        'users': ('discord_id', 'username', 'email', 'join_date', 'referral_code', 'referred_by',
+                  'total_bookings', 'total_diagnostics', 'specs'),
+        'diagnostics': ('id', 'user_id', 'critical_count', 'warning_count', 'recommendation',
+                        'cpu', 'gpu', 'ram_gb', 'network', 'current_fps', 'target_fps', 'latency_ms',
+                        'payload_hash', 'created_at'),
+        'bookings': ('id', 'user_id', 'service_type', 'calendly_event_id', 'scheduled_date', 'completed',
+                     'payment_received', 'amount_aed', 'created_at'),
+    }
+
+    def iter_export(self, table, fmt='ndjson'):
+        """Yield a table as NDJSON or CSV lines, streaming from a cursor
+
+        Runs on its own short-lived connection so a long export never holds a
+        pooled connection, and memory stays constant regardless of table size.
+        Sync-only: iterate it from a script or a worker thread, not the event loop.
+        """
+        if table not in self.EXPORT_COLUMNS:
+            raise ValueError(f"Unknown export table: {table}")
+        if fmt not in ('ndjson', 'csv'):
+            raise ValueError(f"Unknown export format: {fmt}")
+
+        columns = self.EXPORT_COLUMNS[table]
+        conn = self._open_connection()
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table}")
+            if fmt == 'ndjson':
+                for row in cursor:
+                    yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+            else:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator='\n')
+                writer.writerow(columns)
+                for row in cursor:
+                    writer.writerow(row)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+        finally:
+            conn.close()
 
     # ========== ANALYTICS ==========
+
+    # get_stats windows -> days before today included in the rollup
+    STATS_WINDOWS = {'today': 0, '7d': 6, '30d': 29}
     
-    def get_stats(self):
-        """Get overall bot statistics"""
+    def get_stats(self, window=None):
+        """Get bot statistics, all-time or for a window ('today', '7d', '30d')
+
+        Reads the rollups maintained by the stats triggers (see migrations.py),
+        so the cost does not grow with history.
+        """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Total users
-        cursor.execute('SELECT COUNT(*) as count FROM users')
-        total_users = cursor.fetchone()['count']
-        
-        # Total diagnostics
-        cursor.execute('SELECT COUNT(*) as count FROM diagnostics')
-        total_diagnostics = cursor.fetchone()['count']
-        
-        # Total bookings
-        cursor.execute('SELECT COUNT(*) as count FROM bookings')
-        total_bookings = cursor.fetchone()['count']
-        
-        # Completed bookings
-        cursor.execute('SELECT COUNT(*) as count FROM bookings WHERE completed = 1')
-        completed_bookings = cursor.fetchone()['count']
-        
-        # Total revenue
-        cursor.execute('SELECT SUM(amount_aed) as total FROM bookings WHERE completed = 1')
-        total_revenue = cursor.fetchone()['total'] or 0
+
+        if window is None:
+            counters = dict(conn.execute('''
+                SELECT name, value FROM stats_counters
+                WHERE name IN ('users', 'diagnostics', 'bookings', 'completed_bookings', 'revenue', 'cache_hits', 'cache_misses')
+            ''').fetchall())
+            totals = {
+                name: counters.get(name, 0)
+                for name in ('users', 'diagnostics', 'bookings', 'completed_bookings', 'revenue', 'cache_hits', 'cache_misses')
+            }
+            popular_service = conn.execute(
+                'SELECT service_type FROM stats_service WHERE bookings > 0 ORDER BY bookings DESC LIMIT 1'
+            ).fetchone()
+            popular_service = popular_service['service_type'] if popular_service else None
+        else:
+            if window not in self.STATS_WINDOWS:
+                raise ValueError(f"Unknown stats window: {window}")
+            since = f"-{self.STATS_WINDOWS[window]} days"
+            row = conn.execute('''
+                SELECT COALESCE(SUM(users), 0) AS users,
+                       COALESCE(SUM(diagnostics), 0) AS diagnostics,
+                       COALESCE(SUM(bookings), 0) AS bookings,
+                       COALESCE(SUM(completed_bookings), 0) AS completed_bookings,
+                       COALESCE(SUM(revenue), 0) AS revenue
+                FROM stats_daily
+                WHERE day >= date('now', ?)
+            ''', (since,)).fetchone()
+            totals = dict(row)
+            by_service = {}
+            for service in conn.execute(
+                "SELECT service_type, bookings FROM stats_service_daily WHERE day >= date('now', ?)", (since,)
+            ):
+                by_service[service['service_type']] = by_service.get(service['service_type'], 0) + service['bookings']
+            popular_service = max(by_service, key=by_service.get) if by_service else None
+
+        total_diagnostics = int(totals['diagnostics'])
+        total_bookings = int(totals['bookings'])
         
         # Conversion rate
         conversion_rate = (total_bookings / total_diagnostics * 100) if total_diagnostics > 0 else 0
-        
-        # Popular service
-        cursor.execute('''
-            SELECT service_type, COUNT(*) as count
-            FROM bookings
-            GROUP BY service_type
-            ORDER BY count DESC
-            LIMIT 1
-        ''')
-        popular_service = cursor.fetchone()
-        
-        conn.close()
+
+        # Share of accepted uploads answered from the analysis cache (counted all-time only)
+        cache_hits = cache_hit_ratio = None
+        if window is None:
+            cache_hits = int(totals['cache_hits'])
+            uploads = cache_hits + int(totals['cache_misses'])
+            cache_hit_ratio = round(cache_hits / uploads * 100, 2) if uploads > 0 else 0
         
         return {
-            'total_users': total_users,
+            'total_users': int(totals['users']),
             'total_diagnostics': total_diagnostics,
             'total_bookings': total_bookings,
-            'completed_bookings': completed_bookings,
-            'total_revenue': total_revenue,
+            'completed_bookings': int(totals['completed_bookings']),
+            'total_revenue': totals['revenue'] or 0,
             'conversion_rate': round(conversion_rate, 2),
-            'popular_service': popular_service['service_type'] if popular_service else 'None'
+            'popular_service': popular_service or 'None',
+            'cache_hits': cache_hits,
+            'cache_hit_ratio': cache_hit_ratio,
         }
 
+    def _archived_diagnostic_days(self, conn):
+        """{day: diagnostics} across the archive files; a file that cannot be read counts under day None"""
+        days = {}
+        for archive in self._archive_index():
+            if not self.backend.supports_attach or not (self.archive_dir / archive['filename']).exists():
+                days[None] = days.get(None, 0) + archive['row_count']
+                continue
+            alias = self._attach_archive(conn, archive['filename'])
+            for row in conn.execute(f'SELECT date(created_at) AS day, COUNT(*) AS n FROM {alias}.diagnostics GROUP BY day'):
+                days[row['day']] = days.get(row['day'], 0) + row['n']
+        return days
+
+    def rebuild_stats(self):
+        """Recompute all stats rollups from the base tables
+
+        Use after manual edits or deletes, which the triggers do not track.
+        Archived diagnostics are counted from their monthly files, so an
+        archive pass does not change the totals. Returns the all-time stats
+        before and after the rebuild.
+        """
+        before = self.get_stats()
+        conn = self.get_connection()
+        archived = self._archived_diagnostic_days(conn)  # ATTACH cannot run inside the transaction
+        with conn:
+            for statement in STATS_REBUILD + CACHE_STATS_REBUILD:
+                conn.execute(statement)
+            conn.execute(
+                "UPDATE stats_counters SET value = value + ? WHERE name = 'diagnostics'", (sum(archived.values()),)
+            )
+            conn.executemany('''
+                INSERT INTO stats_daily (day, diagnostics) VALUES (?, ?)
+                ON CONFLICT(day) DO UPDATE SET diagnostics = diagnostics + excluded.diagnostics
+            ''', [(day, count) for day, count in archived.items() if day is not None])
+        return before, self.get_stats()
+
+
+def get_db():
+    """The bot's database (BOT_DATABASE_URL, else ./fpsos_bot.db), opened and migrated on first use"""
+    return FPSOSDatabase(BOT_DATABASE_URL or 'fpsos_bot.db', BOT_DATABASE_AUTH_TOKEN)
+
+
+def __getattr__(name):
+    # Global database instance: `from database import db` opens it, importing FPSOSDatabase alone does not
+    if name == 'db':
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Global database instance
-db = FPSOSDatabase()
 
 if __name__ == '__main__':
     # Test database initialization
     print("Testing database...")
-    stats = db.get_stats()
+    stats = get_db().get_stats()
     print(f"Database stats: {stats}")
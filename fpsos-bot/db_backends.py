@@ -0,0 +1,375 @@
+"""
+FPSOS Bot Storage Backends
+Connection factories for FPSOSDatabase: local SQLite files or a remote libSQL/Turso database
+
+Both backends hand out objects with the subset of the sqlite3.Connection API the
+database layer uses (execute, executemany, commit, rollback, close, `with conn:`),
+so FPSOSDatabase runs unchanged on either.
+"""
+
+import base64
+import http.client
+import json
+import sqlite3
+from urllib.parse import urlsplit
+
+
+def make_backend(target, auth_token=None):
+    """Pick a backend from a database path or URL
+
+    `libsql://`, `https://` and `http://` URLs use libSQL over HTTP;
+    anything else is a local SQLite file path.
+    """
+    scheme = urlsplit(str(target)).scheme
+    if scheme in ('libsql', 'https', 'http'):
+        return LibSQLBackend(target, auth_token)
+    return SQLiteBackend(target)
+
+
+# ========== SQLITE ==========
+
+class SQLiteBackend:
+    """Local SQLite file, tuned for a long-lived per-thread connection pool"""
+
+    name = 'sqlite'
+    supports_attach = True
+
+    # Applied to every connection when it is opened
+    PRAGMAS = (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),     # WAL + NORMAL only fsyncs at checkpoints
+        ('cache_size', -16000),        # ~16 MB page cache per connection
+        ('mmap_size', 268435456),      # 256 MB memory-mapped reads
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),        # Writers queue instead of failing fast
+    )
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(self, path):
+        self.path = str(path)
+
+    def connect(self):
+        """Open a tuned connection with row factory and statement cache"""
+        conn = sqlite3.connect(
+            self.path,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            check_same_thread=False  # Only ever used by its owning thread; close() may run elsewhere
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.PRAGMAS:
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+
+# ========== LIBSQL (HRANA OVER HTTP) ==========
+
+class LibSQLError(sqlite3.DatabaseError):
+    """A statement failed on the remote libSQL server"""
+
+
+class LibSQLBackend:
+    """Remote libSQL database (Turso or sqld) spoken to over the Hrana HTTP API
+
+    Each connection keeps one keep-alive HTTP connection open. Statements run
+    inside `with conn:` (or after an explicit BEGIN) are buffered and sent
+    together as one conditional batch, so a typical bot write costs a single
+    round trip; a result that is read mid-transaction flushes what is buffered
+    so far.
+
+    `pipeline=False` sends every statement on its own request instead, which
+    is only useful for benchmarking the difference.
+    """
+
+    name = 'libsql'
+    supports_attach = False
+
+    def __init__(self, url, auth_token=None, pipeline=True, timeout=10):
+        parts = urlsplit(url)
+        self.secure = parts.scheme in ('libsql', 'https')
+        self.host = parts.hostname
+        self.port = parts.port
+        self.auth_token = auth_token
+        self.pipeline = pipeline
+        self.timeout = timeout
+        self.url = url
+
+    def connect(self):
+        return LibSQLConnection(self)
+
+
+def _encode_value(value):
+    if value is None:
+        return {'type': 'null'}
+    if isinstance(value, bool):
+        return {'type': 'integer', 'value': str(int(value))}
+    if isinstance(value, int):
+        return {'type': 'integer', 'value': str(value)}
+    if isinstance(value, float):
+        return {'type': 'float', 'value': value}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'type': 'blob', 'base64': base64.b64encode(bytes(value)).decode('ascii')}
+    return {'type': 'text', 'value': str(value)}
+
+
+def _decode_value(value):
+    kind = value['type']
+    if kind == 'null':
+        return None
+    if kind == 'integer':
+        return int(value['value'])
+    if kind == 'float':
+        return float(value['value'])
+    if kind == 'blob':
+        return base64.b64decode(value['base64'])
+    return value['value']
+
+
+def _statement(sql, params=()):
+    return {'sql': sql, 'args': [_encode_value(v) for v in params], 'want_rows': True}
+
+
+class Row:
+    """Result row supporting row[0], row['name'] and dict(row), like sqlite3.Row"""
+
+    __slots__ = ('_columns', '_values')
+
+    def __init__(self, columns, values):
+        self._columns = columns
+        self._values = values
+
+    def keys(self):
+        return list(self._columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._columns[key]]
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+
+class LibSQLCursor:
+    """Result of one statement; buffered statements resolve on first access"""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._result = None
+        self._rows = None
+        self._position = 0
+
+    def _resolve(self, result):
+        self._result = result
+        columns = {col['name']: index for index, col in enumerate(result.get('cols', []))}
+        self._rows = [Row(columns, [_decode_value(v) for v in row]) for row in result.get('rows', [])]
+
+    def _ready(self):
+        if self._result is None:
+            self._conn._flush()
+        return self
+
+    @property
+    def lastrowid(self):
+        rowid = self._ready()._result.get('last_insert_rowid')
+        return int(rowid) if rowid is not None else None
+
+    @property
+    def rowcount(self):
+        return self._ready()._result.get('affected_row_count', -1)
+
+    def fetchone(self):
+        self._ready()
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchall(self):
+        self._ready()
+        rows, self._position = self._rows[self._position:], len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class LibSQLConnection:
+    """sqlite3.Connection look-alike over one Hrana stream and keep-alive HTTP connection"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.round_trips = 0
+        self._http = None
+        self._baton = None          # Hrana stream id while a transaction is open
+        self._in_transaction = False
+        self._pending = []          # [(stmt, cursor)] not yet sent
+
+    # ----- HTTP -----
+
+    def _connection(self):
+        if self._http is None:
+            cls = http.client.HTTPSConnection if self.backend.secure else http.client.HTTPConnection
+            self._http = cls(self.backend.host, self.backend.port, timeout=self.backend.timeout)
+        return self._http
+
+    def _pipeline(self, requests, keep_stream):
+        """Send Hrana requests in one HTTP round trip; returns their results"""
+        if not keep_stream:
+            requests = requests + [{'type': 'close'}]
+        body = json.dumps({'baton': self._baton, 'requests': requests}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.backend.auth_token:
+            headers['Authorization'] = f'Bearer {self.backend.auth_token}'
+
+        reused = self._http is not None
+        try:
+            response = self._send(body, headers)
+        except ConnectionError:  # RemoteDisconnected, reset or broken pipe
+            # The server dropped an idle keep-alive socket before reading the
+            # request; that is safe to retry as long as no stream is open
+            self.close_http()
+            if not reused or self._baton is not None:
+                raise
+            response = self._send(body, headers)
+
+        self.round_trips += 1
+        if response.status != 200:
+            raise LibSQLError(f"libSQL HTTP {response.status}: {response.read()[:200]!r}")
+        payload = json.loads(response.read())
+        self._baton = payload.get('baton') if keep_stream else None
+        return payload['results'][:len(requests) - (0 if keep_stream else 1)]
+
+    def _send(self, body, headers):
+        http_conn = self._connection()
+        http_conn.request('POST', '/v2/pipeline', body=body, headers=headers)
+        return http_conn.getresponse()
+
+    def close_http(self):
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    # ----- Statement execution -----
+
+    @staticmethod
+    def _unwrap(result):
+        if result['type'] == 'error':
+            raise LibSQLError(result['error'].get('message', 'libSQL error'))
+        return result['response']
+
+    def _run_now(self, stmts, keep_stream):
+        """Execute statements immediately (one round trip when pipelining)"""
+        if self.backend.pipeline or len(stmts) == 1:
+            results = self._pipeline([{'type': 'execute', 'stmt': s} for s in stmts], keep_stream)
+            return [self._unwrap(r)['result'] for r in results]
+        return [self._run_now([s], keep_stream)[0] for s in stmts]
+
+    def _flush(self, finish=None):
+        """Send buffered statements (and optionally COMMIT/ROLLBACK) as one batch
+
+        Steps are chained on the previous step succeeding, so nothing after a
+        failed statement runs and a failed batch never commits.
+        """
+        pending, self._pending = self._pending, []
+        stmts = [stmt for stmt, _ in pending]
+        if finish:
+            stmts.append(_statement(finish))
+        if not stmts:
+            return
+
+        if not self.backend.pipeline:
+            for stmt, cursor in pending:
+                cursor._resolve(self._run_now([stmt], keep_stream=True)[0])
+            if finish:
+                self._run_now([_statement(finish)], keep_stream=False)
+            return
+
+        steps = [
+            {'condition': {'type': 'ok', 'step': i - 1} if i else None, 'stmt': stmt}
+            for i, stmt in enumerate(stmts)
+        ]
+        if finish == 'COMMIT':
+            # Roll back in the same round trip if anything before COMMIT failed
+            steps.append({
+                'condition': {'type': 'not', 'cond': {'type': 'ok', 'step': len(stmts) - 1}},
+                'stmt': _statement('ROLLBACK'),
+            })
+        (result,) = self._pipeline(
+            [{'type': 'batch', 'batch': {'steps': steps}}], keep_stream=finish is None
+        )
+        batch = self._unwrap(result)['result']
+
+        for (stmt, cursor), step_result, step_error in zip(pending, batch['step_results'], batch['step_errors']):
+            if step_error:
+                raise LibSQLError(step_error.get('message', 'libSQL error'))
+            cursor._resolve(step_result)
+        if finish and batch['step_errors'][len(stmts) - 1]:
+            raise LibSQLError(batch['step_errors'][len(stmts) - 1].get('message', 'libSQL error'))
+
+    def execute(self, sql, params=()):
+        stmt = _statement(sql, params)
+        cursor = LibSQLCursor(self)
+        keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+
+        if keyword == 'BEGIN':
+            self._in_transaction = True
+            self._pending.append((stmt, cursor))
+        elif self._in_transaction:
+            self._pending.append((stmt, cursor))
+        else:
+            cursor._resolve(self._run_now([stmt], keep_stream=False)[0])
+        return cursor
+
+    def executemany(self, sql, seq_of_params):
+        if not self._in_transaction:
+            with self:
+                return self.executemany(sql, seq_of_params)
+        for params in seq_of_params:
+            self.execute(sql, params)
+        return LibSQLCursor(self)
+
+    def commit(self):
+        if not self._in_transaction:
+            return
+        self._in_transaction = False
+        try:
+            self._flush(finish='COMMIT')
+        except Exception:
+            # Statements already sent on an open stream must not stay in a transaction
+            self._pending = []
+            if self._baton is not None:
+                self._run_now([_statement('ROLLBACK')], keep_stream=False)
+            raise
+
+    def rollback(self):
+        if not self._in_transaction:
+            return
+        self._in_transaction = False
+        already_sent = self._baton is not None
+        self._pending = []
+        if already_sent:
+            self._run_now([_statement('ROLLBACK')], keep_stream=False)
+
+    def __enter__(self):
+        if not self._in_transaction:
+            self._in_transaction = True
+            self._pending.append((_statement('BEGIN'), LibSQLCursor(self)))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def close(self):
+        self.rollback()
+        self.close_http()
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 FPSOS Bot Capability Extractor
-Analyzes bot.py and extracts all commands, views, modals, and handlers
+Analyzes bot_app.py and extracts all commands, views, modals, and handlers
 """
 
 import ast
@@ -9,8 +9,8 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
-def extract_capabilities(file_path='bot.py'):
-    """Extract all capabilities from bot.py"""
+def extract_capabilities(file_path='bot_app.py'):
+    """Extract all capabilities from bot_app.py"""
     
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
@@ -0,0 +1,147 @@
+"""
+FPSOS Bot Maintenance CLI
+One-shot database jobs that should not run inside the bot process
+
+Usage:
+    python manage.py rebuild-stats
+    python manage.py backfill-diagnostics [--batch-size 500] [--vacuum]
+    python manage.py archive-diagnostics --days 180 [--batch-size 500]
+    python manage.py reindex-tags
+    python manage.py rescore-diagnostics [--dry-run] [--batch-size 1000]
+    python manage.py export {users,diagnostics,bookings} [--format ndjson|csv] [--output FILE]
+"""
+
+import argparse
+import contextlib
+import sys
+import time
+from collections import Counter
+
+# Keep startup chatter off stdout so `export` output can be piped
+with contextlib.redirect_stdout(sys.stderr):
+    from database import db
+
+
+def rebuild_stats(args):
+    """Recompute the /stats rollups from the base tables"""
+    before, after = db.rebuild_stats()
+    drift = {key: (before[key], after[key]) for key in after if before[key] != after[key]}
+    if drift:
+        for key, (old, new) in drift.items():
+            print(f"🔧 {key}: {old} → {new}")
+    else:
+        print("✅ Stats counters were already consistent")
+
+
+def backfill_diagnostics(args):
+    """Convert legacy diagnostics rows to typed columns + compressed payloads"""
+    report = db.backfill_diagnostics(batch_size=args.batch_size)
+    before, after = report['bytes_before'], report['bytes_after']
+    saved = before - after
+    print(f"✅ Converted {report['converted']} diagnostic(s), skipped {report['skipped']} unreadable")
+    print(f"📦 Payload bytes: {before:,} → {after:,} (saved {saved:,}, {saved / before * 100 if before else 0:.1f}%)")
+
+    if args.vacuum:
+        conn = db.get_connection()
+        pages_before = conn.execute('PRAGMA page_count').fetchone()[0] * conn.execute('PRAGMA page_size').fetchone()[0]
+        conn.execute('VACUUM')
+        pages_after = conn.execute('PRAGMA page_count').fetchone()[0] * conn.execute('PRAGMA page_size').fetchone()[0]
+        print(f"🧹 Database file: {pages_before:,} → {pages_after:,} bytes")
+
+
+def archive_diagnostics(args):
+    """Move diagnostics older than --days into monthly archive files"""
+    report = db.archive_diagnostics(args.days, batch_size=args.batch_size)
+    for month, count in sorted(report['months'].items()):
+        print(f"🗄️ {month}: {count} diagnostic(s)")
+    print(f"✅ Archived {report['archived']} diagnostic(s) to {db.archive_dir}, moved {report['payloads']} payload(s)")
+
+
+def reindex_tags(args):
+    """Rebuild the tag full-text search index from the tags table"""
+    count = db.reindex_tags()
+    print(f"✅ Reindexed {count} tag(s)")
+
+
+def rescore_diagnostics(args):
+    """Re-evaluate every live diagnostic against recommendation_rules.json, writing only changed rows"""
+    from utils.recommendations import np, rules
+
+    if np is None:
+        sys.exit("❌ rescore-diagnostics needs NumPy: pip install numpy")
+
+    started = time.perf_counter()
+    columns = db.get_diagnostic_features(rules.features)
+    loaded = time.perf_counter()
+    if not columns['id']:
+        print("✅ No diagnostics to re-score")
+        return
+
+    # One vectorized pass over the whole table; NULL columns load as NaN, which matches no bound
+    features = {feature: np.array(columns[feature], dtype=float) for feature in rules.features}
+    scored = np.array(rules.codes, dtype=object)[rules.evaluate_many(features, len(columns['id']))]
+    previous = np.array(columns['recommendation'], dtype=object)
+    changed = np.flatnonzero(scored != previous)
+    evaluated = time.perf_counter()
+
+    moves = Counter(zip(previous[changed].tolist(), scored[changed].tolist()))
+    for (old, new), count in moves.most_common():
+        print(f"🔁 {old} → {new}: {count}")
+    updates = list(zip(np.array(columns['id'])[changed].tolist(), scored[changed].tolist()))
+    if not args.dry_run:
+        db.update_recommendations(updates, rules.version, batch_size=args.batch_size)
+    print(f"{'🔎 Would update' if args.dry_run else '✅ Updated'} {len(updates)} of {len(previous)} diagnostic(s) "
+          f"to rules v{rules.version} (load {(loaded - started) * 1000:.0f}ms, evaluate "
+          f"{(evaluated - loaded) * 1000:.0f}ms, write {(time.perf_counter() - evaluated) * 1000:.0f}ms)")
+
+
+def export(args):
+    """Stream a table to stdout or a file as NDJSON or CSV"""
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        rows = 0
+        for line in db.iter_export(args.table, args.format):
+            out.write(line)
+            rows += 1
+    finally:
+        if args.output:
+            out.close()
+    if args.output:
+        print(f"✅ Exported {args.table} to {args.output} ({rows} line(s))", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FPSOS bot maintenance commands")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('rebuild-stats', help=rebuild_stats.__doc__).set_defaults(func=rebuild_stats)
+
+    backfill = commands.add_parser('backfill-diagnostics', help=backfill_diagnostics.__doc__)
+    backfill.add_argument('--batch-size', type=int, default=500)
+    backfill.add_argument('--vacuum', action='store_true', help="Reclaim freed pages afterwards")
+    backfill.set_defaults(func=backfill_diagnostics)
+
+    archive = commands.add_parser('archive-diagnostics', help=archive_diagnostics.__doc__)
+    archive.add_argument('--days', type=int, required=True, help="Retention window for the live table")
+    archive.add_argument('--batch-size', type=int, default=500)
+    archive.set_defaults(func=archive_diagnostics)
+
+    commands.add_parser('reindex-tags', help=reindex_tags.__doc__).set_defaults(func=reindex_tags)
+
+    rescore = commands.add_parser('rescore-diagnostics', help=rescore_diagnostics.__doc__)
+    rescore.add_argument('--dry-run', action='store_true', help="Report changes without writing them")
+    rescore.add_argument('--batch-size', type=int, default=1000)
+    rescore.set_defaults(func=rescore_diagnostics)
+
+    exporter = commands.add_parser('export', help=export.__doc__)
+    exporter.add_argument('table', choices=sorted(db.EXPORT_COLUMNS))
+    exporter.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    exporter.add_argument('--output', help="File to write (default: stdout)")
+    exporter.set_defaults(func=export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,615 @@
+"""
+FPSOS Bot Schema Migrations
+Numbered, run-once schema changes keyed on SQLite's PRAGMA user_version
+
+Usage:
+    python migrations.py            # Apply pending migrations to fpsos_bot.db
+    python migrations.py --check    # EXPLAIN QUERY PLAN every statement, fail on full scans
+"""
+
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+
+# ========== MIGRATIONS ==========
+# Each entry is (version, description, steps). A step is either a SQL string or
+# a callable taking the connection. Never edit a shipped migration; add a new one.
+
+def _add_specs_column(conn):
+    """Older databases got `specs` from a try/except ALTER; only add it if missing"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(users)')}
+    if 'specs' not in columns:
+        conn.execute('ALTER TABLE users ADD COLUMN specs TEXT')
+
+
+# Recomputes every rollup from the base tables. Completion day is not stored,
+# so rebuilt completed/revenue rollups are attributed to the booking's created day.
+STATS_REBUILD = [
+    'DELETE FROM stats_counters',
+    'DELETE FROM stats_daily',
+    'DELETE FROM stats_service',
+    'DELETE FROM stats_service_daily',
+    '''
+    INSERT INTO stats_counters (name, value)
+    SELECT 'users', COUNT(*) FROM users
+    UNION ALL SELECT 'diagnostics', COUNT(*) FROM diagnostics
+    UNION ALL SELECT 'bookings', COUNT(*) FROM bookings
+    UNION ALL SELECT 'completed_bookings', COUNT(*) FROM bookings WHERE completed = 1
+    UNION ALL SELECT 'revenue', COALESCE(SUM(amount_aed), 0) FROM bookings WHERE completed = 1
+    ''',
+    '''
+    INSERT INTO stats_daily (day, users, diagnostics, bookings, completed_bookings, revenue)
+    SELECT day, SUM(users), SUM(diagnostics), SUM(bookings), SUM(completed_bookings), SUM(revenue)
+    FROM (
+        SELECT date(join_date) AS day, 1 AS users, 0 AS diagnostics, 0 AS bookings, 0 AS completed_bookings, 0 AS revenue FROM users
+        UNION ALL SELECT date(created_at), 0, 1, 0, 0, 0 FROM diagnostics
+        UNION ALL SELECT date(created_at), 0, 0, 1, completed = 1, IIF(completed = 1, COALESCE(amount_aed, 0), 0) FROM bookings
+    )
+    WHERE day IS NOT NULL
+    GROUP BY day
+    ''',
+    '''
+    INSERT INTO stats_service (service_type, bookings, completed_bookings, revenue)
+    SELECT service_type, COUNT(*), SUM(completed = 1), SUM(IIF(completed = 1, COALESCE(amount_aed, 0), 0))
+    FROM bookings GROUP BY service_type
+    ''',
+    '''
+    INSERT INTO stats_service_daily (day, service_type, bookings)
+    SELECT date(created_at), service_type, COUNT(*)
+    FROM bookings WHERE created_at IS NOT NULL GROUP BY date(created_at), service_type
+    ''',
+]
+
+
+# Upload cache counters: per-entry hits and analyses summed, so they rebuild exactly
+CACHE_STATS_REBUILD = [
+    '''
+    INSERT INTO stats_counters (name, value)
+    SELECT 'cache_hits', COALESCE(SUM(hits), 0) FROM analysis_cache
+    UNION ALL SELECT 'cache_misses', COALESCE(SUM(analyses), 0) FROM analysis_cache
+    ''',
+]
+
+
+def _bump(table, key_columns, key_values, deltas):
+    """SQL for an upsert that adds `deltas` ({column: expr}) to a rollup row"""
+    columns = ', '.join(list(key_columns) + list(deltas))
+    values = ', '.join(list(key_values) + list(deltas.values()))
+    updates = ', '.join(f'{col} = {col} + excluded.{col}' for col in deltas)
+    return (
+        f'INSERT INTO {table} ({columns}) VALUES ({values}) '
+        f'ON CONFLICT({", ".join(key_columns)}) DO UPDATE SET {updates};'
+    )
+
+
+def _counter(name, delta):
+    return _bump('stats_counters', ['name'], [f"'{name}'"], {'value': delta})
+
+
+# Revenue/completion deltas for a bookings row changing from OLD to NEW
+_COMPLETED_DELTA = '((NEW.completed = 1) - (OLD.completed = 1))'
+_REVENUE_DELTA = (
+    '(IIF(NEW.completed = 1, COALESCE(NEW.amount_aed, 0), 0)'
+    ' - IIF(OLD.completed = 1, COALESCE(OLD.amount_aed, 0), 0))'
+)
+
+
+MIGRATIONS = [
+    (1, 'Base tables', [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            discord_id TEXT PRIMARY KEY,
+            username TEXT NOT NULL,
+            email TEXT,
+            join_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+            referral_code TEXT UNIQUE,
+            referred_by TEXT,
+            total_bookings INTEGER DEFAULT 0,
+            total_diagnostics INTEGER DEFAULT 0,
+            FOREIGN KEY (referred_by) REFERENCES users(discord_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS diagnostics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            json_data TEXT NOT NULL,
+            critical_count INTEGER DEFAULT 0,
+            warning_count INTEGER DEFAULT 0,
+            recommendation TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(discord_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            calendly_event_id TEXT UNIQUE,
+            scheduled_date DATETIME,
+            completed BOOLEAN DEFAULT 0,
+            payment_received BOOLEAN DEFAULT 0,
+            amount_aed REAL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(discord_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS testimonials (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            booking_id INTEGER,
+            rating INTEGER CHECK(rating >= 1 AND rating <= 10),
+            feedback TEXT,
+            fps_before INTEGER,
+            fps_after INTEGER,
+            latency_before INTEGER,
+            latency_after INTEGER,
+            approved BOOLEAN DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(discord_id),
+            FOREIGN KEY (booking_id) REFERENCES bookings(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS referrals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            referrer_id TEXT NOT NULL,
+            referred_id TEXT NOT NULL,
+            booking_id INTEGER,
+            credit_amount REAL DEFAULT 50.00,
+            credit_used BOOLEAN DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (referrer_id) REFERENCES users(discord_id),
+            FOREIGN KEY (referred_id) REFERENCES users(discord_id),
+            FOREIGN KEY (booking_id) REFERENCES bookings(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            status TEXT DEFAULT 'open',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(discord_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS tags (
+            name TEXT PRIMARY KEY,
+            content TEXT NOT NULL,
+            created_by TEXT,
+            usage_count INTEGER DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, 'User specs column', [_add_specs_column]),
+    (3, 'Indexes for hot lookups', [
+        # Modmail routing: cover every tickets column so lookups never touch the table
+        'CREATE INDEX IF NOT EXISTS idx_tickets_user_status ON tickets(user_id, status, channel_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_tickets_channel_status ON tickets(channel_id, status, user_id, created_at)',
+        # Recent diagnostics per user, already in ORDER BY created_at order
+        'CREATE INDEX IF NOT EXISTS idx_diagnostics_user_created ON diagnostics(user_id, created_at)',
+        # Completed-booking totals read straight from the index
+        'CREATE INDEX IF NOT EXISTS idx_bookings_completed ON bookings(completed, amount_aed)',
+        # bookings(calendly_event_id) is already indexed by its UNIQUE constraint
+    ]),
+    (4, 'Incremental stats counters and rollups', [
+        '''
+        CREATE TABLE stats_counters (
+            name TEXT PRIMARY KEY,
+            value REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE stats_daily (
+            day TEXT PRIMARY KEY,
+            users INTEGER NOT NULL DEFAULT 0,
+            diagnostics INTEGER NOT NULL DEFAULT 0,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            completed_bookings INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE stats_service (
+            service_type TEXT PRIMARY KEY,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            completed_bookings INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX idx_stats_service_bookings ON stats_service(bookings)',
+        '''
+        CREATE TABLE stats_service_daily (
+            day TEXT NOT NULL,
+            service_type TEXT NOT NULL,
+            bookings INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, service_type)
+        ) WITHOUT ROWID
+        ''',
+        # Triggers keep the rollups in the same transaction as the write itself
+        f'''
+        CREATE TRIGGER trg_stats_users_insert AFTER INSERT ON users BEGIN
+            {_counter('users', '1')}
+            {_bump('stats_daily', ['day'], ["date(COALESCE(NEW.join_date, 'now'))"], {'users': '1'})}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER trg_stats_diagnostics_insert AFTER INSERT ON diagnostics BEGIN
+            {_counter('diagnostics', '1')}
+            {_bump('stats_daily', ['day'], ["date(COALESCE(NEW.created_at, 'now'))"], {'diagnostics': '1'})}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER trg_stats_bookings_insert AFTER INSERT ON bookings BEGIN
+            {_counter('bookings', '1')}
+            {_counter('completed_bookings', '(NEW.completed = 1)')}
+            {_counter('revenue', 'IIF(NEW.completed = 1, COALESCE(NEW.amount_aed, 0), 0)')}
+            {_bump('stats_daily', ['day'], ["date(COALESCE(NEW.created_at, 'now'))"], {
+                'bookings': '1',
+                'completed_bookings': '(NEW.completed = 1)',
+                'revenue': 'IIF(NEW.completed = 1, COALESCE(NEW.amount_aed, 0), 0)',
+            })}
+            {_bump('stats_service', ['service_type'], ['NEW.service_type'], {
+                'bookings': '1',
+                'completed_bookings': '(NEW.completed = 1)',
+                'revenue': 'IIF(NEW.completed = 1, COALESCE(NEW.amount_aed, 0), 0)',
+            })}
+            {_bump('stats_service_daily', ['day', 'service_type'], ["date(COALESCE(NEW.created_at, 'now'))", 'NEW.service_type'], {'bookings': '1'})}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER trg_stats_bookings_complete AFTER UPDATE OF completed, amount_aed ON bookings
+        WHEN OLD.completed IS NOT NEW.completed OR OLD.amount_aed IS NOT NEW.amount_aed BEGIN
+            {_counter('completed_bookings', _COMPLETED_DELTA)}
+            {_counter('revenue', _REVENUE_DELTA)}
+            {_bump('stats_daily', ['day'], ["date('now')"], {
+                'completed_bookings': _COMPLETED_DELTA,
+                'revenue': _REVENUE_DELTA,
+            })}
+            {_bump('stats_service', ['service_type'], ['NEW.service_type'], {
+                'completed_bookings': _COMPLETED_DELTA,
+                'revenue': _REVENUE_DELTA,
+            })}
+        END
+        ''',
+        *STATS_REBUILD,
+    ]),
+    (5, 'Typed diagnostic columns and compressed payload store', [
+        'ALTER TABLE diagnostics ADD COLUMN cpu TEXT',
+        'ALTER TABLE diagnostics ADD COLUMN gpu TEXT',
+        'ALTER TABLE diagnostics ADD COLUMN ram_gb REAL',
+        'ALTER TABLE diagnostics ADD COLUMN network TEXT',
+        'ALTER TABLE diagnostics ADD COLUMN current_fps REAL',
+        'ALTER TABLE diagnostics ADD COLUMN target_fps REAL',
+        'ALTER TABLE diagnostics ADD COLUMN latency_ms REAL',
+        'ALTER TABLE diagnostics ADD COLUMN payload_hash TEXT',
+        # Content-addressed: byte-identical uploads share one row
+        '''
+        CREATE TABLE diagnostic_payloads (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            raw_size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        'CREATE INDEX idx_diagnostics_cpu ON diagnostics(cpu)',
+        'CREATE INDEX idx_diagnostics_gpu ON diagnostics(gpu)',
+        'CREATE INDEX idx_diagnostics_fps ON diagnostics(current_fps)',
+        'CREATE INDEX idx_diagnostics_payload ON diagnostics(payload_hash)',
+    ]),
+    (6, 'Diagnostics history keyset index and archive catalogue', [
+        # Serves `WHERE user_id = ? AND id < ? ORDER BY id DESC` page by page
+        'CREATE INDEX idx_diagnostics_user_id ON diagnostics(user_id, id)',
+        # One row per monthly archive file; id ranges let history pages skip files
+        '''
+        CREATE TABLE diagnostic_archives (
+            month TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (7, 'DM intent phrases', [
+        # match: 'exact' = whole message, 'keyword' = anywhere in the message
+        '''
+        CREATE TABLE intents (
+            intent TEXT NOT NULL,
+            phrase TEXT NOT NULL,
+            match TEXT NOT NULL DEFAULT 'keyword' CHECK (match IN ('exact', 'keyword')),
+            priority INTEGER NOT NULL DEFAULT 0,
+            created_by TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (intent, phrase)
+        ) WITHOUT ROWID
+        ''',
+        # The phrases on_message used to hard-code
+        '''
+        INSERT INTO intents (intent, phrase, match, priority, created_by) VALUES
+            ('greeting', 'hi', 'exact', 10, 'migration'),
+            ('greeting', 'hello', 'exact', 10, 'migration'),
+            ('greeting', 'hey', 'exact', 10, 'migration'),
+            ('greeting', 'hello bot', 'exact', 10, 'migration'),
+            ('greeting', 'yo', 'exact', 10, 'migration'),
+            ('booking', 'book', 'keyword', 0, 'migration'),
+            ('booking', 'session', 'keyword', 0, 'migration'),
+            ('booking', 'schedule', 'keyword', 0, 'migration'),
+            ('booking', 'calendar', 'keyword', 0, 'migration'),
+            ('booking', 'appointment', 'keyword', 0, 'migration'),
+            ('booking', 'packages', 'keyword', 0, 'migration'),
+            ('booking', 'pricing', 'keyword', 0, 'migration')
+        ''',
+    ]),
+    (8, 'Full-text search over tag content', [
+        # External content: the index stores only tokens and reads text back from tags
+        '''
+        CREATE VIRTUAL TABLE tags_fts USING fts5(
+            name, content,
+            content='tags', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )
+        ''',
+        '''
+        CREATE TRIGGER trg_tags_fts_insert AFTER INSERT ON tags BEGIN
+            INSERT INTO tags_fts (rowid, name, content) VALUES (NEW.rowid, NEW.name, NEW.content);
+        END
+        ''',
+        '''
+        CREATE TRIGGER trg_tags_fts_delete AFTER DELETE ON tags BEGIN
+            INSERT INTO tags_fts (tags_fts, rowid, name, content) VALUES ('delete', OLD.rowid, OLD.name, OLD.content);
+        END
+        ''',
+        # usage_count flushes do not touch the index
+        '''
+        CREATE TRIGGER trg_tags_fts_update AFTER UPDATE OF name, content ON tags BEGIN
+            INSERT INTO tags_fts (tags_fts, rowid, name, content) VALUES ('delete', OLD.rowid, OLD.name, OLD.content);
+            INSERT INTO tags_fts (rowid, name, content) VALUES (NEW.rowid, NEW.name, NEW.content);
+        END
+        ''',
+        # `ORDER BY rank` is BM25 with a name match worth ten body matches
+        "INSERT INTO tags_fts (tags_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+        "INSERT INTO tags_fts (tags_fts) VALUES ('rebuild')",
+    ]),
+    (9, 'Leases for electing cluster-wide singleton tasks', [
+        # expires_at is Unix seconds from the database clock, so cluster hosts need not agree on time
+        '''
+        CREATE TABLE leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (10, 'Recommendation rules version per diagnostic', [
+        # NULL: scored before recommendation_rules.json existed
+        'ALTER TABLE diagnostics ADD COLUMN rules_version INTEGER',
+    ]),
+    (11, 'Analysis results cached by upload content', [
+        # One entry per user and distinct upload; a re-upload under the same rules is answered from here
+        '''
+        CREATE TABLE analysis_cache (
+            upload_hash TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            rules_version INTEGER,
+            result TEXT NOT NULL,
+            diagnostic_id INTEGER,
+            analyses INTEGER NOT NULL DEFAULT 1,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_used_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (upload_hash, user_id)
+        ) WITHOUT ROWID
+        ''',
+        f'''
+        CREATE TRIGGER trg_stats_analysis_cache_insert AFTER INSERT ON analysis_cache BEGIN
+            {_counter('cache_hits', 'NEW.hits')}
+            {_counter('cache_misses', 'NEW.analyses')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER trg_stats_analysis_cache_update AFTER UPDATE OF hits, analyses ON analysis_cache BEGIN
+            {_counter('cache_hits', 'NEW.hits - OLD.hits')}
+            {_counter('cache_misses', 'NEW.analyses - OLD.analyses')}
+        END
+        ''',
+    ]),    (12, 'Versions of the tables each process caches in memory', [
+        # Bumped by triggers on every edit, so other processes (cluster.py) know to reload their copy
+        '''
+        CREATE TABLE cache_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        "INSERT INTO cache_versions (name) VALUES ('tags'), ('intents')",
+        *(f'''
+        CREATE TRIGGER trg_cache_{table}_{event.split()[0].lower()} AFTER {event} ON {table} BEGIN
+            UPDATE cache_versions SET version = version + 1 WHERE name = '{table}';
+        END
+        ''' for table, events in (
+            # usage_count flushes are not edits
+            ('tags', ('INSERT', 'UPDATE OF name, content, created_by', 'DELETE')),
+            ('intents', ('INSERT', 'UPDATE', 'DELETE')),
+        ) for event in events),
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def run_migrations(conn):
+    """Apply every migration newer than the database's user_version, in order
+
+    Each migration runs in its own IMMEDIATE transaction together with the
+    user_version bump, so a crash never leaves a half-applied version and two
+    processes starting at once cannot both apply the same step.
+    Returns the list of versions applied.
+    """
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if get_schema_version(conn) >= version:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Re-check under the write lock in case another process got here first
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+        print(f"Applied migration {version}: {description}")
+    return applied
+
+
+# ========== QUERY PLAN CHECK ==========
+
+# Methods that only produce reports or reload a whole cached table after an edit; their plans are printed but not enforced
+COLD_METHODS = {'rebuild_stats', 'backfill_diagnostics', 'archive_diagnostics', 'iter_export', 'verify_ticket_index', 'reindex_tags', 'get_leases', 'get_diagnostic_features', 'refresh_caches'}
+
+# Not query methods
+SKIP_METHODS = {'get_connection', 'init_database', 'close', 'cache_check_due'}
+
+# A plain "SCAN <table>" (no index) or a sort into a temp b-tree means the
+# statement's cost grows with the table
+FULL_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)\S+$|USE TEMP B-TREE')
+
+# FTS5's own reads of its shadow tables (e.g. the one-row config on first use after a schema change)
+FTS_INTERNAL = re.compile(r"'\w+'\.'\w+_fts_(config|data|idx|docsize|content)'")
+
+
+def _exercise(db):
+    """Call every public method once with representative arguments"""
+    return {
+        'add_user': lambda: db.add_user('1001', 'plan-check'),
+        'bulk_upsert_users': lambda: db.bulk_upsert_users([('1002', 'bulk'), ('1003', 'bulk')]),
+        'get_user': lambda: db.get_user('1001'),
+        'update_user_specs': lambda: db.update_user_specs('1001', 'specs'),
+        'save_diagnostic': lambda: db.save_diagnostic('1001', {'system': {}}, 1, 2, 'full', rules_version=1),
+        'get_diagnostic_features': lambda: db.get_diagnostic_features(('critical_count', 'warning_count')),
+        'update_recommendations': lambda: db.update_recommendations([(1, 'quick')], rules_version=1),
+        'cache_analysis': lambda: db.cache_analysis('ab' * 32, '1001', 1, {'recommendation': 'full'}, 1),
+        'get_cached_analysis': lambda: (db._analyses.clear(), db.get_cached_analysis('ab' * 32, '1001', 1)),
+        'record_cache_hit': lambda: db.record_cache_hit('ab' * 32, '1001'),
+        'get_user_diagnostics': lambda: db.get_user_diagnostics('1001'),
+        'get_diagnostic_payload': lambda: db.get_diagnostic_payload(1),
+        'backfill_diagnostics': lambda: db.backfill_diagnostics(),
+        'archive_diagnostics': lambda: (db.save_diagnostic('1004', {'system': {}}, 0, 0, 'quick'), db.archive_diagnostics(days=-1)),
+        'get_diagnostics_page': lambda: db.get_diagnostics_page('1004', before_id=10, limit=5),
+        'get_latest_diagnostic': lambda: db.get_latest_diagnostic('1001'),
+        'create_booking': lambda: db.create_booking('1001', 'full', 'evt-1', None, 399),
+        'get_booking_by_calendly_id': lambda: db.get_booking_by_calendly_id('evt-1'),
+        'mark_booking_complete': lambda: db.mark_booking_complete(1),
+        'create_ticket': lambda: db.create_ticket('1001', '2002'),
+        'get_active_ticket': lambda: db.get_active_ticket('1001'),
+        'get_ticket_by_channel': lambda: db.get_ticket_by_channel('2002'),
+        'close_ticket': lambda: db.close_ticket(1),
+        'verify_ticket_index': lambda: db.verify_ticket_index(),
+        'add_tag': lambda: db.add_tag('bios', 'content', '1001'),
+        'get_tag': lambda: db.get_tag('bios'),
+        'get_all_tags': lambda: db.get_all_tags(),
+        'autocomplete_tags': lambda: db.autocomplete_tags('bi'),
+        'suggest_tags': lambda: db.suggest_tags('bois'),
+        'search_tags': lambda: db.search_tags('xmp timings'),
+        'reindex_tags': lambda: db.reindex_tags(),
+        'delete_tag': lambda: db.delete_tag('bios'),
+        'add_intent_phrase': lambda: db.add_intent_phrase('booking', 'slot', created_by='1001'),
+        'get_intent_phrases': lambda: db.get_intent_phrases(),
+        'delete_intent_phrase': lambda: db.delete_intent_phrase('booking', 'slot'),
+        'refresh_caches': lambda: db.refresh_caches(),
+        'flush_tag_usage': lambda: (db.add_tag('flush', 'content', '1001'), db.get_tag('flush'), db.flush_tag_usage()),
+        'get_stats': lambda: [db.get_stats(window) for window in (None, 'today', '7d', '30d')],
+        'rebuild_stats': lambda: db.rebuild_stats(),
+        'acquire_lease': lambda: db.acquire_lease('news', 'cluster-0', 30),
+        'release_lease': lambda: db.release_lease('news', 'cluster-0'),
+        'get_leases': lambda: db.get_leases(),
+        'iter_export': lambda: [list(db.iter_export(table, fmt)) for table in db.EXPORT_COLUMNS for fmt in ('ndjson', 'csv')],
+    }
+
+
+def check_query_plans():
+    """Run every FPSOSDatabase statement on a scratch database and EXPLAIN it
+
+    Returns a list of (method, sql, plan) failures for hot paths.
+    """
+    from database import FPSOSDatabase
+
+    workdir = tempfile.mkdtemp(prefix='fpsos-plans-')
+    db = FPSOSDatabase(str(Path(workdir) / 'plans.db'))
+    try:
+        conn = db.get_connection()
+
+        public = {
+            name for name in dir(FPSOSDatabase)
+            if not name.startswith('_') and callable(getattr(FPSOSDatabase, name)) and name not in SKIP_METHODS
+        }
+        calls = _exercise(db)
+        missing = sorted(public - set(calls))
+        if missing:
+            raise RuntimeError(f"Query plan check does not exercise: {', '.join(missing)}")
+
+        failures = []
+        for method in sorted(calls):
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                calls[method]()
+            finally:
+                conn.set_trace_callback(None)
+
+            for sql in dict.fromkeys(statements):  # De-duplicate, keep order
+                if not re.match(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', sql, re.IGNORECASE) or FTS_INTERNAL.search(sql):
+                    continue
+                plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+                bad = [step for step in plan if FULL_SCAN.search(step)]
+                hot = method not in COLD_METHODS
+                status = 'FAIL' if bad and hot else ('warn' if bad else 'ok')
+                print(f"[{status:>4}] {method}: {' '.join(sql.split())}")
+                for step in plan:
+                    print(f"         {step}")
+                if bad and hot:
+                    failures.append((method, sql, plan))
+
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return failures
+
+
+if __name__ == '__main__':
+    if '--check' in sys.argv:
+        failures = check_query_plans()
+        if failures:
+            print(f"\n❌ {len(failures)} hot statement(s) fall back to a full table scan")
+            sys.exit(1)
+        print("\n✅ All hot statements use an index")
+    else:
+        conn = sqlite3.connect('fpsos_bot.db')
+        applied = run_migrations(conn)
+        print(f"Schema at version {get_schema_version(conn)} ({len(applied)} migration(s) applied)")
+        conn.close()
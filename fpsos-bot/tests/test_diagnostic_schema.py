@@ -0,0 +1,71 @@
+"""
+FPSOS Diagnostic Schema Tests
+Error paths of the compiled validator and DiagnosticInvalid crossing a process boundary
+"""
+
+import pickle
+
+import pytest
+
+from utils.diagnostic_schema import DiagnosticInvalid, DiagnosticSchema, SchemaError, schema, validate_diagnostic
+
+
+def test_valid_upload_is_returned_unchanged():
+    data = {'system': {'cpu': 'Ryzen', 'ram': '32 GB'}, 'issues': {'critical': ['HPET enabled']}, 'extra': [1]}
+    assert validate_diagnostic(data) is data
+
+
+@pytest.mark.parametrize('data', [[], 'text', None, 3])
+def test_root_must_be_an_object(data):
+    with pytest.raises(DiagnosticInvalid) as error:
+        validate_diagnostic(data)
+    assert error.value.errors == [{'field': '', 'message': error.value.errors[0]['message']}]
+    assert error.value.errors[0]['message'].startswith('Expected object, received ')
+
+
+@pytest.mark.parametrize('data, field, message', [
+    ({'system': {'cpu': 5}}, 'system.cpu', 'Expected string, received number'),
+    ({'system': {'ram': True}}, 'system.ram', 'Expected number or string, received boolean'),
+    ({'system': {'ram': 5000}}, 'system.ram', 'Number must be less than or equal to 4096'),
+    ({'performance': {'current_fps': -1}}, 'performance.current_fps', 'Number must be greater than or equal to 0'),
+    ({'performance': {'latency_ms': '12'}}, 'performance.latency_ms', 'Expected number, received string'),
+    ({'issues': {'critical': ['']}}, 'issues.critical[0]', 'String must contain at least 1 character(s)'),
+    ({'issues': {'warnings': ['x' * 201]}}, 'issues.warnings[0]', 'String must contain at most 200 character(s)'),
+    ({'issues': {'critical': ['x'] * 51}}, 'issues.critical', 'Array must contain at most 50 element(s)'),
+    ({'issues': ['HPET']}, 'issues', 'Expected object, received array'),
+])
+def test_field_errors(data, field, message):
+    assert schema.errors(data) == [(field, message)]
+
+
+def test_every_mismatch_is_reported():
+    data = {'system': {'cpu': 1, 'gpu': 2}, 'issues': {'critical': ['ok', 7]}}
+    with pytest.raises(DiagnosticInvalid) as error:
+        validate_diagnostic(data)
+    assert [e['field'] for e in error.value.errors] == ['system.cpu', 'system.gpu', 'issues.critical[1]']
+    assert str(error.value).startswith('system.cpu: Expected string')
+
+
+def test_null_counts_as_absent_unless_required():
+    assert schema.errors({'system': None, 'performance': {'latency_ms': None}}) == []
+    strict = DiagnosticSchema({'version': 1, 'type': 'object', 'required': ['system'],
+                               'properties': {'system': {'type': 'object'}}})
+    assert strict.errors({}) == [('system', 'Required')]
+    assert strict.errors({'system': None}) == [('system', 'Required')]
+
+
+def test_diagnostic_invalid_survives_pickling():
+    error = DiagnosticInvalid(1, [('system.cpu', 'Expected string, received number')])
+    copy = pickle.loads(pickle.dumps(error))
+    assert type(copy) is DiagnosticInvalid
+    assert (copy.version, copy.errors, str(copy)) == (error.version, error.errors, str(error))
+
+
+@pytest.mark.parametrize('spec', [
+    {'type': 'object'},
+    {'version': 1, 'type': 'tuple'},
+    {'version': 1, 'type': 'string', 'max_items': 3},
+])
+def test_malformed_schema_is_rejected(spec):
+    with pytest.raises(SchemaError):
+        DiagnosticSchema(spec)
@@ -0,0 +1,112 @@
+"""
+FPSOS Diagnostic Ingestion Tests
+SectionScanner on whole, chunked, truncated, oversized and malformed uploads
+"""
+
+import json
+
+import pytest
+
+from utils.ingest import MAX_KEY_BYTES, MalformedDiagnostic, SectionScanner, UploadTooLarge, parse_sections, upload_hash
+
+UPLOAD = {
+    'meta': {'tool': 'FPSOS', 'notes': 'braces } ] and "quotes" \\ inside strings'},
+    'system': {'cpu': 'Ryzen 7', 'ram': 32},
+    'log': [[1, 2, {'x': '}'}], 'tail'],
+    'issues': {'critical': ['HPET enabled'], 'warnings': []},
+    'score': -1.5e3,
+    'performance': {'current_fps': 212, 'latency_ms': 11.5},
+    'after': True,
+}
+WANTED = {name: UPLOAD[name] for name in ('system', 'issues', 'performance')}
+
+
+def scan(data, chunk_size=None, **options):
+    scanner = SectionScanner(**options)
+    chunk_size = chunk_size or len(data) or 1
+    for start in range(0, len(data), chunk_size):
+        if scanner.feed(data[start:start + chunk_size]):
+            break
+    return scanner
+
+
+def test_reads_only_the_wanted_sections():
+    assert scan(json.dumps(UPLOAD).encode()).finish() == WANTED
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_any_chunking_gives_the_same_sections(chunk_size):
+    assert scan(json.dumps(UPLOAD, indent=2).encode(), chunk_size).finish() == WANTED
+
+
+def test_stops_once_every_section_is_read():
+    data = json.dumps(WANTED).encode()[:-1] + b', "junk": ' + b'[' * 10
+    scanner = scan(data, chunk_size=16)
+    assert scanner.done
+    assert scanner.bytes_scanned < len(data)
+    assert scanner.finish() == WANTED
+
+
+def test_a_closed_object_without_every_section_is_fine():
+    assert scan(b'\xef\xbb\xbf {"system": {"cpu": "x"}, "other": null}').finish() == {'system': {'cpu': 'x'}}
+    assert scan(b'{}').finish() == {}
+
+
+def test_escaped_keys_are_decoded():
+    assert scan(b'{"sys\\u0074em": 1, "issues": 2, "performance": 3}').finish() == {'system': 1, 'issues': 2, 'performance': 3}
+
+
+@pytest.mark.parametrize('end', [0, 1, 9, 30, -2])
+def test_truncated_upload_is_malformed(end):
+    data = json.dumps({'system': {'cpu': 'x'}, 'other': [1, 2]}).encode()
+    scanner = scan(data[:end])
+    with pytest.raises(MalformedDiagnostic):
+        scanner.finish()
+
+
+def test_truncated_inside_a_wanted_string():
+    scanner = scan(b'{"system": {"cpu": "Ryz')
+    assert not scanner.done
+    with pytest.raises(MalformedDiagnostic, match='ends before'):
+        scanner.finish()
+
+
+def test_oversized_wanted_section_is_rejected():
+    data = json.dumps({'system': {'blob': 'x' * 2000}}).encode()
+    with pytest.raises(UploadTooLarge) as error:
+        scan(data, chunk_size=100, max_section_bytes=1000)
+    assert error.value.limit == 1000
+    assert error.value.size > 1000
+
+
+def test_oversized_skipped_section_is_not_kept():
+    data = json.dumps({'junk': 'x' * 100_000, 'system': {'cpu': 'x'}}).encode()
+    assert scan(data, chunk_size=4096, max_section_bytes=1000).finish() == {'system': {'cpu': 'x'}}
+
+
+def test_oversized_key_is_rejected():
+    data = b'{"' + b'k' * (MAX_KEY_BYTES + 1) + b'": 1}'
+    with pytest.raises(MalformedDiagnostic, match='key is longer'):
+        scan(data, chunk_size=50)
+
+
+@pytest.mark.parametrize('data, message', [
+    (b'[1, 2]', 'JSON object'),
+    (b'{system: 1}', 'a key'),
+    (b'{"system" 1}', "':'"),
+    (b'{"a": 1 "b": 2}', "',' or '}'"),
+    (b'{"system": {"cpu": tru}}', 'not valid JSON'),
+])
+def test_malformed_upload(data, message):
+    with pytest.raises(MalformedDiagnostic, match=message):
+        scan(data).finish()
+
+
+def test_raw_sections_parse_later_and_hash_stably():
+    data = json.dumps(UPLOAD).encode()
+    raw = scan(data, parse=False).finish()
+    assert all(isinstance(value, bytes) for value in raw.values())
+    assert parse_sections(raw) == WANTED
+    assert upload_hash(raw) == upload_hash(scan(data, chunk_size=5, parse=False).finish())
+    with pytest.raises(MalformedDiagnostic, match="section 'system'"):
+        parse_sections({'system': b'{"cpu": '})
@@ -0,0 +1,84 @@
+"""
+FPSOS DM Intent Engine Tests
+IntentMatcher's exact, keyword, overlap and priority rules, and IntentEngine's lazy recompiles
+"""
+
+from utils.intents import IntentEngine, IntentMatcher
+
+
+def phrase(intent, text, match='keyword', priority=0):
+    return {'intent': intent, 'phrase': text, 'match': match, 'priority': priority}
+
+
+def test_no_phrases_matches_nothing():
+    assert IntentMatcher([]).match('hello') is None
+
+
+def test_keyword_matches_anywhere_after_normalizing():
+    matcher = IntentMatcher([phrase('booking', 'book a session')])
+    assert matcher.match('Can I   BOOK a session tomorrow?') == 'booking'
+    assert matcher.match('booking') is None
+
+
+def test_exact_needs_the_whole_message():
+    matcher = IntentMatcher([phrase('greeting', 'hi', match='exact')])
+    assert matcher.match('  Hi ') == 'greeting'
+    assert matcher.match('hi there') is None
+
+
+def test_higher_priority_wins_regardless_of_position():
+    matcher = IntentMatcher([phrase('greeting', 'hello'), phrase('booking', 'price', priority=5)])
+    assert matcher.match('hello, what is the price?') == 'booking'
+
+
+def test_earliest_match_wins_a_priority_tie():
+    matcher = IntentMatcher([phrase('greeting', 'hello'), phrase('booking', 'price')])
+    assert matcher.match('price? hello') == 'booking'
+    assert matcher.match('hello, price?') == 'greeting'
+
+
+def test_overlapping_phrases_are_all_seen():
+    # 'stutter' starts inside 'microstutter'; the lookahead tries every position
+    matcher = IntentMatcher([phrase('support', 'microstutter'), phrase('bios', 'stutter fix', priority=3)])
+    assert matcher.match('microstutter fix') == 'bios'
+
+
+def test_a_shorter_prefix_phrase_can_outrank_the_longer_one():
+    matcher = IntentMatcher([phrase('booking', 'book', priority=2), phrase('tags', 'bookmark')])
+    assert matcher.match('bookmark this') == 'booking'
+    matcher = IntentMatcher([phrase('booking', 'book'), phrase('tags', 'bookmark')])
+    assert matcher.match('bookmark this') == 'tags'
+
+
+def test_exact_match_beats_lower_priority_keywords():
+    matcher = IntentMatcher([phrase('greeting', 'hey', match='exact', priority=9), phrase('booking', 'hey')])
+    assert matcher.match('hey') == 'greeting'
+
+
+def test_duplicate_phrases_keep_the_highest_priority():
+    matcher = IntentMatcher([phrase('greeting', 'yo', priority=1), phrase('booking', 'yo', priority=4)])
+    assert matcher.match('yo') == 'booking'
+    assert matcher.intents == ['booking']
+
+
+class Source:
+    def __init__(self, phrases):
+        self.phrases = phrases
+        self.intents_version = 1
+
+    def get_intent_phrases(self):
+        return list(self.phrases)
+
+
+def test_engine_recompiles_only_when_the_version_moves():
+    source = Source([phrase('greeting', 'hello')])
+    engine = IntentEngine(source)
+    assert engine.classify('hello') == 'greeting'
+    assert engine.classify('hello again') == 'greeting'
+    assert engine.compiles == 1
+
+    source.phrases.append(phrase('booking', 'book'))
+    assert engine.classify('book now') is None
+    source.intents_version += 1
+    assert engine.classify('book now') == 'booking'
+    assert engine.compiles == 2
@@ -0,0 +1,111 @@
+"""
+FPSOS Rate Limiting Tests
+Token buckets, sweeping and eviction in RateLimiter, and client_ip's proxy handling
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from utils.rate_limit import RateLimit, RateLimiter, client_ip
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_limiter(clock, limit=3, window=60, max_keys=10000):
+    return RateLimiter({'upload': RateLimit(limit, window)}, max_keys=max_keys, clock=clock)
+
+
+def test_burst_up_to_limit_then_rejects(clock):
+    limiter = make_limiter(clock)
+    assert all(limiter.hit('upload', 'u1').allowed for _ in range(3))
+    decision = limiter.hit('upload', 'u1')
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(20.0)  # One token every 60 / 3 s
+    assert limiter.stats()['allowed'] == {'upload': 3}
+    assert limiter.stats()['rejected'] == {'upload': 1}
+
+
+def test_keys_have_separate_buckets(clock):
+    limiter = make_limiter(clock, limit=1)
+    assert limiter.hit('upload', 'u1').allowed
+    assert not limiter.hit('upload', 'u1').allowed
+    assert limiter.hit('upload', 'u2').allowed
+
+
+def test_notifies_once_per_burst(clock):
+    limiter = make_limiter(clock, limit=1)
+    limiter.hit('upload', 'u1')
+    assert [limiter.hit('upload', 'u1').notify for _ in range(3)] == [True, False, False]
+    clock.now += 60
+    assert limiter.hit('upload', 'u1').allowed
+    assert limiter.hit('upload', 'u1').notify
+
+
+def test_refills_smoothly(clock):
+    limiter = make_limiter(clock)
+    for _ in range(3):
+        limiter.hit('upload', 'u1')
+    clock.now += 19.9
+    assert not limiter.hit('upload', 'u1').allowed
+    clock.now += 0.1
+    assert limiter.hit('upload', 'u1').allowed
+
+
+def test_fully_refilled_buckets_are_swept(clock):
+    limiter = make_limiter(clock)
+    limiter.hit('upload', 'u1')
+    clock.now += 20  # Back to a full bucket
+    limiter.hit('upload', 'u2')
+    assert limiter.stats()['tracked_keys'] == 1
+
+
+def test_max_keys_evicts_least_recently_used(clock):
+    limiter = make_limiter(clock, limit=1, max_keys=2)
+    for key in ('u1', 'u2', 'u3'):
+        limiter.hit('upload', key)
+    assert limiter.stats()['tracked_keys'] == 2
+    assert limiter.evicted == 1
+    assert limiter.hit('upload', 'u1').allowed  # Evicted, so it starts over
+    assert not limiter.hit('upload', 'u3').allowed
+
+
+def test_reset_forgets_a_key(clock):
+    limiter = make_limiter(clock, limit=1)
+    limiter.hit('upload', 'u1')
+    limiter.reset('upload', 'u1')
+    assert limiter.hit('upload', 'u1').allowed
+
+
+def request(remote, **headers):
+    return SimpleNamespace(remote=remote, headers=headers)
+
+
+def test_client_ip_ignores_forwarding_headers_from_untrusted_peers():
+    spoofed = request('203.0.113.9', **{'X-Forwarded-For': '1.2.3.4', 'X-Real-IP': '5.6.7.8'})
+    assert client_ip(spoofed, trusted_proxies=frozenset()) == '203.0.113.9'
+    assert client_ip(spoofed, trusted_proxies=frozenset({'10.0.0.1'})) == '203.0.113.9'
+
+
+def test_client_ip_reads_forwarded_for_right_to_left_past_trusted_hops():
+    proxies = frozenset({'10.0.0.1', '10.0.0.2'})
+    forwarded = request('10.0.0.1', **{'X-Forwarded-For': '1.2.3.4, 198.51.100.7, 10.0.0.2'})
+    assert client_ip(forwarded, trusted_proxies=proxies) == '198.51.100.7'
+
+
+def test_client_ip_falls_back_to_real_ip_then_peer():
+    proxies = frozenset({'10.0.0.1'})
+    assert client_ip(request('10.0.0.1', **{'X-Real-IP': ' 1.2.3.4 '}), trusted_proxies=proxies) == '1.2.3.4'
+    assert client_ip(request('10.0.0.1', **{'X-Forwarded-For': '10.0.0.1'}), trusted_proxies=proxies) == '10.0.0.1'
+    assert client_ip(request(None), trusted_proxies=proxies) == 'unknown'
@@ -0,0 +1,68 @@
+"""
+FPSOS Sharding Tests
+Shard id ranges and the cluster launcher's shard plans
+"""
+
+import pytest
+
+from utils.sharding import format_shard_ids, parse_shard_ids, plan_clusters
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('0-3,8', [0, 1, 2, 3, 8]),
+    ('5', [5]),
+    (' 2 - 4 , 0 ', [0, 2, 3, 4]),
+    ('3,1-3,1', [1, 2, 3]),
+])
+def test_parse_shard_ids(text, expected):
+    assert parse_shard_ids(text) == expected
+
+
+@pytest.mark.parametrize('text', [None, ''])
+def test_parse_shard_ids_empty_means_every_shard(text):
+    assert parse_shard_ids(text) is None
+
+
+def test_parse_shard_ids_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_shard_ids('0-x')
+
+
+@pytest.mark.parametrize('shard_ids', [[0], [0, 1, 2, 3, 8], [1, 3, 5], list(range(16))])
+def test_format_shard_ids_round_trips(shard_ids):
+    assert parse_shard_ids(format_shard_ids(shard_ids)) == shard_ids
+
+
+@pytest.mark.parametrize('shard_count, clusters, pinned', [
+    (16, 4, ()),
+    (16, 4, (0, 13)),
+    (10, 3, (0, 9)),
+    (7, 7, (0,)),
+    (5, 2, (0, 1, 2, 3)),
+])
+def test_plan_clusters_assigns_every_shard_once(shard_count, clusters, pinned):
+    plan = plan_clusters(shard_count, clusters, pinned)
+    assigned = [shard_id for shard_ids in plan for shard_id in shard_ids]
+    assert sorted(assigned) == list(range(shard_count))
+    assert set(pinned) <= set(plan[0])
+    assert len(plan) <= clusters
+
+
+def test_plan_clusters_balances_without_pins():
+    plan = plan_clusters(16, 4)
+    assert plan == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11], [12, 13, 14, 15]]
+
+
+def test_plan_clusters_tops_up_cluster_zero_around_pinned_shards():
+    plan = plan_clusters(16, 4, pinned=(0, 13))
+    assert plan[0] == [0, 1, 2, 13]
+    assert [len(shard_ids) for shard_ids in plan] == [4, 4, 4, 4]
+
+
+def test_plan_clusters_clamps_cluster_count():
+    assert plan_clusters(2, 8) == [[0], [1]]
+    assert plan_clusters(4, 0) == [[0, 1, 2, 3]]
+
+
+def test_plan_clusters_ignores_pins_outside_the_shard_range():
+    assert plan_clusters(4, 2, pinned=(0, 7, -1)) == [[0, 1], [2, 3]]
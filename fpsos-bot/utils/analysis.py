@@ -0,0 +1,195 @@
+"""
+FPSOS Diagnostic Analysis
+Parses, validates and scores diagnostic uploads in worker processes, fed by a bounded job queue
+"""
+
+import asyncio
+import multiprocessing
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.analysis_worker import analyze, warm_up
+from utils.config import ANALYSIS_QUEUE_SIZE, ANALYSIS_WORKERS
+
+
+class AnalysisBusy(Exception):
+    """Raised by submit() when the job queue is full"""
+
+    def __init__(self, queued):
+        super().__init__(f"{queued} diagnostics already queued")
+        self.queued = queued
+
+
+# ========== RESULTS ==========
+
+def summarize(result):
+    """An analyze() result without the parsed data: the score plus the system info and first issues a reply shows
+
+    This is what the analysis cache stores for a re-upload.
+    """
+    data = result['data']
+    system = data.get('system') or {}
+    issues = data.get('issues') or {}
+    return {
+        **{key: value for key, value in result.items() if key != 'data'},
+        'system': {key: system[key] for key in ('cpu', 'gpu', 'ram', 'network') if key in system},
+        'critical': (issues.get('critical') or [])[:5],
+        'warnings': (issues.get('warnings') or [])[:5],
+    }
+
+
+# ========== SERVICE (runs on the event loop) ==========
+
+class _Job:
+    __slots__ = ('raw_sections', 'future', 'enqueued_at')
+
+    def __init__(self, raw_sections, future, enqueued_at):
+        self.raw_sections = raw_sections
+        self.future = future
+        self.enqueued_at = enqueued_at
+
+
+class AnalysisService:
+    """Runs analyze() in a process pool so a heavy upload never stalls the gateway
+
+    Uploads wait in a FIFO of at most `queue_size` jobs, and `workers`
+    runner tasks each hand one job at a time to the pool. When every worker
+    is busy, submit() reports the job's queue position through `on_queued`
+    so the user can be told; when the queue itself is full it raises
+    AnalysisBusy instead of letting a burst pile up. Workers are spawned
+    rather than forked, as on Windows, so nothing of the bot's memory is
+    copied into them. A spawned worker imports utils.analysis_worker and
+    re-imports the entry script as __mp_main__; bot.py and ultimate_bot.py
+    are bare launchers, so that re-import opens no database, client or
+    socket. A worker that dies takes its job with it and the pool is
+    rebuilt for the next one.
+    """
+
+    def __init__(self, workers=ANALYSIS_WORKERS, queue_size=ANALYSIS_QUEUE_SIZE, func=analyze, clock=time.monotonic):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.func = func
+        self.clock = clock
+        self._queue = None
+        self._pool = None
+        self._runners = []
+        self._running = 0
+
+        self.completed = 0
+        self.failed = 0
+        self.queued = 0    # Jobs that had to wait for a worker
+        self.rejected = 0  # Jobs turned away with AnalysisBusy
+        self._waits = deque(maxlen=1000)     # Recent queue waits, seconds
+        self._services = deque(maxlen=1000)  # Recent time in the pool, seconds
+
+    # ========== PUBLIC API ==========
+
+    def start(self):
+        """Spawn the worker processes now rather than on the first upload"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            for _ in range(self.workers):
+                self._pool.submit(warm_up)
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._runners = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def submit(self, raw_sections, on_queued=None):
+        """Analyze an upload's raw sections in a worker and return the result
+
+        If every worker is busy, awaits `on_queued(position)` (1 = next in
+        line) before waiting for a turn. Raises AnalysisBusy if the queue is
+        full, and whatever analyze() raised.
+        """
+        self.start()
+        if self.depth >= self.queue_size:
+            self.rejected += 1
+            raise AnalysisBusy(self.depth)
+        job = _Job(raw_sections, asyncio.get_running_loop().create_future(), self.clock())
+        self._queue.put_nowait(job)
+        if self.depth:
+            self.queued += 1
+            if on_queued is not None:
+                await on_queued(self.depth)
+        return await job.future
+
+    @property
+    def depth(self):
+        """Jobs waiting for a worker; queued jobs an idle runner is about to take do not count"""
+        if self._queue is None:
+            return 0
+        return max(0, self._queue.qsize() - (self.workers - self._running))
+
+    async def close(self):
+        """Cancel queued jobs and stop the workers"""
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait().future.cancel()
+        self._queue = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        """Queue depth, throughput, and wait / service times, for /api/status"""
+        waits, services = sorted(self._waits), sorted(self._services)
+        return {
+            'workers': self.workers,
+            'busy': self._running,
+            'depth': self.depth,
+            'queue_size': self.queue_size,
+            'completed': self.completed,
+            'failed': self.failed,
+            'queued': self.queued,
+            'rejected': self.rejected,
+            'wait_ms_p50': round(statistics.median(waits) * 1000, 1) if waits else 0.0,
+            'wait_ms_p99': round(waits[int(len(waits) * 0.99) - 1] * 1000, 1) if waits else 0.0,
+            'service_ms_p50': round(statistics.median(services) * 1000, 1) if services else 0.0,
+            'service_ms_p99': round(services[int(len(services) * 0.99) - 1] * 1000, 1) if services else 0.0,
+        }
+
+    # ========== DISPATCH ==========
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.done():  # The upload's handler was cancelled while it waited
+                continue
+            started = self.clock()
+            self._waits.append(started - job.enqueued_at)
+            self._running += 1
+            pool = self._pool
+            try:
+                result = await loop.run_in_executor(pool, self.func, job.raw_sections)
+            except asyncio.CancelledError:
+                job.future.cancel()  # close() mid-job
+                raise
+            except BrokenProcessPool as e:
+                self.failed += 1
+                if self._pool is pool:  # Other runners may have hit the same dead pool
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+                    self.start()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            except Exception as e:
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self.completed += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._running -= 1
+                self._services.append(self.clock() - started)
+
+
+analysis = AnalysisService()
@@ -0,0 +1,37 @@
+"""
+FPSOS Diagnostic Analysis Worker
+What the analysis worker processes run: parse, validate and score one upload, importing nothing of the bot
+"""
+
+from utils.diagnostic_schema import extract_diagnostic_fields, validate_diagnostic
+from utils.ingest import parse_sections
+from utils.recommendations import FEATURES, recommend
+
+
+def score_diagnostic(data):
+    """Package recommendation for a validated diagnostic, from the shared recommendation rules"""
+    issues = data.get('issues') or {}
+    critical_count = len(issues.get('critical') or [])
+    warning_count = len(issues.get('warnings') or [])
+    fields = extract_diagnostic_fields(data)
+    features = {name: fields[name] for name in FEATURES if name in fields}
+    return {
+        **recommend(critical_count=critical_count, warning_count=warning_count, **features),
+        'critical_count': critical_count,
+        'warning_count': warning_count,
+    }
+
+
+def analyze(raw_sections):
+    """Parse the raw sections read_diagnostic(parse=False) kept, validate and score them
+
+    Returns {'data': parsed sections, **score_diagnostic(...)}. Raises
+    MalformedDiagnostic or DiagnosticInvalid, which cross the process
+    boundary intact.
+    """
+    data = validate_diagnostic(parse_sections(raw_sections))
+    return {'data': data, **score_diagnostic(data)}
+
+
+def warm_up():
+    """Submitted once per worker at start, so the first upload does not pay for spawning"""
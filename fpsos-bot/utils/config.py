@@ -11,6 +11,38 @@ GUILD_ID = os.getenv('DISCORD_GUILD_ID')
 FIRECRAWL_API_KEY = os.getenv('FIRECRAWL_API_KEY')
 NEWS_CHANNEL_ID = os.getenv('NEWS_CHANNEL_ID')
 
+# Bot database: a local SQLite file by default, or a libsql:// URL for a remote libSQL/Turso database
+BOT_DATABASE_URL = os.getenv('BOT_DATABASE_URL')
+BOT_DATABASE_AUTH_TOKEN = os.getenv('BOT_DATABASE_AUTH_TOKEN')
+
+# Diagnostics older than this many days move to monthly archive files (unset = keep everything live)
+DIAGNOSTICS_RETENTION_DAYS = int(os.getenv('DIAGNOSTICS_RETENTION_DAYS', '0')) or None
+
+# Diagnostic uploads larger than this are rejected before download (real reports are a few KB)
+DIAGNOSTIC_MAX_BYTES = int(os.getenv('DIAGNOSTIC_MAX_BYTES', str(1024 * 1024)))
+
+# Diagnostic analysis runs in this many worker processes; at most ANALYSIS_QUEUE_SIZE uploads wait for one
+ANALYSIS_WORKERS = max(1, int(os.getenv('ANALYSIS_WORKERS', str(min(2, os.cpu_count() or 1)))))
+ANALYSIS_QUEUE_SIZE = int(os.getenv('ANALYSIS_QUEUE_SIZE', '20'))
+
+# Analysis results of this many recent uploads are kept in memory; the rest are read back from analysis_cache
+ANALYSIS_CACHE_SIZE = int(os.getenv('ANALYSIS_CACHE_SIZE', '1024'))
+
+# Sharding: SHARD_COUNT (or BOT_SHARDED=1 for Discord's recommended count) runs an AutoShardedBot.
+# cluster.py sets SHARD_IDS (e.g. "0-3") and CLUSTER_ID for each process it launches.
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = os.getenv('SHARD_IDS')
+CLUSTER_ID = int(os.getenv('CLUSTER_ID', '0'))
+SHARDED = bool(SHARD_COUNT) or os.getenv('BOT_SHARDED', '').lower() in ('1', 'true', 'yes')
+
+# Point the bot at another Discord API / gateway, e.g. benchmarks/fake_gateway.py for local testing
+DISCORD_API_BASE = os.getenv('DISCORD_API_BASE')
+DISCORD_GATEWAY_URL = os.getenv('DISCORD_GATEWAY_URL')
+
+# Addresses of reverse proxies in front of the control plane (comma-separated). Only requests
+# arriving from one of them have X-Forwarded-For / X-Real-IP honoured; unset = key on the peer address
+TRUSTED_PROXIES = frozenset(ip.strip() for ip in os.getenv('TRUSTED_PROXIES', '').split(',') if ip.strip())
+
 # 2026 Industry Standard Palette (Vibrant, Premium, Apple/Bloomberg inspired)
 class Colors:
     FPSOS_PURPLE = 0x680036
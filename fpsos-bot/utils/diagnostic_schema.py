@@ -0,0 +1,235 @@
+"""
+FPSOS Diagnostic Schema
+The versioned shape of a diagnostic upload (diagnostic_schema.json), compiled once at load into a validator
+"""
+
+import json
+import re
+from pathlib import Path
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'diagnostic_schema.json'
+
+TYPES = {'object', 'array', 'string', 'number'}
+NODE_KEYS = {
+    'object': {'properties', 'required'},
+    'array': {'items', 'max_items'},
+    'string': {'min_length', 'max_length'},
+    'number': {'min', 'max'},
+}
+
+# Python source testing `{v}` for each JSON type; bool is not a number
+_TYPE_TESTS = {
+    'object': 'type({v}) is dict',
+    'array': 'type({v}) is list',
+    'string': 'type({v}) is str',
+    'number': '(type({v}) is int or type({v}) is float)',
+}
+
+
+class SchemaError(ValueError):
+    """diagnostic_schema.json is malformed"""
+
+
+class DiagnosticInvalid(ValueError):
+    """An upload does not match the schema; `errors` is [{'field': ..., 'message': ...}]"""
+
+    def __init__(self, version, errors):
+        self.version = version
+        self.errors = [{'field': field, 'message': message} for field, message in errors]
+        super().__init__('; '.join(f"{error['field'] or '(root)'}: {error['message']}" for error in self.errors))
+
+    def __reduce__(self):
+        # Rebuilt from (version, errors) when raised in an analysis worker process
+        return type(self), (self.version, [(error['field'], error['message']) for error in self.errors])
+
+
+def _kind(value):
+    """JSON type name of a parsed value, for error messages"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    return 'array' if isinstance(value, list) else 'object'
+
+
+class DiagnosticSchema:
+    """One schema version, compiled to a Python function (kept in `source`)
+
+    The generated function walks the schema's fixed shape with inline type,
+    length and range tests and no per-node dispatch, appending (field, message)
+    pairs for every mismatch. Lengths are checked before an array's items, so
+    an oversized array is rejected without visiting them. Properties are
+    optional and null counts as absent, unless listed in `required`; keys the
+    schema does not mention are ignored.
+    """
+
+    def __init__(self, spec):
+        version = spec.get('version')
+        if not isinstance(version, int) or version < 1:
+            raise SchemaError("schema needs an integer version >= 1")
+        self.version = version
+        self._names = 0
+        body = self._node({key: value for key, value in spec.items() if key != 'version'}, 'data', "''", '    ')
+        self.source = '\n'.join(['def validate(data, errors):', *body]) + '\n'
+        namespace = {'kind': _kind}
+        exec(compile(self.source, f'<diagnostic schema v{version}>', 'exec'), namespace)
+        self._validate = namespace['validate']
+
+    def _name(self, prefix):
+        self._names += 1
+        return f'{prefix}{self._names}'
+
+    def _node(self, spec, var, path, indent):
+        """Source lines checking the value in `var`; `path` is source for its field name"""
+        types = spec.get('type')
+        types = [types] if isinstance(types, str) else types
+        if not types or not set(types) <= TYPES:
+            raise SchemaError(f"{path}: type must be one of {sorted(TYPES)} or a list of them, got {types!r}")
+        unknown = set(spec) - {'type'} - set().union(*(NODE_KEYS[t] for t in types))
+        if unknown:
+            raise SchemaError(f"{path}: unknown keys {sorted(unknown)} for type {types}")
+
+        lines = []
+        for index, kind in enumerate(types):
+            checks = getattr(self, f'_{kind}')(spec, var, path, indent + '    ')
+            lines.append(f"{indent}{'if' if index == 0 else 'elif'} {_TYPE_TESTS[kind].format(v=var)}:")
+            lines += checks or [f'{indent}    pass']
+        expected = ' or '.join(types)
+        lines.append(f'{indent}else:')
+        lines.append(f"{indent}    errors.append(({path}, f'Expected {expected}, received {{kind({var})}}'))")
+        return lines
+
+    def _object(self, spec, var, path, indent):
+        properties = spec.get('properties', {})
+        required = spec.get('required', [])
+        if not isinstance(properties, dict) or not set(required) <= set(properties):
+            raise SchemaError(f"{path}: properties must be an object listing every required key")
+        lines = []
+        for key, child in properties.items():
+            if not key.isidentifier():
+                raise SchemaError(f"{path}: property names must be identifiers, got {key!r}")
+            child_var = self._name('v')
+            child_path = repr(key) if path == "''" else self._join(path, f'.{key}')
+            lines.append(f'{indent}{child_var} = {var}.get({key!r})')
+            if key in required:
+                lines.append(f'{indent}if {child_var} is None:')
+                lines.append(f"{indent}    errors.append(({child_path}, 'Required'))")
+                lines.append(f'{indent}else:')
+            else:
+                lines.append(f'{indent}if {child_var} is not None:')
+            lines += self._node(child, child_var, child_path, indent + '    ')
+        return lines
+
+    def _array(self, spec, var, path, indent):
+        if 'items' not in spec:
+            raise SchemaError(f"{path}: arrays need items")
+        index, item = self._name('i'), self._name('v')
+        lines = []
+        body = indent
+        if 'max_items' in spec:
+            lines.append(f"{indent}if len({var}) > {int(spec['max_items'])}:")
+            lines.append(f"{indent}    errors.append(({path}, 'Array must contain at most {int(spec['max_items'])} element(s)'))")
+            lines.append(f'{indent}else:')
+            body = indent + '    '
+        lines.append(f'{body}for {index}, {item} in enumerate({var}):')
+        lines += self._node(spec['items'], item, self._join(path, f'[{{{index}}}]'), body + '    ')
+        return lines
+
+    def _string(self, spec, var, path, indent):
+        lines = []
+        if 'min_length' in spec:
+            lines.append(f"{indent}if len({var}) < {int(spec['min_length'])}:")
+            lines.append(f"{indent}    errors.append(({path}, 'String must contain at least {int(spec['min_length'])} character(s)'))")
+        if 'max_length' in spec:
+            lines.append(f"{indent}{'elif' if lines else 'if'} len({var}) > {int(spec['max_length'])}:")
+            lines.append(f"{indent}    errors.append(({path}, 'String must contain at most {int(spec['max_length'])} character(s)'))")
+        return lines
+
+    def _number(self, spec, var, path, indent):
+        lines = []
+        # `not x >= min` rather than `x < min`, so NaN fails too
+        if 'min' in spec:
+            lines.append(f"{indent}if not {var} >= {spec['min']!r}:")
+            lines.append(f"{indent}    errors.append(({path}, 'Number must be greater than or equal to {spec['min']}'))")
+        if 'max' in spec:
+            lines.append(f"{indent}{'elif' if lines else 'if'} not {var} <= {spec['max']!r}:")
+            lines.append(f"{indent}    errors.append(({path}, 'Number must be less than or equal to {spec['max']}'))")
+        return lines
+
+    @staticmethod
+    def _join(path, suffix):
+        """Source for field name `path` + `suffix`, an f-string once `suffix` holds an {index}"""
+        if path.startswith("f'"):
+            return path[:-1] + suffix + "'"
+        return ('f' if '{' in suffix else '') + path[:-1] + suffix + "'"
+
+    def errors(self, data):
+        """Every mismatch as (field, message) pairs; empty when `data` is valid"""
+        errors = []
+        self._validate(data, errors)
+        return errors
+
+    def validate(self, data):
+        """Return `data` if it matches, else raise DiagnosticInvalid listing every mismatch"""
+        errors = []
+        self._validate(data, errors)
+        if errors:
+            raise DiagnosticInvalid(self.version, errors)
+        return data
+
+
+# ========== FIELD EXTRACTION ==========
+
+def _as_text(value, max_length=200):
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)[:max_length]
+
+
+def _as_number(value):
+    """Numbers pass through; strings like '16 GB' yield their leading number"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.match(r'\s*(-?\d+(?:\.\d+)?)', value)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def extract_diagnostic_fields(json_data):
+    """Pull the indexed columns out of a diagnostic upload's system/performance sections"""
+    system = json_data.get('system') if isinstance(json_data, dict) else None
+    performance = json_data.get('performance') if isinstance(json_data, dict) else None
+    system = system if isinstance(system, dict) else {}
+    performance = performance if isinstance(performance, dict) else {}
+    return {
+        'cpu': _as_text(system.get('cpu')),
+        'gpu': _as_text(system.get('gpu')),
+        'ram_gb': _as_number(system.get('ram')),
+        'network': _as_text(system.get('network')),
+        'current_fps': _as_number(performance.get('current_fps')),
+        'target_fps': _as_number(performance.get('target_fps')),
+        'latency_ms': _as_number(performance.get('latency_ms')),
+    }
+
+
+def load_schema(path=SCHEMA_PATH):
+    with open(path, encoding='utf-8') as f:
+        return DiagnosticSchema(json.load(f))
+
+
+# Compiled at import: a malformed schema stops the bot at startup
+schema = load_schema()
+SCHEMA_VERSION = schema.version
+
+
+def validate_diagnostic(data):
+    """Check a parsed upload against the current schema; raises DiagnosticInvalid"""
+    return schema.validate(data)
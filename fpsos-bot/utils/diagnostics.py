@@ -1,129 +1,113 @@
-import json
-import discord
-from utils.config import Colors
+from utils.analysis import AnalysisBusy, analysis, summarize
+from utils.diagnostic_schema import DiagnosticInvalid
+from utils.embed_templates import render
+from utils.ingest import MalformedDiagnostic, UploadTooLarge, read_diagnostic, upload_hash
+from utils.recommendations import RULES_VERSION
 from utils.views import BookingView, DiagnosticView
-from database import db
+from async_database import adb
 
 async def handle_diagnostic_json(message, attachment):
     """
     Process diagnostic JSON file upload
     Analyzes JSON and recommends a package
     """
+    queued_note = None
+
+    async def on_queued(position):
+        nonlocal queued_note
+        queued_note = await message.reply(embed=render('diagnostic_queued', position=position))
+
+    async def respond(embed, view=None):
+        # A queued upload's note becomes its result, so the channel gets one message either way
+        if queued_note is not None:
+            await queued_note.edit(embed=embed, view=view)
+        elif view is not None:
+            await message.reply(embed=embed, view=view)
+        else:
+            await message.reply(embed=embed)
+
     async with message.channel.typing():
         try:
-            # Download and parse JSON
-            file_bytes = await attachment.read()
-            diagnostic_data = json.loads(file_bytes.decode('utf-8'))
-            
-            # Extract system info
-            system_info = diagnostic_data.get('system', {})
-            issues = diagnostic_data.get('issues', {})
-            
-            critical_issues = issues.get('critical', [])
-            warning_issues = issues.get('warnings', [])
-            
-            critical_count = len(critical_issues)
-            warning_count = len(warning_issues)
-            
-            # Smart recommendation algorithm
-            if critical_count >= 2:
-                recommendation = 'extreme'
-                package_name = 'Extreme BIOSPRIME'
-                price = 'AED 699'
-                reason = f"{critical_count} critical issues detected - requires deep BIOS optimization"
-                color = Colors.ERROR
-            elif critical_count >= 1 or warning_count >= 3:
-                recommendation = 'full'
-                package_name = 'Full System Tune-Up'
-                price = 'AED 399'
-                reason = f"{critical_count} critical + {warning_count} warnings - comprehensive optimization needed"
-                color = Colors.WARNING
-            elif warning_count >= 1:
-                recommendation = 'quick'
-                package_name = 'Quick Remote Fix'
-                price = 'AED 199'
-                reason = f"{warning_count} minor issues - quick fixes available"
-                color = Colors.FPSOS_BLUE
-            else:
-                recommendation = 'good'
-                package_name = 'Your System Looks Great!'
-                price = 'No service needed'
-                reason = "No critical issues detected - you're good to go!"
-                color = Colors.SUCCESS
-            
-            # Save to database
-            db.save_diagnostic(
-                message.author.id,
-                diagnostic_data,
-                critical_count,
-                warning_count,
-                recommendation
-            )
-            print(f"✅ Saved diagnostic for {message.author.name}: {recommendation}")
-            
+            # Stream the upload, keeping only the sections used below; parsing, validation
+            # and scoring happen in an analysis worker process, off the event loop
+            raw_sections = await read_diagnostic(attachment, parse=False)
+
+            # The same file from the same user is answered from the analysis cache,
+            # without re-analysis or another diagnostics row
+            content_hash = upload_hash(raw_sections)
+            result = await adb.get_cached_analysis(content_hash, message.author.id, RULES_VERSION)
+            cached = result is not None
+            if not cached:
+                analyzed = await analysis.submit(raw_sections, on_queued=on_queued)
+                result = summarize(analyzed)
+
+                # Save to database
+                diagnostic_id = await adb.save_diagnostic(
+                    message.author.id,
+                    analyzed['data'],
+                    result['critical_count'],
+                    result['warning_count'],
+                    result['recommendation'],
+                    rules_version=result['rules_version']
+                )
+                await adb.cache_analysis(content_hash, message.author.id, result['rules_version'], result, diagnostic_id)
+                print(f"✅ Saved diagnostic for {message.author.name}: {result['recommendation']}")
+
+            system_info = result['system']
+            critical_count = result['critical_count']
+            warning_count = result['warning_count']
+            recommendation = result['recommendation']
+
             # Create beautiful result embed
-            embed = discord.Embed(
-                title="🎯 Diagnostic Analysis Complete",
-                description=f"**Recommendation:** {package_name}\n{reason}",
-                color=color
+            warning_text = '\n'.join([f"⚠️ {issue}" for issue in result['warnings']])
+            if warning_count > 5:
+                warning_text += f"\n... and {warning_count - 5} more"
+            embed = render(
+                'diagnostic_result',
+                package_name=result['package_name'],
+                reason=result['reason'],
+                color=result['color'],
+                has_system=bool(system_info),
+                cpu=system_info.get('cpu', 'Unknown'),
+                gpu=system_info.get('gpu', 'Unknown'),
+                ram=system_info.get('ram', 'Unknown'),
+                network=system_info.get('network', 'Unknown'),
+                critical_count=critical_count,
+                critical='\n'.join([f"❌ {issue}" for issue in result['critical']]),
+                warning_count=warning_count,
+                warnings=warning_text,
+                price=result['price'],
+                score=result['score'],
+                status='Same file as before, result reused' if cached else 'Diagnostic saved',
+                name=message.author.name,
             )
-            
-            # Add system info
-            if system_info:
-                sys_text = f"""
-                **CPU:** {system_info.get('cpu', 'Unknown')}
-                **GPU:** {system_info.get('gpu', 'Unknown')}
-                **RAM:** {system_info.get('ram', 'Unknown')} GB
-                **Network:** {system_info.get('network', 'Unknown')}
-                """
-                embed.add_field(name="💻 System", value=sys_text.strip(), inline=False)
-            
-            # Add critical issues
-            if critical_count > 0:
-                critical_text = '\n'.join([f"❌ {issue}" for issue in critical_issues[:5]])
-                embed.add_field(name=f"⚠️ Critical Issues ({critical_count})", value=critical_text, inline=False)
-            
-            # Add warnings (limit to 5)
-            if warning_count > 0:
-                warning_text = '\n'.join([f"⚠️ {issue}" for issue in warning_issues[:5]])
-                if warning_count > 5:
-                    warning_text += f"\n... and {warning_count - 5} more"
-                embed.add_field(name=f"⚠️ Warnings ({warning_count})", value=warning_text, inline=False)
-            
-            # Add pricing and score
-            embed.add_field(name="💰 Investment", value=price, inline=True)
-            embed.add_field(name="📊 Health Score", value=f"{max(0, 100 - (critical_count * 20 + warning_count * 5))}/100", inline=True)
-            
-            embed.set_footer(text=f"Diagnostic saved • {message.author.name}")
-            
+
             # Send result with booking option if needed
             if recommendation != 'good':
-                view = BookingView(recommendation)
-                await message.reply(embed=embed, view=view)
+                await respond(embed, BookingView(recommendation))
             else:
-                await message.reply(embed=embed)
-            
-        except json.JSONDecodeError:
-            error_embed = discord.Embed(
-                title="❌ Invalid JSON File",
-                description="The file you uploaded doesn't appear to be a valid diagnostic JSON.\n\nPlease run the **FPSOS PowerShell diagnostic tool** and upload the generated JSON file.",
-                color=Colors.ERROR
-            )
-            await message.reply(embed=error_embed)
-        
+                await respond(embed)
+            if cached:
+                await adb.record_cache_hit(content_hash, message.author.id)
+
+        except AnalysisBusy:
+            await message.reply(embed=render('diagnostic_busy'))
+
+        except UploadTooLarge as e:
+            await respond(render('diagnostic_too_large', detail=e))
+
+        except DiagnosticInvalid as e:
+            shown = '\n'.join(f"{error['field'] or '(root)'}: {error['message']}" for error in e.errors[:5])
+            if len(e.errors) > 5:
+                shown += f"\n... and {len(e.errors) - 5} more"
+            await respond(render('diagnostic_rejected', version=e.version, errors=shown))
+
+        except MalformedDiagnostic:
+            await respond(render('diagnostic_invalid_json'))
+
         except KeyError as e:
-            error_embed = discord.Embed(
-                title="❌ Incomplete Diagnostic Data",
-                description=f"The diagnostic file is missing required data: `{e}`\n\nPlease re-run the diagnostic tool and try again.",
-                color=Colors.ERROR
-            )
-            await message.reply(embed=error_embed)
-        
+            await respond(render('diagnostic_incomplete', missing=e))
+
         except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Processing Error",
-                description=f"An error occurred while analyzing your diagnostic:\n```{str(e)}```\n\nPlease contact support if this persists.",
-                color=Colors.ERROR
-            )
-            await message.reply(embed=error_embed)
+            await respond(render('diagnostic_error', error=e))
             print(f"❌ Diagnostic processing error: {e}")
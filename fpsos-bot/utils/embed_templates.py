@@ -0,0 +1,231 @@
+"""
+FPSOS Embed Templates
+Declarative embeds from embed_templates.json, checked against Discord's limits and compiled once at load
+"""
+
+import json
+from pathlib import Path
+from string import Formatter
+
+from utils.config import Colors
+
+TEMPLATES_PATH = Path(__file__).resolve().parent.parent / 'embed_templates.json'
+
+# Discord limits for one embed
+TITLE_LIMIT = 256
+DESCRIPTION_LIMIT = 4096
+FIELDS_LIMIT = 25
+FIELD_NAME_LIMIT = 256
+FIELD_VALUE_LIMIT = 1024
+FOOTER_LIMIT = 2048
+EMBED_TOTAL_LIMIT = 6000  # Title, description, field names and values, and footer combined
+
+TEMPLATE_KEYS = {'title', 'description', 'color', 'thumbnail', 'image', 'footer', 'fields', 'widths'}
+FIELD_KEYS = {'name', 'value', 'inline', 'when'}
+
+
+class TemplateError(ValueError):
+    """A template breaks Discord's limits or is malformed, or a render is missing a value"""
+
+
+class _Text:
+    """A template string parsed into literal text and `{placeholders}`"""
+
+    __slots__ = ('names', 'static_length', 'expression')
+
+    def __init__(self, where, source, widths, limit=None):
+        if not isinstance(source, str) or not source:
+            raise TemplateError(f"{where}: expected a non-empty string")
+        try:
+            parts = list(Formatter().parse(source))
+        except ValueError as e:
+            raise TemplateError(f"{where}: {e}") from None
+
+        self.names = []
+        self.static_length = 0
+        literals, fstring = [], []
+        for literal, name, spec, conversion in parts:
+            self.static_length += len(literal)
+            literals.append(literal)
+            fstring.append(literal.replace('{', '{{').replace('}', '}}'))
+            if name is None:
+                continue
+            if not name.isidentifier() or spec or conversion:
+                raise TemplateError(f"{where}: only plain {{placeholders}} are supported, got {{{name}}}")
+            if name not in widths:
+                raise TemplateError(f"{where}: no width declared for {{{name}}}")
+            self.names.append(name)
+            fstring.append(f'{{v_{name}}}')
+        # Python source for the value: a constant, or an f-string over the clipped placeholders
+        self.expression = 'f' + repr(''.join(fstring)) if self.names else repr(''.join(literals))
+
+        if limit is not None and self.max_length(widths) > limit:
+            raise TemplateError(f"{where}: up to {self.max_length(widths)} characters, limit is {limit}")
+
+    def max_length(self, widths):
+        return self.static_length + sum(widths[name] for name in self.names)
+
+
+def _clip(value, width):
+    value = str(value)
+    return value if len(value) <= width else value[:width - 1] + '…'
+
+
+class EmbedTemplate:
+    """One embed, validated and compiled into a function that returns its payload
+
+    Every placeholder declares a maximum width in `widths`, so the worst case
+    is checked against Discord's limits here, and values are clipped to their
+    width when filled in. The template is then compiled to Python source
+    (kept in `source`) in which static text is a constant and each dynamic
+    string is a single f-string, so a build only formats what changes per
+    call. A field with `when` is left out unless that value is truthy.
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        unknown = set(spec) - TEMPLATE_KEYS
+        if unknown:
+            raise TemplateError(f"{name}: unknown keys {sorted(unknown)}")
+        self.widths = spec.get('widths', {})
+        if not all(isinstance(width, int) and width > 0 for width in self.widths.values()):
+            raise TemplateError(f"{name}: widths must be positive integers")
+
+        items = []         # (payload key, Python source for its value)
+        always = set()     # Placeholders needed by every build
+        total = 0
+        for key, subkey, limit in (('title', None, TITLE_LIMIT), ('description', None, DESCRIPTION_LIMIT),
+                                   ('footer', 'text', FOOTER_LIMIT), ('thumbnail', 'url', None), ('image', 'url', None)):
+            if key in spec:
+                text = _Text(f"{name}.{key}", spec[key], self.widths, limit)
+                total += text.max_length(self.widths) if limit else 0
+                always.update(text.names)
+                items.append((key, f"{{{subkey!r}: {text.expression}}}" if subkey else text.expression))
+        if 'color' in spec:
+            items.append(('color', self._color(spec['color'])))
+
+        fields = spec.get('fields', [])
+        if len(fields) > FIELDS_LIMIT:
+            raise TemplateError(f"{name}: {len(fields)} fields, limit is {FIELDS_LIMIT}")
+        compiled = []  # (when, names, Python source for the field dict)
+        for index, field in enumerate(fields):
+            where = f"{name}.fields[{index}]"
+            unknown = set(field) - FIELD_KEYS
+            if unknown or 'name' not in field or 'value' not in field:
+                raise TemplateError(f"{where}: needs name and value, unknown keys {sorted(unknown)}")
+            field_name = _Text(f"{where}.name", field['name'], self.widths, FIELD_NAME_LIMIT)
+            field_value = _Text(f"{where}.value", field['value'], self.widths, FIELD_VALUE_LIMIT)
+            total += field_name.max_length(self.widths) + field_value.max_length(self.widths)
+            when = field.get('when')
+            names = field_name.names + field_value.names
+            if when is None:
+                always.update(names)
+            compiled.append((when, names, f"{{'inline': {bool(field.get('inline', False))}, "
+                                          f"'name': {field_name.expression}, 'value': {field_value.expression}}}"))
+
+        if total > EMBED_TOTAL_LIMIT:
+            raise TemplateError(f"{name}: up to {total} characters in total, limit is {EMBED_TOTAL_LIMIT}")
+
+        self.source = self._generate(items, always, compiled)
+        namespace = {'clip': _clip}
+        exec(compile(self.source, f'<embed template {name}>', 'exec'), namespace)
+        self._build = namespace['build']
+
+    def _color(self, color):
+        """Python source for the embed colour: a Colors name, #RRGGBB, or a {placeholder} holding an int"""
+        if isinstance(color, str) and color.startswith('{') and color.endswith('}') and color[1:-1].isidentifier():
+            return f"int(values[{color[1:-1]!r}])"
+        if isinstance(color, str) and color.startswith('#'):
+            try:
+                return str(int(color[1:], 16))
+            except ValueError:
+                pass
+        elif isinstance(color, str) and isinstance(getattr(Colors, color, None), int):
+            return str(getattr(Colors, color))
+        raise TemplateError(f"{self.name}.color: expected a Colors name, #RRGGBB or {{placeholder}}, got {color!r}")
+
+    def _clip(self, names, indent):
+        """Source lines binding v_<name> to each value as a string, clipped to its width"""
+        lines = []
+        for name in dict.fromkeys(names):
+            width = self.widths[name]
+            lines += [
+                f"v_{name} = values[{name!r}]",
+                f"if type(v_{name}) is not str or len(v_{name}) > {width}: v_{name} = clip(v_{name}, {width})",
+            ]
+        return [indent + line for line in lines]
+
+    def _generate(self, items, always, fields):
+        """Source for `build(values)`, returning the payload dict"""
+        lines = ['def build(values):', *self._clip(sorted(always), '    ')]
+        if all(when is None for when, _, _ in fields):
+            fields_expression = '[' + ', '.join(source for _, _, source in fields) + ']' if fields else None
+        else:
+            lines.append('    fields = []')
+            for when, names, source in fields:
+                if when is None:
+                    lines.append(f'    fields.append({source})')
+                else:
+                    lines.append(f'    if values.get({when!r}):')
+                    lines += self._clip([name for name in names if name not in always], '        ')
+                    lines.append(f'        fields.append({source})')
+            fields_expression = 'fields'
+
+        lines.append("    payload = {'type': 'rich', " + ', '.join(f'{key!r}: {source}' for key, source in items) + '}')
+        if fields_expression == 'fields':
+            lines.append("    if fields: payload['fields'] = fields")
+        elif fields_expression:
+            lines.append(f"    payload['fields'] = {fields_expression}")
+        lines.append('    return payload')
+        return '\n'.join(lines) + '\n'
+
+    def build(self, **values):
+        """Embed payload dict (Discord's JSON shape) for `values`; a new dict on every call"""
+        return self._payload(values)
+
+    def _payload(self, values):
+        try:
+            return self._build(values)
+        except KeyError as e:
+            raise TemplateError(f"{self.name}: no value for {e}") from None
+
+    def render(self, **values):
+        """discord.Embed for `values`"""
+        return self._render(values)
+
+    def _render(self, values):
+        return _embed_class().from_dict(self._payload(values))
+
+
+_Embed = None
+
+
+def _embed_class():
+    """discord.Embed, imported on first render"""
+    global _Embed
+    if _Embed is None:
+        import discord  # Deferred so templates load (and are validated) without discord.py
+
+        _Embed = discord.Embed
+    return _Embed
+
+
+def load_templates(path=TEMPLATES_PATH):
+    """{name: EmbedTemplate} from a JSON file; raises TemplateError on the first problem"""
+    with open(path, encoding='utf-8') as f:
+        specs = json.load(f)
+    return {name: EmbedTemplate(name, spec) for name, spec in specs.items()}
+
+
+# Compiled at import: a template that breaks a limit stops the bot at startup, not at send time
+templates = load_templates()
+
+
+def render(template, /, **values):
+    """discord.Embed from the named template"""
+    return templates[template]._render(values)
+
+
+def build(template, /, **values):
+    """Embed payload dict from the named template"""
+    return templates[template]._payload(values)
@@ -0,0 +1,281 @@
+"""
+FPSOS Diagnostic Ingestion
+Size-checked, streamed download of diagnostic uploads, keeping only the sections the bot reads
+"""
+
+import hashlib
+import json
+import re
+
+from utils.config import DIAGNOSTIC_MAX_BYTES
+
+# Top-level sections of a diagnostic upload the bot uses; everything else is skipped unread
+SECTIONS = ('system', 'issues', 'performance')
+MAX_SECTION_BYTES = 256 * 1024
+MAX_KEY_BYTES = 256
+CHUNK_SIZE = 64 * 1024
+
+_BOM = b'\xef\xbb\xbf'
+_WHITESPACE = frozenset(b' \t\r\n')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_STRUCTURAL = re.compile(rb'["{}\[\],]')  # Commas only matter at the top level
+_NESTED = re.compile(rb'["{}\[\]]')
+
+
+class IngestError(ValueError):
+    """A diagnostic upload was rejected"""
+
+
+class UploadTooLarge(IngestError):
+    def __init__(self, what, size, limit):
+        super().__init__(f"{what} is {human_size(size)}, limit is {human_size(limit)}")
+        self.size = size
+        self.limit = limit
+
+
+class MalformedDiagnostic(IngestError):
+    """Not a JSON object, or a kept section is not valid JSON"""
+
+
+def parse_sections(raw):
+    """{section: value} from the raw JSON bytes kept by SectionScanner(parse=False)"""
+    sections = {}
+    for name, value in raw.items():
+        try:
+            sections[name] = json.loads(value)
+        except ValueError as e:
+            raise MalformedDiagnostic(f"section '{name}' is not valid JSON: {e}") from None
+    return sections
+
+
+def upload_hash(raw):
+    """SHA-256 hex of the raw section bytes SectionScanner(parse=False) kept, identifying a re-upload"""
+    digest = hashlib.sha256()
+    for name in sorted(raw):
+        digest.update(f'{name}:{len(raw[name])}:'.encode())
+        digest.update(raw[name])
+    return digest.hexdigest()
+
+
+def human_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{max(1, round(size / 1024))} KB"
+
+
+# Scanner states
+_START, _KEY_OR_END, _KEY_START, _KEY, _COLON, _VALUE_START, _VALUE, _AFTER_VALUE = range(8)
+
+
+class SectionScanner:
+    """Reads a JSON object's top level incrementally, parsing only the wanted sections
+
+    Feed it the document chunk by chunk. Values under other keys are stepped
+    over with a regex jump from one quote or bracket to the next, so nothing
+    of them is kept and their cost is one pass over the bytes. Wanted values
+    are buffered, up to `max_section_bytes` each, and handed to json.loads
+    once complete (or, with `parse=False`, kept as bytes for parse_sections
+    to decode elsewhere). `feed` returns True as soon as every wanted section has
+    been read (or the object closed), so the rest of the upload need not be
+    downloaded. Skipped values are only checked for balanced brackets.
+    """
+
+    def __init__(self, sections=SECTIONS, max_section_bytes=MAX_SECTION_BYTES, parse=True):
+        self.wanted = frozenset(sections)
+        self.max_section_bytes = max_section_bytes
+        self.parse = parse
+        self.sections = {}
+        self.done = False
+        self.bytes_scanned = 0
+        self._state = _START
+        self._key = bytearray()
+        self._name = None       # Decoded key of the value being read
+        self._pieces = None     # Chunks of the value being kept, or None when skipping it
+        self._kept = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk):
+        """Scan the next chunk; returns True once nothing more is needed"""
+        if self.done:
+            return True
+        self.bytes_scanned += len(chunk)
+
+        i, end = 0, len(chunk)
+        while i < end and not self.done:
+            state = self._state
+            if state == _VALUE:
+                i = self._scan_value(chunk, i)
+            elif state == _KEY:
+                i = self._scan_key(chunk, i)
+            else:
+                byte = chunk[i]
+                if byte in _WHITESPACE or (state == _START and byte in _BOM):
+                    i += 1
+                elif state == _START:
+                    self._expect(byte, b'{', 'a JSON object')
+                    self._state = _KEY_OR_END
+                    i += 1
+                elif state in (_KEY_OR_END, _KEY_START):
+                    if byte == ord('}') and state == _KEY_OR_END:
+                        self.done = True
+                    else:
+                        self._expect(byte, b'"', 'a key')
+                        self._state = _KEY
+                    i += 1
+                elif state == _COLON:
+                    self._expect(byte, b':', "':'")
+                    self._state = _VALUE_START
+                    i += 1
+                elif state == _VALUE_START:
+                    keep = self._name in self.wanted and self._name not in self.sections
+                    self._pieces = [] if keep else None
+                    self._kept = 0
+                    self._depth = 0
+                    self._in_string = False
+                    self._state = _VALUE
+                else:  # _AFTER_VALUE
+                    if byte == ord('}'):
+                        self.done = True
+                    else:
+                        self._expect(byte, b',', "',' or '}'")
+                        self._state = _KEY_START
+                    i += 1
+        return self.done
+
+    def finish(self):
+        """{section: value} once the stream has ended; raises if the object never closed"""
+        if not self.done:
+            raise MalformedDiagnostic("the file ends before its top-level object does")
+        return self.sections
+
+    def _expect(self, byte, expected, what):
+        if byte != expected[0]:
+            raise MalformedDiagnostic(f"expected {what} at byte {self.bytes_scanned}, got {chr(byte)!r}")
+
+    def _scan_key(self, chunk, i):
+        end = len(chunk)
+        while i < end:
+            if self._escape:
+                self._key.append(chunk[i])
+                self._escape = False
+                i += 1
+                continue
+            match = _STRING_SPECIAL.search(chunk, i)
+            stop = match.start() if match else end
+            self._key += chunk[i:stop]
+            if len(self._key) > MAX_KEY_BYTES:
+                raise MalformedDiagnostic(f"a key is longer than {MAX_KEY_BYTES} bytes")
+            if match is None:
+                return end
+            if chunk[stop] == ord('\\'):
+                self._key.append(ord('\\'))
+                self._escape = True
+                i = stop + 1
+                continue
+            try:
+                self._name = json.loads(b'"' + bytes(self._key) + b'"')
+            except ValueError:
+                raise MalformedDiagnostic("a key is not a valid JSON string") from None
+            self._key.clear()
+            self._state = _COLON
+            return stop + 1
+        return i
+
+    def _scan_value(self, chunk, i):
+        start, end = i, len(chunk)
+        finished = None  # Index just past the value once it ends in this chunk
+        while i < end:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, i)
+                if match is None:
+                    i = end
+                    break
+                i = match.start() + 1
+                if chunk[match.start()] == ord('\\'):
+                    self._escape = True
+                    continue
+                self._in_string = False
+                if self._depth == 0:
+                    finished = i
+                    break
+                continue
+
+            match = (_STRUCTURAL if self._depth == 0 else _NESTED).search(chunk, i)
+            if match is None:
+                i = end
+                break
+            pos = match.start()
+            byte = chunk[pos]
+            if byte == ord('"'):
+                self._in_string = True
+                i = pos + 1
+            elif byte in b'{[':
+                self._depth += 1
+                i = pos + 1
+            elif self._depth == 0:
+                finished = pos  # A ',' or '}' closing a number/true/false/null; left for _AFTER_VALUE
+                break
+            else:
+                self._depth -= 1
+                i = pos + 1
+                if self._depth == 0:
+                    finished = i
+                    break
+
+        stop = end if finished is None else finished
+        if self._pieces is not None:
+            self._kept += stop - start
+            if self._kept > self.max_section_bytes:
+                raise UploadTooLarge(f"section '{self._name}'", self._kept, self.max_section_bytes)
+            self._pieces.append(chunk[start:stop])
+        if finished is not None:
+            self._end_value()
+        return stop
+
+    def _end_value(self):
+        if self._pieces is not None:
+            raw = b''.join(self._pieces)
+            self.sections[self._name] = parse_sections({self._name: raw})[self._name] if self.parse else raw
+            self._pieces = None
+            if self.wanted <= self.sections.keys():
+                self.done = True
+        self._state = _AFTER_VALUE
+
+
+async def read_diagnostic(attachment, max_bytes=DIAGNOSTIC_MAX_BYTES, session=None, chunk_size=CHUNK_SIZE, parse=True):
+    """{section: value} for a diagnostic upload, downloaded in chunks
+
+    Rejected before downloading anything if Discord reports it as larger
+    than `max_bytes`. The download stops as soon as the wanted sections have
+    been read, and is cut off at `max_bytes` whatever the size claimed, so
+    at most one chunk plus the kept sections is ever held in memory. With
+    `parse=False` the values are the sections' raw JSON bytes.
+    """
+    if attachment.size > max_bytes:
+        raise UploadTooLarge('The file', attachment.size, max_bytes)
+
+    scanner = SectionScanner(parse=parse)
+    owned = session is None
+    if owned:
+        import aiohttp  # Here rather than at the top so analysis workers, which only parse, never load it
+        session = aiohttp.ClientSession()
+    try:
+        async with session.get(attachment.url) as response:
+            response.raise_for_status()
+            received = 0
+            async for chunk in response.content.iter_chunked(chunk_size):
+                received += len(chunk)
+                if received > max_bytes:
+                    raise UploadTooLarge('The file', received, max_bytes)
+                if scanner.feed(chunk):
+                    break
+    finally:
+        if owned:
+            await session.close()
+    return scanner.finish()
@@ -0,0 +1,121 @@
+"""
+FPSOS DM Intent Engine
+Matches a message against every intent phrase in one pass, recompiling when admins change the phrases
+"""
+
+import re
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace, the form phrases are stored in"""
+    return ' '.join(text.lower().split())
+
+
+def _trie_pattern(phrases):
+    """Regex source matching any of `phrases`, factored as a character trie
+
+    A flat `a|b|c...` alternation makes the regex engine try every phrase at
+    every position; sharing prefixes means each position costs one character
+    test per trie level, so adding intents barely slows matching down.
+    Longer phrases are preferred over their prefixes.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        terminal = '' in node
+        branches = [(char, child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        leaves = [char for char, child in branches if list(child) == ['']]
+        if len(leaves) == len(branches) and len(leaves) > 1:
+            body = '[' + ''.join(re.escape(char) for char in leaves) + ']'
+        else:
+            alternatives = [re.escape(char) + render(child) for char, child in branches]
+            body = alternatives[0] if len(alternatives) == 1 and not terminal else '(?:' + '|'.join(alternatives) + ')'
+        return body + '?' if terminal else body
+
+    return render(trie)
+
+
+class IntentMatcher:
+    """Immutable matcher compiled from intent phrase rows
+
+    'exact' phrases must equal the whole (normalized) message and are a dict
+    lookup. 'keyword' phrases may appear anywhere and are folded into one
+    trie-shaped regex, so a message is scanned once however many intents
+    exist. The regex sits in a lookahead, so it is tried at every position
+    and overlapping phrases are all seen. When several intents match, the
+    highest priority wins, then the earliest match.
+    """
+
+    def __init__(self, phrases):
+        self._exact = {}     # phrase -> (priority, intent)
+        self._keywords = {}  # phrase -> (priority, intent)
+        for row in phrases:
+            target = self._exact if row['match'] == 'exact' else self._keywords
+            candidate = (row['priority'], row['intent'])
+            current = target.get(row['phrase'])
+            if current is None or candidate[0] > current[0]:
+                target[row['phrase']] = candidate
+
+        # The trie reports the longest phrase starting at a position; the shorter
+        # phrases it begins with match there too, so each phrase maps to the best
+        # of them (longest first, which wins ties)
+        self._best = {}
+        for phrase in self._keywords:
+            prefixes = [phrase[:end] for end in range(len(phrase), 0, -1) if phrase[:end] in self._keywords]
+            self._best[phrase] = max((self._keywords[prefix] for prefix in prefixes), key=lambda candidate: candidate[0])
+
+        self._top_keyword_priority = max((p for p, _ in self._keywords.values()), default=None)
+        self._pattern = re.compile(f'(?=({_trie_pattern(self._keywords)}))') if self._keywords else None
+
+    @property
+    def intents(self):
+        return sorted({intent for _, intent in (*self._exact.values(), *self._keywords.values())})
+
+    def match(self, text):
+        """Message text -> intent name, or None"""
+        text = normalize(text)
+        best = self._exact.get(text)
+        if self._pattern is None or (best is not None and best[0] >= self._top_keyword_priority):
+            return best[1] if best else None
+
+        for found in self._pattern.finditer(text):
+            candidate = self._best[found.group(1)]
+            if best is None or candidate[0] > best[0]:
+                best = candidate
+                if best[0] >= self._top_keyword_priority:
+                    break
+        return best[1] if best else None
+
+
+class IntentEngine:
+    """Serves matches from a compiled IntentMatcher, recompiling lazily
+
+    `source` is the FPSOSDatabase: its phrases are already in memory, and
+    `intents_version` goes up whenever an admin adds or removes one, so the
+    next message after a change triggers a single recompile.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.version = None
+        self.matcher = None
+        self.compiles = 0
+
+    def _current(self):
+        version = self.source.intents_version
+        if version != self.version:
+            self.matcher = IntentMatcher(self.source.get_intent_phrases())
+            self.version = version
+            self.compiles += 1
+        return self.matcher
+
+    def classify(self, text):
+        """Message text -> intent name, or None"""
+        return self._current().match(text)
@@ -0,0 +1,121 @@
+"""
+FPSOS Join Pipeline
+Absorbs join bursts: batched user upserts and welcome DMs sent at a steady pace
+"""
+
+import asyncio
+from collections import deque
+
+
+class JoinPipeline:
+    """Decouples on_member_join from the database and from DM sending
+
+    `submit(member)` returns immediately. Joins are upserted with
+    `upsert_users([(id, name), ...])` in one transaction per batch (up to
+    `batch_size` members, or whatever arrived within `flush_interval`
+    seconds), and `send_welcome(member)` is called for each new member at no
+    more than `welcomes_per_second`. Welcomes wait in a bounded backlog;
+    during a raid the oldest are dropped first, since a welcome that
+    arrives many minutes late is worth less than a prompt one.
+    """
+
+    def __init__(self, upsert_users, send_welcome, batch_size=200, flush_interval=1.0,
+                 welcomes_per_second=2.0, max_welcome_backlog=500):
+        self.upsert_users = upsert_users
+        self.send_welcome = send_welcome
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.welcomes_per_second = welcomes_per_second
+        self._pending = {}  # member id -> (id, name), deduplicated until flushed
+        self._welcomes = deque(maxlen=max_welcome_backlog)
+        self._batch_ready = asyncio.Event()
+        self._upsert_task = None
+        self._welcome_task = None
+        self._fallback_channels = {}  # guild id -> channel id
+        self.upserted = 0
+        self.welcomed = 0
+        self.welcome_dropped = 0
+        self.welcome_failed = 0
+
+    def submit(self, member):
+        """Queue a newly joined member for upsert and welcome"""
+        self._pending[member.id] = (member.id, member.name)
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+        if len(self._welcomes) == self._welcomes.maxlen:
+            self.welcome_dropped += 1
+        self._welcomes.append(member)
+
+        if self._upsert_task is None or self._upsert_task.done():
+            self._upsert_task = asyncio.create_task(self._upsert_loop())
+        if self._welcome_task is None or self._welcome_task.done():
+            self._welcome_task = asyncio.create_task(self._welcome_loop())
+
+    async def flush(self):
+        """Upsert everything pending now; returns members written"""
+        written = 0
+        while self._pending:
+            ids = list(self._pending)[:self.batch_size]
+            batch = [self._pending[member_id] for member_id in ids]
+            written += await self.upsert_users(batch)
+            for member_id in ids:
+                # A re-join during the write re-queued the member with fresh data; keep that
+                if self._pending.get(member_id) in batch:
+                    del self._pending[member_id]
+        self.upserted += written
+        return written
+
+    async def _upsert_loop(self):
+        while self._pending:
+            if len(self._pending) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Join upsert error ({len(self._pending)} pending, will retry): {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def _welcome_loop(self):
+        while self._welcomes:
+            member = self._welcomes.popleft()
+            try:
+                await self.send_welcome(member)
+                self.welcomed += 1
+            except Exception as e:
+                self.welcome_failed += 1
+                print(f"Welcome DM error for {member}: {e}")
+            await asyncio.sleep(1 / self.welcomes_per_second)
+
+    def fallback_channel(self, guild, name='general'):
+        """The guild's channel for welcomes when DMs are closed, found by name once and cached by id"""
+        channel = guild.get_channel(self._fallback_channels.get(guild.id, 0))
+        if channel is None:
+            channel = next((c for c in guild.text_channels if c.name == name), None)
+            if channel is not None:
+                self._fallback_channels[guild.id] = channel.id
+        return channel
+
+    async def close(self):
+        """Write pending upserts (shutdown); queued welcomes are abandoned"""
+        for task in (self._welcome_task, self._upsert_task):
+            if task is not None:
+                task.cancel()
+        self._welcomes.clear()
+        await self.flush()
+
+    @property
+    def backlog(self):
+        return {'upserts': len(self._pending), 'welcomes': len(self._welcomes)}
+
+    def stats(self):
+        return {
+            'backlog': self.backlog,
+            'upserted': self.upserted,
+            'welcomed': self.welcomed,
+            'welcome_dropped': self.welcome_dropped,
+            'welcome_failed': self.welcome_failed,
+        }
@@ -0,0 +1,191 @@
+"""
+FPSOS Rate Limiting
+Per-user token buckets for the expensive bot paths (the bot-side twin of lib/rate-limit.ts)
+"""
+
+import functools
+import math
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from utils.config import TRUSTED_PROXIES
+
+RateLimit = namedtuple('RateLimit', 'limit window_seconds')
+Decision = namedtuple('Decision', 'allowed retry_after notify')
+
+# Default configs per action: `limit` calls per `window_seconds`, refilled smoothly
+RATE_LIMITS = {
+    'diagnostic_upload': RateLimit(3, 60),    # .json uploads parsed and saved
+    'dm': RateLimit(10, 30),                  # DMs relayed to tickets / answered
+    'ticket_open': RateLimit(2, 300),         # Ticket channels created
+    'control_plane': RateLimit(30, 60),       # Website -> bot API calls, per IP
+}
+
+
+class RateLimiter:
+    """Token buckets keyed by (action, key) in one LRU-ordered dict
+
+    A bucket holds `limit` tokens and refills at limit / window_seconds per
+    second; a call spends one token or is rejected with the time until one is
+    available. A bucket that has been idle long enough to refill completely
+    is indistinguishable from a new one, so it is dropped: every call sweeps
+    such buckets off the cold end of the dict. `max_keys` caps memory even
+    under a flood of distinct keys by evicting the least recently used
+    bucket, which at worst hands that key a fresh burst.
+
+    Not thread-safe; used from the event loop.
+    """
+
+    def __init__(self, limits=None, max_keys=10000, clock=time.monotonic):
+        self.limits = dict(RATE_LIMITS if limits is None else limits)
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # (action, key) -> (tokens, updated_at, warned)
+        self.allowed = Counter()   # action -> calls let through
+        self.rejected = Counter()  # action -> calls refused
+        self.evicted = 0           # buckets dropped by the max_keys cap
+
+    def hit(self, action, key, cost=1):
+        """Spend `cost` tokens from (action, key)'s bucket
+
+        Returns Decision(allowed, retry_after seconds, notify); `notify` is
+        True only for the first rejection after an allowed call, so callers
+        can tell the user once instead of on every refused message.
+        """
+        limit, window = self.limits[action]
+        rate = limit / window
+        now = self.clock()
+        self._sweep(now)
+
+        bucket_key = (action, key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            tokens, warned = float(limit), False
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evicted += 1
+        else:
+            tokens, updated_at, warned = bucket
+            tokens = min(limit, tokens + (now - updated_at) * rate)
+            self._buckets.move_to_end(bucket_key)
+
+        if tokens >= cost:
+            self._buckets[bucket_key] = (tokens - cost, now, False)
+            self.allowed[action] += 1
+            return Decision(True, 0.0, False)
+
+        self._buckets[bucket_key] = (tokens, now, True)
+        self.rejected[action] += 1
+        return Decision(False, (cost - tokens) / rate, not warned)
+
+    def _sweep(self, now, max_checks=8):
+        """Drop fully refilled buckets from the least recently used end"""
+        for _ in range(max_checks):
+            if not self._buckets:
+                return
+            (action, _), (tokens, updated_at, _) = next(iter(self._buckets.items()))
+            limit, window = self.limits[action]
+            if tokens + (now - updated_at) * limit / window < limit:
+                return
+            self._buckets.popitem(last=False)
+
+    def reset(self, action, key):
+        """Forget a key's bucket (e.g. after an admin clears a false positive)"""
+        self._buckets.pop((action, key), None)
+
+    def stats(self):
+        """Counters for /api/status"""
+        return {
+            'tracked_keys': len(self._buckets),
+            'evicted': self.evicted,
+            'allowed': dict(self.allowed),
+            'rejected': dict(self.rejected),
+        }
+
+
+limiter = RateLimiter()
+
+
+# ========== DECORATORS ==========
+
+def limit_message(action, key=lambda message: message.author.id, rate_limiter=None):
+    """Router handler decorator: refused messages count as handled, so the chain stops
+
+    The author is told to slow down once per burst, not once per message.
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(message):
+            decision = (rate_limiter or limiter).hit(action, key(message))
+            if decision.allowed:
+                return await handler(message)
+            if decision.notify:
+                await message.reply(f"⏳ Slow down! Try again in {math.ceil(decision.retry_after)}s.")
+            return True
+        return wrapper
+    return decorate
+
+
+def limit_interaction(action, rate_limiter=None):
+    """Button / slash command callback decorator, keyed by the clicking user
+
+    Interactions must always be answered, so a refused one gets an
+    ephemeral notice instead of silence.
+    """
+    def decorate(callback):
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            interaction = next(arg for arg in args if hasattr(arg, 'response') and hasattr(arg, 'user'))
+            decision = (rate_limiter or limiter).hit(action, interaction.user.id)
+            if decision.allowed:
+                return await callback(*args, **kwargs)
+            await interaction.response.send_message(
+                f"⏳ Slow down! Try again in {math.ceil(decision.retry_after)}s.", ephemeral=True
+            )
+        return wrapper
+    return decorate
+
+
+def client_ip(request, trusted_proxies=TRUSTED_PROXIES):
+    """Caller's IP: the peer address, or what a trusted proxy forwarded when the peer is one
+
+    Forwarding headers are only believed from TRUSTED_PROXIES, since anyone
+    reaching the port directly could otherwise pick a fresh key per request.
+    X-Forwarded-For is read right to left, skipping the trusted hops.
+    """
+    peer = request.remote or 'unknown'
+    if peer not in trusted_proxies:
+        return peer
+    forwarded_for = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+    for ip in reversed(forwarded_for):
+        if ip not in trusted_proxies:
+            return ip
+    return request.headers.get('X-Real-IP', '').strip() or peer
+
+
+def limit_request(action, rate_limiter=None):
+    """aiohttp handler decorator: 429 with the same body and headers as the website's limiter"""
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            decision = (rate_limiter or limiter).hit(action, client_ip(request))
+            if decision.allowed:
+                return await handler(request)
+
+            from aiohttp import web
+            retry_after = max(1, math.ceil(decision.retry_after))
+            return web.json_response(
+                {
+                    'error': 'Too many requests',
+                    'message': f'Rate limit exceeded. Try again in {retry_after} seconds.',
+                    'retryAfter': retry_after,
+                },
+                status=429,
+                headers={
+                    'Retry-After': str(retry_after),
+                    'X-RateLimit-Limit': str((rate_limiter or limiter).limits[action].limit),
+                    'X-RateLimit-Remaining': '0',
+                },
+            )
+        return wrapper
+    return decorate
@@ -0,0 +1,188 @@
+"""
+FPSOS Recommendation Rules
+Package recommendations from recommendation_rules.json, compiled once at load, with a NumPy path for bulk re-scoring
+"""
+
+import json
+from pathlib import Path
+from string import Formatter
+
+from utils.config import Colors
+
+try:
+    import numpy as np
+except ImportError:  # Only `manage.py rescore-diagnostics` needs it
+    np = None
+
+RULES_PATH = Path(__file__).resolve().parent.parent / 'recommendation_rules.json'
+
+# Numeric diagnostics columns a rule may test; a missing value (None / NULL / NaN) never satisfies a bound
+DIAGNOSTIC_FEATURES = ('critical_count', 'warning_count', 'current_fps', 'target_fps', 'latency_ms', 'ram_gb')
+# 0/1 answers from the system profile form; never set on a stored diagnostic
+PROFILE_FEATURES = ('stutters', 'stale_install')
+FEATURES = DIAGNOSTIC_FEATURES + PROFILE_FEATURES
+RULE_KEYS = {'when', 'recommendation', 'package_name', 'price', 'reason', 'color'}
+BOUND_KEYS = {'min', 'max'}
+
+
+class RuleError(ValueError):
+    """recommendation_rules.json is malformed"""
+
+
+class RuleSet:
+    """One version of the recommendation rules, compiled to a Python function (kept in `source`)
+
+    Rules are tried in order and the first match wins; the last rule has no
+    `when` and catches everything else. A rule's `when` is a list of
+    alternatives, each a set of {feature: {min, max}} bounds that must all
+    hold. evaluate() scores a single diagnostic through the compiled
+    function; evaluate_many() applies the same rules to whole NumPy columns.
+    """
+
+    def __init__(self, spec):
+        version = spec.get('version')
+        if not isinstance(version, int) or version < 1:
+            raise RuleError("rules need an integer version >= 1")
+        self.version = version
+        self.score = self._check_score(spec.get('score', {}))
+        self.rules = spec.get('rules')
+        if not isinstance(self.rules, list) or not self.rules:
+            raise RuleError("rules must be a non-empty list")
+
+        self.codes = []
+        lines = ['def match(f):']
+        lines += [f'    {name} = f.get({name!r})' for name in FEATURES]
+        for index, rule in enumerate(self.rules):
+            where = f"rules[{index}]"
+            self._check_rule(where, rule, last=index == len(self.rules) - 1)
+            self.codes.append(rule['recommendation'])
+            if 'when' not in rule:
+                lines.append(f'    return {index}')
+                break
+            test = ' or '.join(f'({self._group_source(where, group)})' for group in rule['when'])
+            lines.append(f'    if {test}:')
+            lines.append(f'        return {index}')
+        if len(set(self.codes)) != len(self.codes):
+            raise RuleError("each rule needs its own recommendation")
+
+        # Diagnostics columns the rules test, so a bulk re-score loads only those
+        tested = {feature for rule in self.rules[:-1] for group in rule['when'] for feature in group}
+        self.features = tuple(feature for feature in DIAGNOSTIC_FEATURES if feature in tested)
+
+        self.source = '\n'.join(lines) + '\n'
+        namespace = {}
+        exec(compile(self.source, f'<recommendation rules v{version}>', 'exec'), namespace)
+        self._match = namespace['match']
+
+    # ========== LOADING ==========
+
+    @staticmethod
+    def _check_score(score):
+        minus = score.get('minus', {})
+        if not isinstance(minus, dict) or not set(minus) <= set(FEATURES):
+            raise RuleError(f"score.minus: weights must be keyed by {FEATURES}")
+        return {'start': score.get('start', 100), 'minus': minus, 'min': score.get('min', 0)}
+
+    @staticmethod
+    def _check_rule(where, rule, last):
+        unknown = set(rule) - RULE_KEYS
+        if unknown:
+            raise RuleError(f"{where}: unknown keys {sorted(unknown)}")
+        missing = (RULE_KEYS - {'when'}) - set(rule)
+        if missing:
+            raise RuleError(f"{where}: missing {sorted(missing)}")
+        if last and 'when' in rule:
+            raise RuleError(f"{where}: the last rule catches everything else and takes no `when`")
+        if not last and 'when' not in rule:
+            raise RuleError(f"{where}: only the last rule may omit `when`")
+        if not last and (not isinstance(rule['when'], list) or not rule['when']):
+            raise RuleError(f"{where}.when: expected a non-empty list of alternatives")
+        if not isinstance(getattr(Colors, rule['color'], None), int) and not str(rule['color']).startswith('#'):
+            raise RuleError(f"{where}.color: expected a Colors name or #RRGGBB, got {rule['color']!r}")
+        names = {name for _, name, _, _ in Formatter().parse(rule['reason']) if name is not None}
+        if not names <= set(FEATURES):
+            raise RuleError(f"{where}.reason: placeholders must be features, got {sorted(names - set(FEATURES))}")
+
+    @staticmethod
+    def _group_source(where, group):
+        if not isinstance(group, dict) or not group:
+            raise RuleError(f"{where}.when: each alternative must be a non-empty object of bounds")
+        tests = []
+        for feature, bounds in group.items():
+            if feature not in FEATURES:
+                raise RuleError(f"{where}.when: unknown feature {feature!r}, expected one of {FEATURES}")
+            if not isinstance(bounds, dict) or not bounds or not set(bounds) <= BOUND_KEYS:
+                raise RuleError(f"{where}.when.{feature}: expected {{min, max}}, got {bounds!r}")
+            tests.append(f'{feature} is not None')
+            if 'min' in bounds:
+                tests.append(f"{feature} >= {float(bounds['min'])!r}")
+            if 'max' in bounds:
+                tests.append(f"{feature} <= {float(bounds['max'])!r}")
+        return ' and '.join(tests)
+
+    # ========== EVALUATION ==========
+
+    def color(self, rule):
+        color = rule['color']
+        return int(color[1:], 16) if color.startswith('#') else getattr(Colors, color)
+
+    def health_score(self, features):
+        score = self.score['start'] - sum(weight * (features.get(name) or 0) for name, weight in self.score['minus'].items())
+        return max(self.score['min'], score)
+
+    def evaluate(self, **features):
+        """The recommendation for one diagnostic's features (counts, fps...), as a dict for embeds and storage"""
+        rule = self.rules[self._match(features)]
+        return {
+            'recommendation': rule['recommendation'],
+            'package_name': rule['package_name'],
+            'price': rule['price'],
+            'reason': rule['reason'].format_map({name: features.get(name) for name in FEATURES}),
+            'color': self.color(rule),
+            'score': self.health_score(features),
+            'rules_version': self.version,
+        }
+
+    def evaluate_many(self, columns, size):
+        """Index into `codes` of the matching rule for each of `size` rows ({feature: 1-D array}, NaN = missing)
+
+        One vectorized pass per rule alternative, then np.select takes the
+        first match per row, as evaluate() does. A feature with no column
+        (the profile features) is missing on every row.
+        """
+        if np is None:
+            raise RuntimeError("Bulk re-scoring needs NumPy: pip install numpy")
+        matches = []
+        for rule in self.rules[:-1]:
+            matched = np.zeros(size, dtype=bool)
+            for group in rule['when']:
+                holds = np.ones(size, dtype=bool)
+                for feature, bounds in group.items():
+                    values = columns.get(feature)
+                    if values is None:
+                        holds[:] = False
+                        break
+                    if 'min' in bounds:
+                        holds &= values >= bounds['min']
+                    if 'max' in bounds:
+                        holds &= values <= bounds['max']
+                matched |= holds
+            matches.append(matched)
+        if not matches:
+            return np.zeros(size, dtype=int)
+        return np.select(matches, range(len(matches)), default=len(self.rules) - 1)
+
+
+def load_rules(path=RULES_PATH):
+    with open(path, encoding='utf-8') as f:
+        return RuleSet(json.load(f))
+
+
+# Compiled at import: malformed rules stop the bot at startup
+rules = load_rules()
+RULES_VERSION = rules.version
+
+
+def recommend(**features):
+    """Evaluate the current rules; see RuleSet.evaluate"""
+    return rules.evaluate(**features)
@@ -0,0 +1,168 @@
+"""
+FPSOS Modmail Relay
+Coalesces bursts of relayed modmail messages into as few Discord API calls as possible
+"""
+
+import asyncio
+from collections import namedtuple
+
+# Discord limits for one outgoing message
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBEDS_PER_MESSAGE = 10
+EMBED_TOTAL_CHARACTERS = 6000  # Summed over every embed in the message
+
+RelayItem = namedtuple('RelayItem', 'author icon_url text image_url source')
+
+
+class Block:
+    """One embed's worth of consecutive messages from the same author"""
+
+    __slots__ = ('author', 'icon_url', 'text', 'image_url')
+
+    def __init__(self, author, icon_url, text, image_url):
+        self.author = author
+        self.icon_url = icon_url
+        self.text = text
+        self.image_url = image_url
+
+
+def pack(items):
+    """[RelayItem] -> outgoing messages, each a list of Blocks, order preserved
+
+    Consecutive messages from one author share an embed (joined by newlines)
+    until the description limit; an embed carries at most one image, so a
+    second attachment starts a new one. Embeds are grouped up to 10 per
+    message and 6,000 characters in total.
+    """
+    messages, blocks, total, current = [], [], 0, None
+    for item in items:
+        text = (item.text or '')[:EMBED_DESCRIPTION_LIMIT]
+        if (
+            current is not None
+            and current.author == item.author
+            and not (item.image_url and current.image_url)
+            and len(current.text) + 1 + len(text) <= EMBED_DESCRIPTION_LIMIT
+            and total + 1 + len(text) <= EMBED_TOTAL_CHARACTERS
+        ):
+            current.text = f'{current.text}\n{text}' if current.text else text
+            current.image_url = current.image_url or item.image_url
+            total += 1 + len(text)
+            continue
+
+        size = len(item.author) + len(text)
+        if blocks and (len(blocks) == EMBEDS_PER_MESSAGE or total + size > EMBED_TOTAL_CHARACTERS):
+            messages.append(blocks)
+            blocks, total = [], 0
+        current = Block(item.author, item.icon_url, text, item.image_url)
+        blocks.append(current)
+        total += size
+    if blocks:
+        messages.append(blocks)
+    return messages
+
+
+class _Lane:
+    __slots__ = ('items', 'wake', 'task')
+
+    def __init__(self):
+        self.items = []
+        self.wake = asyncio.Event()
+        self.task = None
+
+
+class MessageRelay:
+    """Per-destination queues that batch messages arriving within `window` seconds
+
+    The first message to a destination opens a window; everything that
+    arrives for it before the window closes goes out together, packed into
+    as few messages as Discord's limits allow, followed by one `ack` on the
+    last source message instead of one per message. A destination's batches
+    are sent strictly in order, and messages arriving mid-send wait for the
+    next batch.
+
+    `send(destination, blocks)` posts one message, `ack(item)` acknowledges
+    a delivered batch, and `on_error(destination, items, error)` is told
+    when a send fails (the rest of that batch is dropped, not retried).
+    """
+
+    def __init__(self, send, ack=None, on_error=None, window=1.5):
+        self.send = send
+        self.ack = ack
+        self.on_error = on_error
+        self.window = window
+        self._lanes = {}  # destination -> _Lane
+        self.closing = False
+        self.received = 0  # Messages submitted
+        self.sent = 0      # Messages posted after packing
+        self.batches = 0
+
+    @property
+    def pending(self):
+        return sum(len(lane.items) for lane in self._lanes.values())
+
+    def submit(self, destination, item):
+        """Queue a RelayItem for `destination` (a channel or user); returns immediately"""
+        self.received += 1
+        lane = self._lanes.get(destination)
+        if lane is None:
+            lane = self._lanes[destination] = _Lane()
+            lane.task = asyncio.create_task(self._run(destination, lane))
+        lane.items.append(item)
+        if self.closing:
+            lane.wake.set()
+
+    async def _run(self, destination, lane):
+        try:
+            while lane.items:
+                if not lane.wake.is_set():
+                    try:
+                        await asyncio.wait_for(lane.wake.wait(), self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                if not self.closing:
+                    lane.wake.clear()
+                items, lane.items = lane.items, []
+                await self._deliver(destination, items)
+        finally:
+            self._lanes.pop(destination, None)
+
+    async def _deliver(self, destination, items):
+        self.batches += 1
+        try:
+            for blocks in pack(items):
+                await self.send(destination, blocks)
+                self.sent += 1
+        except Exception as e:
+            if self.on_error:
+                await self.on_error(destination, items, e)
+            else:
+                print(f"Relay error for {destination}: {e}")
+            return
+        if self.ack:
+            try:
+                await self.ack(items[-1])
+            except Exception:
+                pass  # The source message may be gone; the delivery still happened
+
+    async def flush(self, destination):
+        """Send `destination`'s queued messages now and wait until they are out"""
+        lane = self._lanes.get(destination)
+        if lane:
+            lane.wake.set()
+            await asyncio.shield(lane.task)
+
+    async def drain(self):
+        """Flush every queue, and send anything submitted afterwards straight away (shutdown)"""
+        self.closing = True
+        lanes = list(self._lanes.values())
+        for lane in lanes:
+            lane.wake.set()
+        await asyncio.gather(*(lane.task for lane in lanes), return_exceptions=True)
+
+    def stats(self):
+        return {
+            'received': self.received,
+            'sent': self.sent,
+            'batches': self.batches,
+            'pending': self.pending,
+        }
@@ -0,0 +1,89 @@
+"""
+FPSOS Message Router
+Classifies each incoming message once and dispatches it to the handlers registered for it
+"""
+
+# Message traits; a message's flags select a precompiled handler chain
+TAG = 1        # Starts with the tag prefix (?bios)
+COMMAND = 2    # Starts with the command prefix (!fpsos)
+TICKET = 4     # Sent in a ticket channel
+DM = 8         # Sent in a direct message
+UPLOAD = 16    # DM carrying a .json attachment (diagnostic upload)
+
+ROUTES = {'tag': TAG, 'command': COMMAND, 'ticket': TICKET, 'dm': DM, 'upload': UPLOAD}
+
+
+class MessageRouter:
+    """Table-driven replacement for a hand-written on_message if-chain
+
+    Handlers are registered for a route and tried in registration order;
+    a handler returns True when it dealt with the message, which stops the
+    chain, or False to let the next one try. `compile()` precomputes the
+    chain for every combination of flags, so dispatching is one attribute
+    scan plus one list lookup, and plain guild chatter (no prefix, not a
+    ticket channel) returns before any handler, string copy or DB call.
+    """
+
+    def __init__(self, command_prefix='!', tag_prefix='?', is_ticket_channel=None):
+        self.command_prefix = command_prefix
+        self.tag_prefix = tag_prefix
+        self.is_ticket_channel = is_ticket_channel or (lambda channel: getattr(channel, 'name', '').startswith('ticket-'))
+        self._handlers = []  # [(route flag, handler)] in registration order
+        self._table = None
+        self.dispatched = 0
+        self.skipped = 0
+
+    def route(self, name):
+        """Decorator: register `async def handler(message) -> bool` for a route"""
+        flag = ROUTES[name]
+
+        def register(handler):
+            self._handlers.append((flag, handler))
+            self._table = None
+            return handler
+        return register
+
+    def compile(self):
+        """Build the handler chain for every flag combination"""
+        self._table = [
+            tuple(handler for flag, handler in self._handlers if flags & flag)
+            for flags in range(2 * max(ROUTES.values()))
+        ]
+        return self._table
+
+    def classify(self, message):
+        """Message -> route flags (0 means nothing to do)"""
+        content = message.content
+        if content[:1].isspace():
+            content = content.lstrip()
+        flags = 0
+        if content.startswith(self.tag_prefix):
+            flags |= TAG
+        elif content.startswith(self.command_prefix):
+            flags |= COMMAND
+
+        if message.guild is not None:
+            if self.is_ticket_channel(message.channel):
+                flags |= TICKET
+            return flags
+
+        flags |= DM
+        for attachment in message.attachments:
+            if attachment.filename.endswith('.json'):
+                flags |= UPLOAD
+                break
+        return flags
+
+    async def dispatch(self, message):
+        """Run the handler chain for a message; returns True if a handler took it"""
+        flags = self.classify(message)
+        if not flags:
+            self.skipped += 1
+            return False
+
+        table = self._table or self.compile()
+        self.dispatched += 1
+        for handler in table[flags]:
+            if await handler(message):
+                return True
+        return False
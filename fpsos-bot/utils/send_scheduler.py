@@ -0,0 +1,271 @@
+"""
+FPSOS Outbound Send Scheduler
+One prioritized queue in front of every bot-initiated Discord send, paced per rate-limit route
+"""
+
+import asyncio
+import statistics
+import time
+from collections import OrderedDict, deque
+
+from utils.rate_limit import RateLimit
+
+# Priority classes, most urgent first
+INTERACTION, MODMAIL, CONFIRMATION, BROADCAST = range(4)
+PRIORITY_NAMES = ('interaction', 'modmail', 'confirmation', 'broadcast')
+
+# Queued sends allowed per class before callers wait (or get QueueFull)
+QUEUE_LIMITS = (100, 500, 200, 1000)
+
+# Discord's per-route budgets, by route kind ('channel:123' -> 'channel'); a 429 overrides them
+ROUTE_LIMITS = {
+    'channel': RateLimit(5, 5.0),      # Messages per channel
+    'dm': RateLimit(5, 5.0),           # Messages per DM channel
+    'reaction': RateLimit(1, 0.25),    # Reactions per channel
+    'interaction': RateLimit(5, 2.0),  # Follow-ups per interaction webhook
+}
+DEFAULT_ROUTE_LIMIT = RateLimit(5, 5.0)
+GLOBAL_LIMIT = RateLimit(50, 1.0)      # Requests per second across the bot
+
+
+class QueueFull(Exception):
+    """Raised by send(block=False) when the priority class has no room"""
+
+
+def route_key(kind, target):
+    """Route for a send: a ROUTE_LIMITS kind plus the channel/user/interaction (or id) it is keyed on"""
+    return f'{kind}:{getattr(target, "id", target)}'
+
+
+class _Job:
+    __slots__ = ('priority', 'route', 'call', 'future', 'enqueued_at', 'attempts')
+
+    def __init__(self, priority, route, call, future, enqueued_at):
+        self.priority = priority
+        self.route = route
+        self.call = call
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+
+
+class _Route:
+    __slots__ = ('tokens', 'updated_at', 'blocked_until', 'busy')
+
+    def __init__(self, tokens, now):
+        self.tokens = tokens
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.busy = False
+
+
+class SendScheduler:
+    """Dispatches queued sends by priority, never faster than a route allows
+
+    Every send names a priority class and a route (the Discord rate-limit
+    bucket it lands in, e.g. `channel:<id>`). The dispatcher always starts
+    the most urgent job whose route is ready, so a broadcast backlog cannot
+    delay interaction follow-ups, and a route that is out of budget or
+    cooling down after a 429 only holds back its own jobs. One job per route
+    is in flight at a time, which keeps each destination's messages in
+    order. A job that hits a 429 goes back to the head of its queue until
+    the route's retry_after has passed.
+
+    Interaction *responses* (interaction.response.*) must not be queued:
+    they have a 3 second deadline and do not count against these buckets.
+    """
+
+    def __init__(self, queue_limits=QUEUE_LIMITS, route_limits=None, global_limit=GLOBAL_LIMIT,
+                 max_in_flight=8, max_retries=3, max_routes=5000, clock=time.monotonic):
+        self.queue_limits = queue_limits
+        self.route_limits = dict(ROUTE_LIMITS if route_limits is None else route_limits)
+        self.global_limit = global_limit
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.max_routes = max_routes
+        self.clock = clock
+
+        self._queues = [deque() for _ in queue_limits]
+        self._room = [asyncio.Semaphore(limit) for limit in queue_limits]
+        self._routes = OrderedDict()  # route -> _Route, least recently used first
+        self._global_tokens = float(global_limit.limit)
+        self._global_updated = clock()
+        self._in_flight = 0
+        self._jobs = set()  # Running _run tasks; the loop only holds tasks weakly
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._dispatcher = None
+
+        self.sent = [0] * len(queue_limits)
+        self.failed = [0] * len(queue_limits)
+        self.rejected = [0] * len(queue_limits)
+        self.rate_limited = 0  # 429s seen
+        self._waits = [deque(maxlen=1000) for _ in queue_limits]  # Recent queue waits, seconds
+
+    # ========== PUBLIC API ==========
+
+    async def send(self, priority, route, call, block=True):
+        """Run `call()` (a coroutine function) when its turn comes and return its result
+
+        Exceptions from the call propagate to the caller. If the class queue
+        is full, waits for room, or raises QueueFull when `block` is False.
+        """
+        room = self._room[priority]
+        if room.locked() and not block:
+            self.rejected[priority] += 1
+            raise QueueFull(PRIORITY_NAMES[priority])
+        await room.acquire()
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(_Job(priority, route, call, future, self.clock()))
+        self._idle.clear()
+        self._wakeup.set()
+        return await future
+
+    @property
+    def depth(self):
+        return sum(len(queue) for queue in self._queues)
+
+    async def drain(self):
+        """Wait until every queued and in-flight send has finished (shutdown)"""
+        await self._idle.wait()
+        if self._jobs:
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+
+    def stats(self):
+        """Queue depth, throughput and wait times per class, for /api/status"""
+        classes = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            waits = sorted(self._waits[priority])
+            classes[name] = {
+                'depth': len(self._queues[priority]),
+                'sent': self.sent[priority],
+                'failed': self.failed[priority],
+                'rejected': self.rejected[priority],
+                'wait_ms_p50': round(statistics.median(waits) * 1000, 1) if waits else 0.0,
+                'wait_ms_p99': round(waits[int(len(waits) * 0.99) - 1] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            'classes': classes,
+            'in_flight': self._in_flight,
+            'rate_limited': self.rate_limited,
+            'routes': len(self._routes),
+        }
+
+    # ========== DISPATCH ==========
+
+    def _limit(self, route):
+        return self.route_limits.get(route.split(':', 1)[0], DEFAULT_ROUTE_LIMIT)
+
+    def _route(self, route, now):
+        """Route state with tokens refilled to `now`"""
+        state = self._routes.get(route)
+        limit, window = self._limit(route)
+        if state is None:
+            state = self._routes[route] = _Route(float(limit), now)
+            self._evict_routes(now)
+        else:
+            state.tokens = min(limit, state.tokens + (now - state.updated_at) * limit / window)
+            state.updated_at = now
+        return state
+
+    def _evict_routes(self, now):
+        """Forget idle routes whose budget has fully refilled"""
+        while len(self._routes) > self.max_routes:
+            route, state = next(iter(self._routes.items()))
+            limit, window = self._limit(route)
+            refilled = state.tokens + (now - state.updated_at) * limit / window >= limit
+            if state.busy or not refilled or state.blocked_until > now:
+                return
+            del self._routes[route]
+
+    def _next_job(self):
+        """(job to start, None) or (None, seconds until something could be ready)"""
+        if self._in_flight >= self.max_in_flight:
+            return None, None  # A finishing job will wake the dispatcher
+
+        now = self.clock()
+        limit, window = self.global_limit
+        self._global_tokens = min(limit, self._global_tokens + (now - self._global_updated) * limit / window)
+        self._global_updated = now
+        if self._global_tokens < 1:
+            return None, (1 - self._global_tokens) * window / limit
+
+        soonest = None
+        for priority, queue in enumerate(self._queues):
+            cancelled = [job for job in queue if job.future.cancelled()]
+            for job in cancelled:
+                queue.remove(job)
+                if job.attempts == 0:
+                    self._room[priority].release()
+            for index, job in enumerate(queue):
+                state = self._route(job.route, now)
+                if state.busy:
+                    continue
+                route_limit, route_window = self._limit(job.route)
+                ready_at = max(state.blocked_until, now + (1 - state.tokens) * route_window / route_limit)
+                if ready_at > now:
+                    soonest = ready_at if soonest is None else min(soonest, ready_at)
+                    continue
+                del queue[index]
+                state.tokens -= 1
+                state.busy = True
+                self._routes.move_to_end(job.route)
+                self._global_tokens -= 1
+                return job, None
+        return None, (soonest - now) if soonest is not None else None
+
+    async def _dispatch(self):
+        while True:
+            job, delay = self._next_job()
+            if job is None:
+                if not self.depth and not self._in_flight:
+                    self._idle.set()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if job.attempts == 0:
+                self._room[job.priority].release()
+                self._waits[job.priority].append(self.clock() - job.enqueued_at)
+            self._in_flight += 1
+            task = asyncio.create_task(self._run(job))
+            self._jobs.add(task)
+            task.add_done_callback(self._jobs.discard)
+
+    async def _run(self, job):
+        state = self._routes.get(job.route)
+        try:
+            result = await job.call()
+        except Exception as e:
+            retry_after = getattr(e, 'retry_after', None)
+            if getattr(e, 'status', None) == 429 or retry_after is not None:
+                self.rate_limited += 1
+                if state is not None:
+                    state.blocked_until = self.clock() + (retry_after or 1.0)
+                    state.tokens = 0.0
+                if job.attempts < self.max_retries:
+                    job.attempts += 1
+                    self._queues[job.priority].appendleft(job)
+                    return
+            self.failed[job.priority] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.sent[job.priority] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            if state is not None:
+                state.busy = False
+            self._in_flight -= 1
+            self._wakeup.set()
+
+
+scheduler = SendScheduler()
@@ -0,0 +1,218 @@
+"""
+FPSOS Sharding
+Shard plans for the cluster launcher, per-shard gateway metrics, and lease-elected singleton tasks
+"""
+
+import asyncio
+import time
+
+
+def shard_for_guild(guild_id, shard_count):
+    """The shard Discord delivers a guild's events on"""
+    return (int(guild_id) >> 22) % shard_count
+
+
+def parse_shard_ids(text):
+    """'0-3,8' -> [0, 1, 2, 3, 8]; empty or None -> None (every shard)"""
+    if not text:
+        return None
+    shard_ids = set()
+    for part in text.split(','):
+        first, _, last = part.strip().partition('-')
+        shard_ids.update(range(int(first), int(last or first) + 1))
+    return sorted(shard_ids)
+
+
+def format_shard_ids(shard_ids):
+    """[0, 1, 2, 3, 8] -> '0-3,8', the inverse of parse_shard_ids"""
+    ranges = []
+    for shard_id in sorted(shard_ids):
+        if ranges and ranges[-1][1] == shard_id - 1:
+            ranges[-1][1] = shard_id
+        else:
+            ranges.append([shard_id, shard_id])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges)
+
+
+def plan_clusters(shard_count, clusters, pinned=()):
+    """Split shards 0..shard_count-1 into `clusters` lists of shard ids
+
+    Shards in `pinned` all go to cluster 0 and the rest are dealt out in
+    contiguous ranges so every cluster ends up with a near-equal count.
+    Pin shard 0 (DMs) and the home guild's shard: modmail relays DMs into
+    home guild ticket channels through caches that live in one process.
+    """
+    clusters = max(1, min(clusters, shard_count))
+    pinned = sorted({shard_id for shard_id in pinned if 0 <= shard_id < shard_count})
+    rest = [shard_id for shard_id in range(shard_count) if shard_id not in pinned]
+
+    # Cluster 0 tops up to its share; the other clusters split the rest evenly
+    take = max(0, -(-shard_count // clusters) - len(pinned))
+    plan = [sorted(pinned + rest[:take])]
+    rest = rest[take:]
+    for remaining in range(clusters - 1, 0, -1):
+        size = -(-len(rest) // remaining)
+        plan.append(rest[:size])
+        rest = rest[size:]
+    return [shard_ids for shard_ids in plan if shard_ids]
+
+
+class ShardMetrics:
+    """Gateway event counts, event rates and connection history per shard
+
+    `record(shard_id, kind)` is a couple of dict and list updates, cheap
+    enough to call from every on_message. Rates are events per second over the last
+    `window` seconds, kept in one-second buckets.
+    """
+
+    def __init__(self, window=60):
+        self.window = window
+        self._shards = {}  # shard id -> _Shard
+
+    def _shard(self, shard_id):
+        shard = self._shards.get(shard_id)
+        if shard is None:
+            shard = self._shards[shard_id] = _Shard(self.window)
+        return shard
+
+    def record(self, shard_id, kind):
+        """Count one gateway event of `kind` (message, member_join, interaction...)"""
+        shard = self._shard(shard_id)
+        shard.events[kind] = shard.events.get(kind, 0) + 1
+        second = int(time.monotonic())
+        slot = second % self.window
+        if shard.stamps[slot] != second:
+            shard.stamps[slot] = second
+            shard.counts[slot] = 0
+        shard.counts[slot] += 1
+
+    def connection(self, shard_id, state):
+        """Note a connect, ready, disconnect or resume"""
+        shard = self._shard(shard_id)
+        shard.connections[state] = shard.connections.get(state, 0) + 1
+        shard.state = state
+        shard.since = time.time()
+
+    def stats(self, latencies=()):
+        """{shard id: {...}}; `latencies` is bot.latencies, [(shard id, seconds)]"""
+        now = int(time.monotonic())
+        latency = {shard_id: seconds for shard_id, seconds in latencies}
+        report = {}
+        for shard_id in sorted(set(self._shards) | set(latency)):
+            shard = self._shard(shard_id)
+            recent = sum(count for stamp, count in zip(shard.stamps, shard.counts) if now - stamp < self.window)
+            seconds = latency.get(shard_id)
+            report[shard_id] = {
+                'state': shard.state,
+                'since': shard.since,
+                'latency_ms': round(seconds * 1000) if seconds is not None and seconds != float('inf') else None,
+                'events_per_s': round(recent / self.window, 2),
+                'events': dict(shard.events),
+                'connections': dict(shard.connections),
+            }
+        return report
+
+
+class _Shard:
+    __slots__ = ('events', 'stamps', 'counts', 'connections', 'state', 'since')
+
+    def __init__(self, window):
+        self.events = {}
+        self.stamps = [0] * window
+        self.counts = [0] * window
+        self.connections = {}
+        self.state = None
+        self.since = None
+
+
+class LeaderLease:
+    """Runs the registered singleton tasks on exactly one cluster at a time
+
+    Clusters race for one database lease with `acquire(name, holder, ttl)`
+    (atomic; returns the holder afterwards) and renew it every `renew_every`
+    seconds. The holder starts every task registered with `singleton()`.
+    A leader that cannot confirm its lease for `ttl - renew_every` seconds
+    stops its tasks, which is before the lease can expire and be taken over,
+    so two clusters never run them at once. `stop()` releases the lease so
+    another cluster takes over on its next renewal instead of after the TTL.
+    """
+
+    def __init__(self, acquire, release, holder, name='singletons', ttl=30.0, renew_every=10.0):
+        self.acquire = acquire
+        self.release = release
+        self.holder = holder
+        self.name = name
+        self.ttl = ttl
+        self.renew_every = renew_every
+        self._factories = {}  # task name -> coroutine function
+        self._tasks = {}      # task name -> running asyncio.Task
+        self._runner = None
+        self._confirmed = None  # monotonic time the lease was last confirmed as ours
+        self.leading = False
+        self.elections_won = 0
+        self.renew_failures = 0
+
+    def singleton(self, name, factory):
+        """Register `factory()` (a coroutine function) to run only while this cluster leads"""
+        self._factories[name] = factory
+
+    def start(self):
+        """Start campaigning for the lease (safe to call more than once)"""
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._campaign())
+
+    async def _campaign(self):
+        while True:
+            try:
+                if await self.acquire(self.name, self.holder, self.ttl) == self.holder:
+                    self._confirmed = time.monotonic()
+                else:
+                    self._confirmed = None
+            except Exception as e:
+                self.renew_failures += 1
+                print(f"Lease {self.name} renew error: {e}")
+
+            leading = self._confirmed is not None and time.monotonic() - self._confirmed < self.ttl - self.renew_every
+            if leading and not self.leading:
+                self.leading = True
+                self.elections_won += 1
+                print(f"👑 {self.holder} leads {self.name}: starting {', '.join(self._factories) or 'nothing'}")
+                self._tasks = {name: asyncio.create_task(factory()) for name, factory in self._factories.items()}
+            elif self.leading and not leading:
+                print(f"{self.holder} lost lease {self.name}: stopping singleton tasks")
+                await self._stop_tasks()
+            await asyncio.sleep(self.renew_every)
+
+    async def _stop_tasks(self):
+        self.leading = False
+        tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    async def stop(self):
+        """Stop campaigning and any singleton tasks, and hand the lease back (shutdown)"""
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+        was_leading = self.leading
+        await self._stop_tasks()
+        if was_leading:
+            try:
+                await self.release(self.name, self.holder)
+            except Exception as e:
+                print(f"Lease {self.name} release error: {e}")
+
+    def stats(self):
+        return {
+            'lease': self.name,
+            'holder': self.holder,
+            'leader': self.leading,
+            'campaigning': self._runner is not None and not self._runner.done(),
+            'elections_won': self.elections_won,
+            'renew_failures': self.renew_failures,
+            'singletons': {
+                name: ('running' if not task.done() else 'finished') if (task := self._tasks.get(name)) else 'stopped'
+                for name in self._factories
+            },
+        }
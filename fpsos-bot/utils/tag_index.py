@@ -0,0 +1,129 @@
+"""
+FPSOS Tag Name Index
+Prefix and fuzzy lookups over knowledge-base tag names for autocomplete and "did you mean"
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import Counter
+
+
+def trigrams(text):
+    """Padded character trigrams, so short names and word starts still share grams"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance; gives up early (returns limit + 1) once it must exceed `limit`"""
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        diagonal, left = i - 1, i
+        row_min = i
+        for j, char_b in enumerate(b):
+            above = previous[j + 1]
+            cost = diagonal if char_a == char_b else diagonal + 1
+            if above + 1 < cost:
+                cost = above + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+            diagonal, left = above, cost
+        if limit is not None and row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TagIndex:
+    """Sorted name list for prefix ranges plus a trigram index for fuzzy matches
+
+    The sorted list plays the role of a prefix trie: every name starting with
+    a prefix sits in one contiguous slice found by two binary searches, which
+    in Python is both faster and far smaller than a node-per-character trie.
+    Trigram postings narrow fuzzy search to names sharing grams with the
+    query before any edit distance is computed.
+
+    Not thread-safe on its own; FPSOSDatabase guards it with the tag lock.
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self._grams = {}  # trigram -> set of names
+        self.rebuild(names)
+
+    def rebuild(self, names):
+        self.names = sorted(set(names))
+        self._grams = {}
+        for name in self.names:
+            for gram in trigrams(name):
+                self._grams.setdefault(gram, set()).add(name)
+
+    def add(self, name):
+        index = bisect_left(self.names, name)
+        if index < len(self.names) and self.names[index] == name:
+            return
+        insort(self.names, name)
+        for gram in trigrams(name):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def remove(self, name):
+        index = bisect_left(self.names, name)
+        if index == len(self.names) or self.names[index] != name:
+            return
+        del self.names[index]
+        for gram in trigrams(name):
+            postings = self._grams.get(gram)
+            if postings:
+                postings.discard(name)
+                if not postings:
+                    del self._grams[gram]
+
+    def prefixed(self, prefix):
+        """Every name starting with `prefix`, in alphabetical order"""
+        start = bisect_left(self.names, prefix)
+        end = bisect_left(self.names, prefix + '\U0010ffff')
+        return self.names[start:end]
+
+    def similar(self, query, limit=10, min_similarity=0.4, candidates=15):
+        """[(name, similarity 0..1)] for names close to `query`, best first
+
+        Names containing the query count as at least 0.7 similar, which keeps
+        the old substring suggestions. Once `limit` matches are in hand, the
+        edit-distance bound shrinks to the worst of them, so most remaining
+        candidates are abandoned after a row or two.
+        """
+        overlap = Counter()
+        for gram in trigrams(query):
+            overlap.update(self._grams.get(gram, ()))
+        shortlist = [name for name, _ in overlap.most_common(candidates)]
+
+        results = []
+        best_distances = []  # sorted, at most `limit` long
+        for name in shortlist:
+            longest = max(len(name), len(query))
+            limit_distance = int(longest * (1 - min_similarity))
+            if len(best_distances) == limit and query not in name:
+                limit_distance = min(limit_distance, best_distances[-1])
+            distance = edit_distance(query, name, limit_distance)
+            insort(best_distances, distance)
+            del best_distances[limit:]
+            similarity = 1 - distance / longest
+            if query in name:
+                similarity = max(similarity, 0.7)
+            if similarity >= min_similarity:
+                results.append((name, similarity))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit]
+
+
+def rank_by_usage(matches, usage):
+    """Order (name, similarity) pairs by similarity, nudged up by how often a tag is used"""
+    return sorted(matches, key=lambda item: -(item[1] + 0.05 * math.log10(1 + usage(item[0]))))
@@ -1,7 +1,10 @@
 import discord
 import asyncio
 from utils.config import Colors, GUILD_ID, FIRECRAWL_API_KEY
-from database import db
+from async_database import adb
+from utils.rate_limit import limit_interaction
+from utils.recommendations import recommend
+from utils.send_scheduler import scheduler, route_key, INTERACTION
 from firecrawl import FirecrawlApp
 import os
 
@@ -95,19 +98,22 @@ class SystemProfileModal(discord.ui.Modal, title="💻 System Profiling Assessme
     async def on_submit(self, interaction: discord.Interaction):
         # Determine initial advice based on input
         advice = "✅ **Initial Check:** Your hardware looks capable."
-        package_rec = "full"
         color = Colors.FPSOS_BLUE
         
         # Simple heuristic analysis
         last_install = self.windows.value.lower()
         issues_text = self.issues.value.lower()
+        old_install = "year" in last_install and ("2" in last_install or "3" in last_install or "4" in last_install)
+        stutters = "stutter" in issues_text or "drop" in issues_text
         
-        if "year" in last_install and ("2" in last_install or "3" in last_install or "4" in last_install):
+        if old_install:
             advice = "⚠️ **Create Recommendation:** It's been over 2 years since your last Windows install.\n\nOver time, Windows accumulates bloatware, registry errors, and driver conflicts that degrade performance. A fresh install is the #1 way to restore peak responsiveness."
             color = Colors.WARNING
-        elif "stutter" in issues_text or "drop" in issues_text:
+        elif stutters:
             advice = "⚠️ **Insight:** Stutters typically indicate deep system latency issues (DPC Latency) or BIOS misconfigurations (C-States, HPET)."
-            package_rec = "extreme"
+        
+        # Profile rules in recommendation_rules.json: stutters point to Extreme, a stale install to the Full tune-up
+        package_rec = recommend(stutters=int(stutters), stale_install=int(old_install))
             
         # Create response embed
         embed = discord.Embed(
@@ -118,6 +124,8 @@ class SystemProfileModal(discord.ui.Modal, title="💻 System Profiling Assessme
         
         embed.add_field(name="🖥️ Your Rig", value=self.specs.value, inline=True)
         embed.add_field(name="⚠️ Reported Issue", value=self.issues.value, inline=True)
+        if package_rec['recommendation'] != 'good':
+            embed.add_field(name="📦 Likely Package", value=f"{package_rec['package_name']} ({package_rec['price']})", inline=False)
         
         # Add button to download tool
         view = DiagnosticView()
@@ -177,20 +185,22 @@ class TicketCloseView(discord.ui.View):
     @discord.ui.button(label="🔒 Close Ticket", style=discord.ButtonStyle.danger, custom_id="ticket:close")
     async def close_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Verify valid ticket
-        ticket = db.get_ticket_by_channel(interaction.channel_id)
+        ticket = await adb.get_ticket_by_channel(interaction.channel_id)
         if not ticket:
             await interaction.response.send_message("❌ This is not an active ticket channel.", ephemeral=True)
             return
             
         # Close in DB
-        db.close_ticket(ticket['id'])
+        await adb.close_ticket(ticket['id'])
         
         # Archive/Delete channel
         await interaction.response.send_message("🔒 Ticket closed. Deleting channel in 5 seconds...")
         
-        # Notify user (optional)
+        # Notify user (optional), after any staff replies still being batched
         user = interaction.client.get_user(int(ticket['user_id']))
+        await interaction.client.user_relay.flush(interaction.channel)
         if user:
+            await interaction.client.staff_relay.flush(user)
             try:
                 await user.send("✅ Your support ticket has been closed. If you need more help, just reply here!")
             except:
@@ -203,18 +213,18 @@ class TicketCloseView(discord.ui.View):
     async def ai_summarize(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         
-        ticket = db.get_ticket_by_channel(interaction.channel_id)
+        ticket = await adb.get_ticket_by_channel(interaction.channel_id)
         if not ticket:
             await interaction.followup.send("❌ Error: Ticket not found.", ephemeral=True)
             return
 
         # Fetch diagnostic data for this user
-        latest_diag = db.get_latest_diagnostic(ticket['user_id'])
+        latest_diag = await adb.get_latest_diagnostic(ticket['user_id'])
         summary = "No diagnostic data found for this user."
         
         if latest_diag:
             summary = (
-                f"**System:** {latest_diag.get('system_info', 'N/A')}\n"
+                f"**System:** {latest_diag['cpu'] or 'N/A'} / {latest_diag['gpu'] or 'N/A'}\n"
                 f"**Issues:** {latest_diag['critical_count']} Critical, {latest_diag['warning_count']} Warnings\n"
                 f"**Package Recommendation:** {latest_diag['recommendation'].upper()}"
             )
@@ -225,16 +235,17 @@ class TicketCloseView(discord.ui.View):
             color=Colors.FPSOS_ORANGE
         )
         embed.set_footer(text="Synthesized by FPSOS AI")
-        await interaction.channel.send(embed=embed)
+        await scheduler.send(INTERACTION, route_key('channel', interaction.channel), lambda: interaction.channel.send(embed=embed))
 
 class TicketView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="📩 Open Support Ticket", style=discord.ButtonStyle.success, custom_id="ticket:open")
+    @limit_interaction('ticket_open')
     async def open_ticket(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Check if already has ticket
-        existing = db.get_active_ticket(interaction.user.id)
+        existing = await adb.get_active_ticket(interaction.user.id)
         if existing:
             await interaction.response.send_message("❌ You already have an open ticket.", ephemeral=True)
             return
@@ -264,7 +275,7 @@ class TicketView(discord.ui.View):
         channel = await guild.create_text_channel(f"ticket-{interaction.user.name}", category=category, overwrites=overwrites)
         
         # Register in DB
-        db.create_ticket(interaction.user.id, channel.id)
+        await adb.create_ticket(interaction.user.id, channel.id)
         
         # Send controls to channel
         await channel.send(f"🔔 New ticket from {interaction.user.mention}", view=TicketCloseView())
@@ -6,7 +6,7 @@ import os
 sys.path.append(r'y:\fpsos-nextjs\fpsos-bot')
 
 try:
-    from bot import get_resources_embed, Colors
+    from bot_app import get_resources_embed, Colors
     import discord
 
     print("--- Testing get_resources_embed ---")
@@ -12,7 +12,9 @@ from pathlib import Path
 
 # Add parent directory to path so we can import database
 sys.path.insert(0, str(Path(__file__).parent))
-from database import db
+from async_database import adb
+from utils.send_scheduler import scheduler, route_key, CONFIRMATION
+from utils.embed_templates import render
 
 app = FastAPI(title="FPSOS Calendly Webhook Receiver")
 
@@ -105,7 +107,7 @@ async def handle_new_booking(payload):
             amount_aed = 399
         
         # Save to database
-        booking_id = db.create_booking(
+        booking_id = await adb.create_booking(
             user_id=discord_id or email,  # Use email as fallback
             service_type=service_type,
             calendly_event_id=event_id,
@@ -138,7 +140,7 @@ async def handle_booking_cancellation(payload):
         event_id = event.get('uri')
         
         # Find booking in database
-        booking = db.get_booking_by_calendly_id(event_id)
+        booking = await adb.get_booking_by_calendly_id(event_id)
         
         if booking:
             # Could mark as canceled (add a column) or delete
@@ -175,39 +177,15 @@ async def send_booking_confirmation_dm(user, service_type, scheduled_time, amoun
         'extreme': 'Extreme BIOSPRIME'
     }
     
-    formatted_time = scheduled_time.replace('T', ' ').replace('Z', ' UTC')
-    
-    embed = discord.Embed(
-        title="✅ Booking Confirmed!",
-        description=f"Your **{service_names.get(service_type, 'Optimization')}** session is scheduled!",
-        color=0x30D158  # Success green
+    embed = render(
+        'booking_confirmed',
+        service_name=service_names.get(service_type, 'Optimization'),
+        scheduled_time=scheduled_time.replace('T', ' ').replace('Z', ' UTC'),
+        amount_aed=amount_aed,
     )
     
-    embed.add_field(name="📅 Session Date", value=formatted_time, inline=False)
-    embed.add_field(name="💰 Price", value=f"AED {amount_aed}", inline=True)
-    embed.add_field(name="⏱️ Duration", value="3-4 hours", inline=True)
-    
-    checklist = """
-    **Before your session:**
-    1. ✅ Install AnyDesk: https://anydesk.com/download
-    2. ✅ Update GPU drivers to latest version
-    3. ✅ Close all games and applications
-    4. ✅ Join FPSOS Discord voice channel 15 minutes before
-    5. ✅ Have payment ready (bank transfer or card)
-    
-    **What to expect:**
-    • Full system diagnostic review
-    • Windows and game optimizations
-    • Network optimization for CS2
-    • BIOS tweaks (if Extreme package)
-    • Before/after performance testing
-    """
-    
-    embed.add_field(name="📋 Pre-Session Checklist", value=checklist.strip(), inline=False)
-    embed.set_footer(text="See you soon! - FPSOS Team")
-    
     try:
-        await user.send(embed=embed)
+        await scheduler.send(CONFIRMATION, route_key('dm', user), lambda: user.send(embed=embed))
     except discord.Forbidden:
         print(f"⚠️ Cannot DM user {user.id} - DMs are closed")
 